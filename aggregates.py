@@ -0,0 +1,163 @@
+import os
+import json
+import threading
+from datetime import datetime
+from entry_parser import normalize_text
+from persist import read_json, write_text
+from store import date_ordinal
+
+
+# types whose items count as taken/eaten
+INTAKE_TYPES = ("Food", "Drink", "Supplement", "Medication")
+
+# metrics for DayAggregates.metric(); "item:<name>" and "type:<Type>" work too
+METRICS = ("count", "max_rating", "discomfort_minutes")
+
+
+def summarize_day(entries):
+    """Everything about one day that can be read off its own lines"""
+    types, items = {}, {}
+    times = [entry.minutes for entry in entries if entry.minutes is not None]
+    for entry in entries:
+        types[entry.type] = types.get(entry.type, 0) + 1
+        if entry.type in INTAKE_TYPES:
+            for item, quantity in zip(entry.items, entry.quantities):
+                item_norm = normalize_text(item)
+                if item_norm:
+                    items[item_norm] = items.get(item_norm, 0) + quantity
+    return {"count": len(entries), "types": types, "items": items,
+            "first": min(times) if times else None, "last": max(times) if times else None}
+
+
+def _discomfort_by_day(episodes, lo, now_minutes):
+    """{ordinal: (minutes, max rating)} of the episodes' time on each day from day `lo` on"""
+    days = {}
+    for episode in episodes:
+        start = max(episode.start, lo * 1440)
+        end = episode.end if episode.end is not None else now_minutes
+        # (absolute minute, rating) of each rating change, for the rating in effect on a day
+        changes = [(date_ordinal(date_str) * 1440 + minutes, rating) for date_str, minutes, rating in episode.ratings]
+        for ordinal in range(start // 1440, (max(end, start + 1) - 1) // 1440 + 1):
+            overlap = min(end, (ordinal + 1) * 1440) - max(start, ordinal * 1440)
+            in_effect = [rating for at, rating in changes if at < (ordinal + 1) * 1440]
+            before = [rating for at, rating in changes if at <= ordinal * 1440]
+            ratings = in_effect[len(before) - 1:] if before else in_effect
+            minutes, rating = days.get(ordinal, (0, 0))
+            days[ordinal] = (minutes + max(overlap, 0), max([rating] + ratings))
+    return days
+
+
+class DayAggregates:
+    """A small precomputed record per day, so calendar-wide views and multi-month
+    stats never re-parse the day files.
+
+    A store listener: update_day() is called whenever a day is (re)indexed,
+    including days edited outside the app that refresh() finds by mtime. The
+    discomfort fields come from the episodes, which can cross midnight, so an
+    edit marks every later day's discomfort fields stale and save()
+    recomputes just those from the episodes that reach them.
+
+    Record: {"ordinal", "mtime", "size", "count", "types": {type: n},
+    "items": {item_norm: quantity}, "first", "last" (minutes or None),
+    "max_rating", "discomfort_minutes"}
+    """
+
+    def __init__(self, root="Journal", episodes=None):
+        self.path = os.path.join(root, "aggregates.json")
+        self.episodes = episodes
+        self.days = {}
+        self._changed = set()   # days written or removed since the last save
+        self._stale_from = None  # day number from which the discomfort fields need recomputing
+        self._lock = threading.RLock()
+        self.load()
+        # episodes still going have grown since the last save: their days are recomputed on the next one
+        if self.episodes is not None:
+            for episode in self.episodes.active().values():
+                self._stale(date_ordinal(episode.start_date))
+
+    def update_day(self, date_str, entries, record):
+        """Replace one day's record (entries None removes the day)"""
+        with self._lock:
+            if entries is None:
+                if self.days.pop(date_str, None) is None:
+                    return
+            else:
+                day = summarize_day(entries)
+                day.update(ordinal=record["ordinal"], mtime=record["mtime"], size=record["size"],
+                           max_rating=None, discomfort_minutes=0)
+                self.days[date_str] = day
+            self._changed.add(date_str)
+            self._stale(date_ordinal(date_str))
+
+    def _stale(self, ordinal):
+        self._stale_from = ordinal if self._stale_from is None else min(self._stale_from, ordinal)
+
+    def _recompute_discomfort(self):
+        """Refresh max_rating/discomfort_minutes of the days from _stale_from on"""
+        lo = self._stale_from
+        self._stale_from = None
+        if lo is None or self.episodes is None:
+            return
+        now = datetime.now()
+        now_minutes = now.toordinal() * 1440 + now.hour * 60 + now.minute
+        later = {day["ordinal"]: date_str for date_str, day in self.days.items() if day["ordinal"] >= lo}
+        if not later:
+            return
+        start = datetime.fromordinal(lo).strftime("%d-%m-%Y")
+        by_day = _discomfort_by_day(self.episodes.query(start=start), lo, now_minutes)
+        for ordinal, date_str in later.items():
+            day = self.days[date_str]
+            minutes, rating = by_day.get(ordinal, (0, 0))
+            fields = {"discomfort_minutes": minutes, "max_rating": rating or None}
+            if any(day.get(key) != value for key, value in fields.items()):
+                day.update(fields)
+                self._changed.add(date_str)
+
+    def get(self, date_str):
+        with self._lock:
+            return self.days.get(date_str)
+
+    def range(self, start=None, end=None):
+        """[(date_str, record)] between two 'dd-MM-yyyy' dates (inclusive), oldest first"""
+        lo = date_ordinal(start) if start else None
+        hi = date_ordinal(end) if end else None
+        with self._lock:
+            days = [(day["ordinal"], date_str, day) for date_str, day in self.days.items()
+                    if (lo is None or day["ordinal"] >= lo) and (hi is None or day["ordinal"] <= hi)]
+        days.sort(key=lambda day: day[0])
+        return [(date_str, day) for _, date_str, day in days]
+
+    def metric(self, name, start=None, end=None):
+        """{date_str: value} of one metric: "count", "max_rating", "discomfort_minutes",
+        "type:<Type>" (entries of that type) or "item:<name>" (quantity taken)"""
+        if name.startswith("item:"):
+            item_norm = normalize_text(name[len("item:"):])
+            value = lambda day: day["items"].get(item_norm, 0)
+        elif name.startswith("type:"):
+            entry_type = name[len("type:"):]
+            value = lambda day: day["types"].get(entry_type, 0)
+        elif name in METRICS:
+            value = lambda day: day[name] or 0
+        else:
+            raise ValueError(f"unknown metric '{name}'")
+        return {date_str: value(day) for date_str, day in self.range(start, end)}
+
+    def save(self):
+        with self._lock:
+            self._recompute_discomfort()
+            if not self._changed:
+                return
+            snapshot = self._snapshot(self._changed)
+            self._changed = set()
+        self._write(snapshot)
+
+    def _snapshot(self, changed):
+        """What _write() needs, taken under the lock (`changed`: the days written or removed)"""
+        return json.dumps({"days": self.days}, separators=(",", ":"))
+
+    def _write(self, snapshot):
+        write_text(self.path, snapshot)
+
+    def load(self):
+        # missing or corrupted: every day is summarized again by sync_listener()
+        self.days = read_json(self.path, {}, backups=0).get("days", {})
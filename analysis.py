@@ -0,0 +1,182 @@
+"""Lagged correlation between what was taken/eaten and discomfort episodes.
+
+The whole history is read from the columnar export (see export.py) straight
+into NumPy arrays, binned into fixed time slots, and every intake item is
+correlated against every discomfort's intensity series at each lag in one
+matrix product per lag. NumPy is only needed for this module.
+"""
+import os
+import argparse
+from typing import NamedTuple
+from export import ColumnarExport, export_journal
+from persist import read_json
+
+
+INTAKE_KINDS = ("took", "medication", "ate", "drink")
+DEFAULT_EXPORT = os.path.join("Journal", "history.jcol")
+
+
+class Correlation(NamedTuple):
+    item: str
+    discomfort: str
+    lag_hours: float   # discomfort follows the intake by this long
+    r: float           # Pearson correlation at that lag
+    intakes: int       # how many times the item was logged
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("The analysis needs NumPy: pip install numpy") from None
+    return numpy
+
+
+def load_columns(export):
+    """Columns of an export as NumPy arrays (views over the mapped file, no copies)"""
+    np = _numpy()
+    dtypes = {"i": np.int32, "h": np.int16, "b": np.int8}
+    return {name: np.frombuffer(export.column(name), dtype=dtypes[info["type"]])
+            for name, info in export.header["columns"].items()}
+
+
+def discomfort_series(np, bins, ratings, finished, n_bins, max_episode_bins):
+    """Intensity per bin for one discomfort from its start/finish events.
+
+    `bins` are event slots (sorted), `ratings` the rating of a start event and
+    `finished` marks finish events. The rating holds until the next event, or
+    for at most max_episode_bins if the episode is never finished.
+    """
+    values = np.where(finished, 0, ratings).astype(np.float32)
+    marks = np.full(n_bins, -1, dtype=np.int64)
+    # last event wins when several land in one slot
+    marks[bins] = np.arange(len(bins))
+    last = np.maximum.accumulate(marks)
+    series = np.where(last >= 0, values[np.maximum(last, 0)], 0)
+    age = np.arange(n_bins) - bins[np.maximum(last, 0)]
+    series[(last < 0) | (age > max_episode_bins)] = 0
+    return series
+
+
+def correlate(export, items=None, bin_minutes=60, max_lag_hours=12, max_episode_hours=24, min_intakes=3):
+    """Best lagged correlation for every (intake item, discomfort) pair, strongest first.
+
+    `items` restricts the intake side (e.g. the app's type_options); by default
+    every item logged with took/ate/drink/medication is used.
+    """
+    np = _numpy()
+    columns = load_columns(export)
+    timed = columns["minutes"] >= 0
+    day = columns["day"][timed].astype(np.int64)
+    if not len(day):
+        return []
+    slot = (day - day.min()) * (1440 // bin_minutes) + columns["minutes"][timed] // bin_minutes
+    n_bins = int(slot.max()) + 1
+    kind = columns["kind"][timed]
+    item = columns["item"][timed]
+    quantity = columns["quantity"][timed].astype(np.float32)
+    rating = columns["rating"][timed]
+
+    kinds = export.kinds
+    kind_code = {name: code for code, name in enumerate(kinds)}
+    intake_mask = np.isin(kind, [kind_code[k] for k in INTAKE_KINDS if k in kind_code])
+    started = kind_code.get("started", -1)
+    finished = kind_code.get("finished", -1)
+    # discomfort lines are the started/finished lines that carry a rating or end one
+    discomfort_mask = ((kind == started) & (rating >= 0)) | (kind == finished)
+
+    # intake occurrence matrix: items x bins
+    intake_items = np.unique(item[intake_mask])
+    if items is not None:
+        wanted = {name.casefold().strip() for name in items}
+        intake_items = np.array([code for code in intake_items
+                                 if export.items[code].casefold().strip() in wanted], dtype=intake_items.dtype)
+    counts = np.bincount(item[intake_mask], minlength=len(export.items))
+    intake_items = intake_items[counts[intake_items] >= min_intakes] if len(intake_items) else intake_items
+    if not len(intake_items):
+        return []
+    row_of = np.full(len(export.items), -1, dtype=np.int64)
+    row_of[intake_items] = np.arange(len(intake_items))
+    rows = row_of[item[intake_mask]]
+    keep = rows >= 0
+    intake = np.zeros((len(intake_items), n_bins), dtype=np.float32)
+    np.add.at(intake, (rows[keep], slot[intake_mask][keep]), quantity[intake_mask][keep])
+
+    # discomfort intensity matrix: discomforts x bins
+    discomfort_items = np.unique(item[discomfort_mask & (kind == started)])
+    if not len(discomfort_items):
+        return []
+    max_episode_bins = max_episode_hours * 60 // bin_minutes
+    intensity = np.zeros((len(discomfort_items), n_bins), dtype=np.float32)
+    for row, code in enumerate(discomfort_items):
+        events = discomfort_mask & (item == code)
+        order = np.argsort(slot[events], kind="stable")
+        intensity[row] = discomfort_series(np, slot[events][order], rating[events][order],
+                                           (kind[events] == finished)[order], n_bins, max_episode_bins)
+
+    # Pearson r at each lag: centre and scale the overlapping windows, then one matmul
+    best_r = np.zeros((len(intake_items), len(discomfort_items)), dtype=np.float32)
+    best_lag = np.zeros_like(best_r)
+    max_lag = max_lag_hours * 60 // bin_minutes
+    for lag in range(0, max_lag + 1):
+        x = intake[:, :n_bins - lag]
+        y = intensity[:, lag:]
+        if x.shape[1] < 2:
+            break
+        x = x - x.mean(axis=1, keepdims=True)
+        y = y - y.mean(axis=1, keepdims=True)
+        norm = np.outer(np.linalg.norm(x, axis=1), np.linalg.norm(y, axis=1))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            r = np.where(norm > 0, (x @ y.T) / norm, 0).astype(np.float32)
+        better = np.abs(r) > np.abs(best_r)
+        best_r[better] = r[better]
+        best_lag[better] = lag * bin_minutes / 60
+
+    order = np.argsort(-np.abs(best_r), axis=None)
+    results = []
+    for flat in order:
+        i, j = np.unravel_index(flat, best_r.shape)
+        if best_r[i, j] == 0:
+            break
+        results.append(Correlation(export.items[intake_items[i]], export.items[discomfort_items[j]],
+                                   float(best_lag[i, j]), float(best_r[i, j]),
+                                   int(counts[intake_items[i]])))
+    return results
+
+
+def analyze(export_path=DEFAULT_EXPORT, store=None, items=None, **options):
+    """Bring the export up to date (incrementally) and correlate it"""
+    export_journal(export_path, store=store, incremental=True)
+    with ColumnarExport(export_path) as export:
+        return correlate(export, items=items, **options)
+
+
+def _saved_items():
+    """Intake items from options/type_options.json, or None to use everything logged"""
+    options = read_json(os.path.join("options", "type_options.json"))
+    if options is None:
+        return None
+    return [item for key in ("Food", "Drink", "Supplement", "Medication") for item in options.get(key, [])]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Correlate intake items with discomfort episodes")
+    parser.add_argument("--export", default=DEFAULT_EXPORT, help="columnar export file to use/update")
+    parser.add_argument("--bin-minutes", type=int, default=60)
+    parser.add_argument("--max-lag", type=int, default=12, help="largest lag to try, in hours")
+    parser.add_argument("--min-intakes", type=int, default=3)
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    results = analyze(args.export, items=_saved_items(), bin_minutes=args.bin_minutes,
+                      max_lag_hours=args.max_lag, min_intakes=args.min_intakes)
+    if not results:
+        print("Not enough data to correlate yet.")
+        return
+    for result in results[:args.top]:
+        print(f"{result.r:+.2f}  {result.item} -> {result.discomfort} "
+              f"after {result.lag_hours:g}h ({result.intakes} intakes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+from PySide6.QtWidgets import (QVBoxLayout, QDialog, QDialogButtonBox, QLabel,
+                               QTableWidget, QTableWidgetItem, QHeaderView)
+
+
+class AnalysisDialog(QDialog):
+    def __init__(self, parent=None, results=None, title="Intake vs discomfort"):
+        super().__init__(parent)
+        self.setWindowTitle(title)
+        self.resize(600, 500)
+        layout = QVBoxLayout()
+
+        results = results or []
+        if results:
+            info = "Strongest correlations between an intake and a later discomfort (r from -1 to 1)"
+        else:
+            info = "Not enough data to correlate yet."
+        layout.addWidget(QLabel(info))
+
+        # one row per (item, discomfort) pair
+        table = QTableWidget(len(results), 5)
+        table.setHorizontalHeaderLabels(["Item", "Discomfort", "Lag (h)", "r", "Intakes"])
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        table.setEditTriggers(QTableWidget.NoEditTriggers)
+        for row, result in enumerate(results):
+            table.setItem(row, 0, QTableWidgetItem(result.item))
+            table.setItem(row, 1, QTableWidgetItem(result.discomfort))
+            table.setItem(row, 2, QTableWidgetItem(f"{result.lag_hours:g}"))
+            table.setItem(row, 3, QTableWidgetItem(f"{result.r:+.2f}"))
+            table.setItem(row, 4, QTableWidgetItem(str(result.intakes)))
+        layout.addWidget(table)
+
+        dialogue_butn = QDialogButtonBox(QDialogButtonBox.Close)
+        dialogue_butn.rejected.connect(self.reject)
+        layout.addWidget(dialogue_butn)
+
+        self.setLayout(layout)
@@ -0,0 +1,321 @@
+"""Benchmarks on a synthetic journal history, run headlessly.
+
+    python bench.py                                   # 365 days x 20 entries, JSON on stdout
+    python bench.py --days 1000 --entries 40 --vocab 200 -o after.json
+    python bench.py --compare before.json after.json  # exit status 1 on a regression
+
+Every benchmark runs --repeat times in a throwaway directory and reports its
+best and median time, so result files from two runs can be compared. The
+window benchmarks use Qt's offscreen platform; --no-gui skips them.
+"""
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import platform
+import tempfile
+import statistics
+from datetime import date, timedelta
+import options
+from cache import DayCache
+from core import JournalCore, ENTRY_TYPES, format_entry
+from day import DayLines
+from entry_parser import compose_day, format_time, parse_body, sort_key, split_sections
+from search import SearchIndex
+from persist import write_json
+from store import JournalStore, sync_listener
+
+
+def vocabulary(size=0):
+    """Items per type from the default type options, padded with made-up names to `size`"""
+    vocab = {}
+    for entry_type, items in options.DEFAULT_TYPE_OPTIONS.items():
+        items = list(items)
+        items += [f"{entry_type.lower()} item {n}" for n in range(len(items), size)]
+        vocab[entry_type] = items
+    return vocab
+
+
+def random_line(rng, vocab, minutes=None):
+    entry_type = rng.choice(ENTRY_TYPES)
+    item = rng.choice(vocab[entry_type])
+    if minutes is None:
+        minutes = rng.randrange(1440)
+    dosage = rng.choice(["5mg", "10mg"]) if item == "Dexamphetamine" else None
+    return format_entry(entry_type, item, format_time(minutes), started=rng.random() < 0.6,
+                        rating=rng.randint(1, 4), dosage=dosage, fish_kind="basa fillet")
+
+
+def generate(root, days, entries, vocab, seed=0):
+    """Write `days` sorted day files ending today under root/Journal; returns their dates"""
+    rng = random.Random(seed)
+    journal_dir = os.path.join(root, "Journal")
+    os.makedirs(journal_dir, exist_ok=True)
+    today = date.today()
+    dates = []
+    for offset in range(days):
+        date_str = (today - timedelta(days=offset)).strftime("%d-%m-%Y")
+        lines = sorted((random_line(rng, vocab) for _ in range(entries)), key=sort_key)
+        body = "\n".join([f"Date: {date_str}"] + lines) + "\n"
+        with open(os.path.join(journal_dir, f"{date_str}.txt"), "w") as file:
+            file.write(compose_day(body, "synthetic day", ""))
+        dates.append(date_str)
+    # saved options: the whole vocabulary, shuffled so the merge has work to do
+    saved = {key: rng.sample(items, len(items)) for key, items in vocab.items()}
+    write_json(os.path.join(root, options.TYPE_OPTIONS_FILE), saved)
+    return dates
+
+
+def measure(func, repeat, setup=None):
+    """Seconds taken by func() on each of `repeat` runs; setup() runs untimed before each"""
+    runs = []
+    for _ in range(repeat):
+        state = setup() if setup else None
+        started = time.perf_counter()
+        func() if setup is None else func(state)
+        runs.append(time.perf_counter() - started)
+    return runs
+
+
+def engine_benchmarks(root, dates, vocab, args):
+    """The GUI-free paths: parsing, inserts, index refresh, save/load and the options merge"""
+    rng = random.Random(args.seed + 1)
+    journal_dir = os.path.join(root, "Journal")
+    contents = []
+    for date_str in dates:
+        with open(os.path.join(journal_dir, f"{date_str}.txt")) as file:
+            contents.append(file.read())
+    biggest = max(contents, key=len)
+    new_lines = [random_line(rng, vocab) for _ in range(args.entries)]
+    results = {}
+
+    def parse_all():
+        for content in contents:
+            parse_body(split_sections(content)[0])
+    results["parse_days"] = measure(parse_all, args.repeat)
+
+    def insert_day():
+        day = DayLines(split_sections(biggest)[0])
+        day.ensure_trailing_newline()
+        for line in new_lines:
+            day.insert(line)
+    results["day_insert"] = measure(insert_day, args.repeat)
+
+    def cold_store():
+        index_path = os.path.join(journal_dir, "index.json")
+        if os.path.exists(index_path):
+            os.remove(index_path)
+        return JournalStore(journal_dir)
+    results["index_refresh_cold"] = measure(lambda store: store.refresh(), args.repeat, setup=cold_store)
+    store = JournalStore(journal_dir)
+    store.refresh()
+    results["index_refresh_warm"] = measure(store.refresh, args.repeat)
+
+    def cold_search():
+        search_path = os.path.join(journal_dir, "search_index.json")
+        if os.path.exists(search_path):
+            os.remove(search_path)
+        return SearchIndex(journal_dir)
+    results["search_index_build"] = measure(lambda index: sync_listener(store, index), args.repeat, setup=cold_search)
+    search_index = SearchIndex(journal_dir)
+    sync_listener(store, search_index)
+    queries = [rng.choice(vocab[rng.choice(ENTRY_TYPES)]) for _ in range(20)]
+    results["search_lookup"] = measure(lambda: [search_index.lookup(query) for query in queries], args.repeat)
+
+    core = JournalCore(journal_dir, with_search=False, cache=DayCache())
+    sample = dates[:min(len(dates), 30)]
+    results["load_days_uncached"] = measure(lambda _: [core.read(date_str) for date_str in sample], args.repeat,
+                                            setup=core.log.cache.invalidate)
+    results["load_days_cached"] = measure(lambda: [core.read(date_str) for date_str in sample], args.repeat)
+
+    def save_day():
+        day = core.read(dates[0])
+        core.save(dates[0], day.journal, day.notes, day.changes)
+        core.log.compact(dates[0])
+    results["save_day"] = measure(save_day, args.repeat)
+
+    options_file = os.path.join(root, options.TYPE_OPTIONS_FILE)
+    results["options_merge"] = measure(lambda: options.load_type_options(options_file), args.repeat)
+    return results
+
+
+def gui_benchmarks(root, dates, vocab, args):
+    """Window paths on the offscreen platform: startup, day switches, add_entry, sort, saves"""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6.QtCore import QDate, QTime
+    from PySide6.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication([])
+    import main
+
+    def wait(condition, timeout=30):
+        deadline = time.perf_counter() + timeout
+        while not condition():
+            if time.perf_counter() > deadline:
+                raise TimeoutError("the window did not finish in time")
+            app.processEvents()
+            time.sleep(0.0005)
+
+    def loaded(window, date_str):
+        return lambda: window.loaded_date == date_str and window.entry_butn.isEnabled()
+
+    rng = random.Random(args.seed + 2)
+    results = {}
+    previous_dir = os.getcwd()
+    os.chdir(root)
+    try:
+        windows = []
+
+        def startup():
+            window = main.Journal()
+            window.show()
+            wait(loaded(window, date.today().strftime("%d-%m-%Y")))
+            windows.append(window)
+        results["gui_startup"] = measure(startup, args.repeat)
+        for window in windows[:-1]:
+            window.close()
+        window = windows[-1]
+        window.worker.flush()
+
+        # switch between days far enough apart that the prefetch does not help
+        targets = iter(rng.sample(dates, min(len(dates), args.repeat)) * args.repeat)
+
+        def switch_day():
+            date_str = next(targets)
+            window.date_edit.setDate(QDate.fromString(date_str, "dd-MM-yyyy"))
+            wait(loaded(window, date_str))
+        results["gui_load_journal"] = measure(switch_day, args.repeat)
+
+        def switch_types():
+            for entry_type in ENTRY_TYPES:
+                window.type.setCurrentText(entry_type)
+        results["gui_switch_type"] = measure(switch_types, args.repeat)
+
+        future_days = iter(range(1, args.repeat + 1))
+
+        def empty_day():
+            window.date_edit.setDate(QDate.currentDate().addDays(next(future_days)))
+            date_str = window.date_edit.date().toString("dd-MM-yyyy")
+            wait(loaded(window, date_str))
+            window.worker.flush()
+
+        def add_entries(_):
+            window.type.setCurrentText("Supplement")
+            for _ in range(args.entries):
+                window.entry_combo.setCurrentText(rng.choice(vocab["Supplement"]))
+                window.time_custom.setChecked(True)
+                window.time_edit.setTime(QTime(0, 0).addSecs(rng.randrange(1440) * 60))
+                window.add_entry()
+            window.worker.flush()
+        results["gui_add_entry"] = measure(add_entries, args.repeat, setup=empty_day)
+
+        shuffled = [random_line(rng, vocab) for _ in range(args.entries * 10)]
+        content = "\n".join([f"Date: {dates[0]}"] + shuffled) + "\n"
+        results["gui_sort"] = measure(lambda: window.sort_journal_chronologically(content), args.repeat)
+
+        def recompute():
+            window.preview_text.setPlainText(content)
+            window.update_active_discomforts_from_journal()
+        results["gui_discomfort_recompute"] = measure(recompute, args.repeat)
+
+        def edit_notes():
+            # an unchanged day returns before writing anything: give every run something to save
+            window.note_txt.setPlainText(f"bench note {rng.random()}")
+
+        def save(_):
+            window.save_journal()
+            window.worker.flush()
+        results["gui_save_journal"] = measure(save, args.repeat, setup=edit_notes)
+
+        window.close()
+    finally:
+        os.chdir(previous_dir)
+    return results
+
+
+def summarize(runs):
+    return {"best": min(runs), "median": statistics.median(runs), "runs": runs}
+
+
+def run(args):
+    root = tempfile.mkdtemp(prefix="journal-bench-")
+    try:
+        vocab = vocabulary(args.vocab)
+        dates = generate(root, args.days, args.entries, vocab, seed=args.seed)
+        results = engine_benchmarks(root, dates, vocab, args)
+        if not args.no_gui:
+            results.update(gui_benchmarks(root, dates, vocab, args))
+    finally:
+        if args.keep:
+            print(f"synthetic journal kept in {root}", file=sys.stderr)
+        else:
+            shutil.rmtree(root, ignore_errors=True)
+    return {
+        "meta": {"days": args.days, "entries": args.entries, "vocab": max(args.vocab, 0),
+                 "repeat": args.repeat, "seed": args.seed, "python": platform.python_version(),
+                 "platform": platform.platform(), "created": time.strftime("%Y-%m-%dT%H:%M:%S")},
+        "benchmarks": {name: summarize(runs) for name, runs in results.items()},
+    }
+
+
+def compare(before_path, after_path, threshold):
+    """Print median changes between two result files; True if anything got slower than threshold"""
+    with open(before_path) as file:
+        before = json.load(file)
+    with open(after_path) as file:
+        after = json.load(file)
+    if before["meta"]["days"] != after["meta"]["days"] or before["meta"]["entries"] != after["meta"]["entries"]:
+        print("warning: the runs used different journal sizes", file=sys.stderr)
+    regressed = False
+    print(f"{'benchmark':28} {'before':>10} {'after':>10} {'change':>8}")
+    for name, result in after["benchmarks"].items():
+        if name not in before["benchmarks"]:
+            print(f"{name:28} {'-':>10} {result['median'] * 1000:>8.2f}ms {'new':>8}")
+            continue
+        old = before["benchmarks"][name]["median"]
+        new = result["median"]
+        change = (new - old) / old * 100 if old else 0.0
+        flag = ""
+        if change > threshold:
+            flag = "  slower"
+            regressed = True
+        print(f"{name:28} {old * 1000:>8.2f}ms {new * 1000:>8.2f}ms {change:>+7.1f}%{flag}")
+    return regressed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the journal on a synthetic history")
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--entries", type=int, default=20, help="entries per day")
+    parser.add_argument("--vocab", type=int, default=0,
+                        help="items per type (default: just the built-in type options)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-gui", action="store_true", help="skip the window benchmarks")
+    parser.add_argument("--keep", action="store_true", help="keep the synthetic journal directory")
+    parser.add_argument("-o", "--output", help="write the JSON results here instead of stdout")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"), help="compare two result files")
+    parser.add_argument("--threshold", type=float, default=10.0,
+                        help="percent slowdown that counts as a regression (with --compare)")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        return 1 if compare(args.compare[0], args.compare[1], args.threshold) else 0
+
+    results = run(args)
+    for name, result in results["benchmarks"].items():
+        print(f"{name:28} best {result['best'] * 1000:9.2f}ms  median {result['median'] * 1000:9.2f}ms",
+              file=sys.stderr)
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
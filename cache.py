@@ -0,0 +1,80 @@
+import threading
+from collections import OrderedDict
+from typing import NamedTuple, Optional, Tuple
+
+
+DEFAULT_MAX_BYTES = 8 * 1024 * 1024
+ENTRY_OVERHEAD = 200  # rough size of one parsed Entry beyond its text
+
+
+class ParsedDay(NamedTuple):
+    """A day file split into its sections, with the journal already parsed"""
+    journal: Optional[str]   # None when the day has no file yet
+    notes: str
+    changes: str
+    entries: Tuple = ()
+
+    def size(self):
+        text = len(self.journal or "") + len(self.notes) + len(self.changes)
+        return text * 2 + len(self.entries) * ENTRY_OVERHEAD
+
+
+class DayCache:
+    """LRU cache of parsed days, each validated by the stat of its files.
+
+    `stamp` is whatever identifies the on-disk version (mtime and size of the
+    day file and its pending log); a lookup with a different stamp is a miss.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._days = OrderedDict()  # {date_str: (stamp, ParsedDay, size)}
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, date_str, stamp):
+        with self._lock:
+            cached = self._days.get(date_str)
+            if cached is None or cached[0] != stamp:
+                self.misses += 1
+                return None
+            self._days.move_to_end(date_str)
+            self.hits += 1
+            return cached[1]
+
+    def peek(self, date_str, stamp):
+        """Like get() but without touching the counters or the LRU order (for prefetching)"""
+        with self._lock:
+            cached = self._days.get(date_str)
+            return cached is not None and cached[0] == stamp
+
+    def put(self, date_str, stamp, day):
+        size = day.size()
+        with self._lock:
+            old = self._days.pop(date_str, None)
+            if old is not None:
+                self._bytes -= old[2]
+            if size > self.max_bytes:
+                return
+            self._days[date_str] = (stamp, day, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, _, evicted) = self._days.popitem(last=False)
+                self._bytes -= evicted
+
+    def invalidate(self, date_str=None):
+        with self._lock:
+            if date_str is None:
+                self._days.clear()
+                self._bytes = 0
+            else:
+                old = self._days.pop(date_str, None)
+                if old is not None:
+                    self._bytes -= old[2]
+
+    def stats(self):
+        with self._lock:
+            return {"days": len(self._days), "bytes": self._bytes,
+                    "hits": self.hits, "misses": self.misses}
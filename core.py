@@ -0,0 +1,209 @@
+"""GUI-free journal engine shared by the window (main.py) and the CLI (journal.py).
+
+Nothing here imports Qt, so logging from a terminal starts in milliseconds.
+"""
+import os
+import hashlib
+from datetime import datetime
+from entry_parser import format_time, normalize_text, parse_body, split_sections
+from aggregates import DayAggregates
+from entry_log import EntryLog
+from episodes import EpisodeStore
+from options import OptionList, TYPE_OPTIONS_FILE
+from persist import read_json, write_json
+from search import SearchIndex
+from store import JournalStore, date_ordinal, sync_listener
+
+
+ENTRY_TYPES = ["Daily", "Food", "Drink", "Activity", "Supplement", "Discomfort", "Medication"]
+# "files": day files and JSON state (the default), "sqlite": one database (see sqlite_store.py)
+BACKENDS = ("files", "sqlite")
+
+
+def today_str():
+    return datetime.now().strftime("%d-%m-%Y")
+
+
+def now_time_str():
+    """Current time in the journal's format (same as QTime 'h:mma' lowercased)"""
+    now = datetime.now()
+    return format_time(now.hour * 60 + now.minute)
+
+
+def format_entry(entry_type, item, time_str, started=True, rating=1, dosage=None, fish_kind=None, fish_qty=1):
+    """The journal line for an entry, or None if it is incomplete.
+
+    `dosage` is only written for medication, `fish_kind` only for Food -> fish.
+    """
+    if entry_type == "Daily":
+        return f"{time_str} {item}"
+    if not item:
+        return None
+
+    activity_type = "started" if started else "finished"
+    if entry_type == "Activity":
+        return f"{time_str} {activity_type} {item}"
+    if entry_type == "Discomfort":
+        return f"{time_str} {activity_type} having {item} rating {rating}"
+    if entry_type == "Supplement":
+        return f"{time_str} took {item}"
+    if entry_type == "Drink":
+        return f"{time_str} drink {item}"
+    if entry_type == "Food":
+        if item == "fish" and fish_kind:
+            if fish_qty == 1:
+                return f"{time_str} ate fish({fish_kind})"
+            return f"{time_str} ate {fish_qty} fish({fish_kind})"
+        return f"{time_str} ate {item}"
+    if entry_type == "Medication":
+        if dosage:
+            return f"{time_str} took medication - {item} ({dosage})"
+        return f"{time_str} took medication - {item}"
+    return None
+
+
+def content_hash(text):
+    """Digest of a text, to tell whether it changed since it was last saved"""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+def exists_in_list(items, candidate):
+    if isinstance(items, OptionList):
+        return candidate in items
+    candidate_norm = normalize_text(candidate)
+    for existing in items:
+        if normalize_text(existing) == candidate_norm:
+            return True
+    return False
+
+
+def remove_from_list(items, candidate):
+    if isinstance(items, OptionList):
+        return items.discard(candidate)
+    candidate_norm = normalize_text(candidate)
+    for i, existing in enumerate(items):
+        if normalize_text(existing) == candidate_norm:
+            del items[i]
+            return True
+    return False
+
+
+def learn_item(type_options, entry_type, item):
+    """Auto-add a new single Food/Supplement item to the options; True if it was added"""
+    if entry_type in ("Food", "Supplement") and item and "," not in item:
+        if not exists_in_list(type_options[entry_type], item):
+            type_options[entry_type].append(item.strip())
+            return True
+    return False
+
+
+def track_discomfort(active_discomforts, item, started, rating, time_str, date_str):
+    """Start/update or end an active discomfort; True if the tracking changed"""
+    if started:
+        # Add to active discomforts if not already there, or update rating and time if it is
+        active_discomforts[item] = {
+            "rating": rating,
+            "start_time": time_str,
+            "start_date": date_str
+        }
+        return True
+    if item in active_discomforts:
+        del active_discomforts[item]
+        return True
+    return False
+
+
+class JournalCore:
+    """The journal files, their index, the entry log, the discomfort episodes, the
+    per-day aggregates and (optionally) the search index"""
+
+    def __init__(self, root="Journal", with_search=True, cache=None):
+        self.store = JournalStore(root)
+        self.log = EntryLog(self.store, cache=cache)
+        # discomfort episodes across days, updated whenever a day is indexed
+        self.episodes = EpisodeStore(root)
+        self.store.listeners.append(self.episodes)
+        # per-day counts, items, times and discomfort, after the episodes they are computed from
+        self.aggregates = DayAggregates(root, self.episodes)
+        self.store.listeners.append(self.aggregates)
+        self.search_index = None
+        if with_search:
+            # item -> (date, time, kind) index for history search, updated whenever a day is indexed
+            self.search_index = SearchIndex(root)
+            self.store.listeners.append(self.search_index)
+
+    def open(self, read_only=False):
+        """Finish anything left by a crash and bring the indexes up to date.
+
+        read_only leaves the entry logs alone, for commands that only look:
+        a running window may still be appending to them. Their entries are
+        shown to the indexes in memory instead.
+        """
+        if not read_only:
+            self.log.recover()
+        self.store.refresh()
+        # in listener order: the aggregates' discomfort fields come from the synced episodes
+        for listener in self.store.listeners:
+            sync_listener(self.store, listener)
+        if read_only:
+            self._index_pending()
+
+    def _index_pending(self):
+        """Index the days with logged entries as the window sees them (not saved: the logs stay)"""
+        for date_str in self.log.pending_days():
+            content = self.log.read_day(date_str)
+            if content is None:
+                continue
+            record = self.store.index.get(date_str) or {"ordinal": date_ordinal(date_str), "mtime": 0, "size": 0}
+            entries = parse_body(split_sections(content)[0])
+            for listener in self.store.listeners:
+                listener.update_day(date_str, entries, record)
+
+    def refresh(self):
+        """Re-index the days changed by something else (another editor, a sync tool, the CLI).
+
+        Returns their dates. Runs under the store lock, which a compaction holds
+        while it writes a day, so our own writes are never mistaken for outside changes.
+        """
+        with self.store.lock:
+            changed = self.store.refresh()
+        for date_str in changed:
+            self.log.cache.invalidate(date_str)
+        return changed
+
+    def watch_paths(self):
+        """Folders whose files can be changed from outside while the app runs"""
+        return [self.store.root, os.path.dirname(TYPE_OPTIONS_FILE)]
+
+    def add(self, date_str, line):
+        """Log one entry line; it lands in chronological order when the day is compacted"""
+        self.log.append(date_str, "add", line=line)
+
+    def save(self, date_str, journal_content, notes_content="", changes_content=""):
+        self.log.append(date_str, "edit", body=journal_content,
+                        notes=notes_content or "", changes=changes_content or "")
+
+    def read(self, date_str):
+        return self.log.read_parsed(date_str)
+
+    def read_state(self, filename):
+        """Saved type options, stacks or active discomforts (None if there are none)"""
+        return read_json(filename)
+
+    def write_state(self, filename, data):
+        write_json(filename, data)
+
+    def close(self):
+        self.log.compact_all()
+        self.store.flush()
+
+
+def create_core(root="Journal", backend=None, **kwargs):
+    """The journal engine for a backend (default: $JOURNAL_BACKEND, else "files")"""
+    backend = backend or os.environ.get("JOURNAL_BACKEND") or "files"
+    if backend == "sqlite":
+        from sqlite_store import SqliteCore  # sqlite3 is only imported when asked for
+        return SqliteCore(root, **kwargs)
+    if backend != "files":
+        raise ValueError(f"unknown journal backend '{backend}' (choose from {', '.join(BACKENDS)})")
+    return JournalCore(root, **kwargs)
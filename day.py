@@ -0,0 +1,74 @@
+from bisect import bisect_right
+from entry_parser import parse_line
+
+
+class DayLines:
+    """The lines of one journal body, kept with their times for O(log n) inserts.
+
+    Line i of `lines` is block i of the preview document. Untimed lines (the
+    Date: header, blank lines, hand-written notes) take the key of the nearest
+    timed line above them, so `keys` stays sorted whenever the timed entries are.
+    """
+
+    def __init__(self, text=""):
+        self.lines = text.split('\n')
+        self.entries = [parse_line(line) for line in self.lines]
+        self.keys = []
+        last = -1
+        for entry in self.entries:
+            if entry is not None and entry.minutes is not None:
+                last = entry.minutes
+            self.keys.append(last)
+        # hand-edited days may be out of order; fall back to a linear scan for those
+        self.ordered = all(a <= b for a, b in zip(self.keys, self.keys[1:]))
+
+    def __len__(self):
+        return len(self.lines)
+
+    def is_blank(self):
+        return not any(line.strip() for line in self.lines)
+
+    def text(self):
+        return '\n'.join(self.lines)
+
+    def ensure_trailing_newline(self):
+        """Make the body end with an empty line; True if one had to be added"""
+        if self.lines[-1] == "":
+            return False
+        self.lines.append("")
+        self.entries.append(None)
+        self.keys.append(self.keys[-1])
+        return True
+
+    def find_position(self, minutes):
+        """Index of the first timed line later than `minutes` (end of the body if none)"""
+        end = len(self.lines) - 1 if self.lines[-1] == "" else len(self.lines)
+        if minutes is None:
+            return end
+        if self.ordered:
+            position = bisect_right(self.keys, minutes)
+        else:
+            position = len(self.lines)
+            for i, entry in enumerate(self.entries):
+                if entry is not None and entry.minutes is not None and entry.minutes > minutes:
+                    position = i
+                    break
+        return min(position, end)
+
+    def insert(self, line):
+        """Insert a journal line chronologically and return the line index it went to"""
+        entry = parse_line(line)
+        minutes = entry.minutes if entry is not None else None
+        position = self.find_position(minutes)
+
+        key = minutes if minutes is not None else (self.keys[position - 1] if position else -1)
+        self.lines.insert(position, line)
+        self.entries.insert(position, entry)
+        self.keys.insert(position, key)
+
+        # untimed lines right after the new one (only the trailing blank line) now inherit its key
+        i = position + 1
+        while i < len(self.lines) and (self.entries[i] is None or self.entries[i].minutes is None):
+            self.keys[i] = key
+            i += 1
+        return position
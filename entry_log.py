@@ -0,0 +1,246 @@
+import os
+import json
+import hashlib
+import threading
+from cache import DayCache, ParsedDay
+from day import DayLines
+from entry_parser import compose_day, parse_body, split_sections
+from persist import write_text
+
+
+def _digest(content):
+    return hashlib.blake2b((content or "").encode("utf-8"), digest_size=16).hexdigest()
+
+
+class EntryLog:
+    """Append-only log of journal changes per day, compacted into the day files.
+
+    Each add_entry appends one small record instead of rewriting the day. The
+    log is replayed on top of the day file when the day is read, and folded
+    into it (with an atomic write) shortly after the last append.
+    """
+
+    def __init__(self, store, sync_every=8, compact_delay=2.0, cache=None):
+        self.store = store
+        self.cache = cache if cache is not None else DayCache()
+        self.root = os.path.join(store.root, "log")
+        self.sync_every = sync_every
+        self.compact_delay = compact_delay
+        # the store's lock: a compaction writes and re-indexes the day under it
+        self.lock = store.lock
+        self._files = {}     # {date_str: open log file}
+        self._timers = {}    # {date_str: pending compaction timer}
+        self._unsynced = 0
+
+    def path_for(self, date_str):
+        return os.path.join(self.root, f"{date_str}.log")
+
+    def append(self, date_str, op, **fields):
+        """Append one record ('add' with a line, or 'edit' with body/notes/changes)"""
+        record = dict(fields, op=op)
+        with self.lock:
+            file = self._files.get(date_str)
+            if file is not None and not os.path.exists(self.path_for(date_str)):
+                # another process (e.g. the CLI) compacted this log under us: start a new one
+                file.close()
+                file = None
+            if file is None:
+                if not os.path.exists(self.root):
+                    os.makedirs(self.root)
+                file = open(self.path_for(date_str), 'a')
+                self._files[date_str] = file
+            file.write(json.dumps(record) + "\n")
+            file.flush()
+            self._unsynced += 1
+            if self._unsynced >= self.sync_every:
+                self.sync()
+        self.schedule_compaction(date_str)
+
+    def sync(self):
+        """fsync every open log (records are batched between syncs)"""
+        with self.lock:
+            for file in self._files.values():
+                os.fsync(file.fileno())
+            self._unsynced = 0
+
+    def pending(self, date_str):
+        return date_str in self._files or os.path.exists(self.path_for(date_str))
+
+    def pending_days(self):
+        """Dates with a log not yet folded into their day file"""
+        dates = set(self._files)
+        if os.path.exists(self.root):
+            dates.update(name[:-len(".log")] for name in os.listdir(self.root) if name.endswith(".log"))
+        return sorted(dates)
+
+    def _records(self, path):
+        records = []
+        if not os.path.exists(path):
+            return records
+        with open(path, 'r') as file:
+            for line in file:
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    break  # torn last record from a crash; everything before it is intact
+        return records
+
+    def read_day(self, date_str):
+        """Day content with any logged changes applied (None if neither exists)"""
+        with self.lock:
+            content = self.store.read_day(date_str)
+            records = self._records(self.path_for(date_str))
+        if not records:
+            return content
+        return self._apply(date_str, content or "", records)
+
+    def _stamp(self, date_str):
+        stamp = []
+        for path in (self.store.path_for(date_str), self.path_for(date_str)):
+            try:
+                stat = os.stat(path)
+                stamp.append((stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                stamp.append(None)
+        return tuple(stamp)
+
+    def read_parsed(self, date_str):
+        """The day as a ParsedDay, from the cache unless its files changed"""
+        # stat before reading: if the file changes in between, the next lookup just misses
+        stamp = self._stamp(date_str)
+        day = self.cache.get(date_str, stamp)
+        if day is None:
+            day = self._parse(self.read_day(date_str))
+            self.cache.put(date_str, stamp, day)
+        return day
+
+    def prefetch(self, dates):
+        """Parse days into the cache ahead of time (skipping ones already there)"""
+        for date_str in dates:
+            stamp = self._stamp(date_str)
+            if not self.cache.peek(date_str, stamp):
+                self.cache.put(date_str, stamp, self._parse(self.read_day(date_str)))
+
+    def _parse(self, content):
+        if content is None:
+            return ParsedDay(None, "", "")
+        journal_entry, notes_text, changes_text, _ = split_sections(content)
+        return ParsedDay(journal_entry, notes_text, changes_text, tuple(parse_body(journal_entry)))
+
+    def _apply(self, date_str, content, records):
+        journal_entry, notes_text, changes_text, _ = split_sections(content)
+        day = DayLines(journal_entry)
+        for record in records:
+            if record["op"] == "add":
+                if day.is_blank():
+                    day = DayLines(f"Date: {date_str}\n")
+                day.ensure_trailing_newline()
+                day.insert(record["line"])
+            elif record["op"] == "edit":
+                day = DayLines(record.get("body", ""))
+                notes_text = record.get("notes", "")
+                changes_text = record.get("changes", "")
+        return compose_day(day.text(), notes_text, changes_text)
+
+    def schedule_compaction(self, date_str):
+        with self.lock:
+            timer = self._timers.pop(date_str, None)
+            if timer is not None:
+                timer.cancel()
+            timer = threading.Timer(self.compact_delay, self.compact, args=(date_str,))
+            timer.daemon = True
+            self._timers[date_str] = timer
+            timer.start()
+
+    def compact(self, date_str):
+        """Fold the log into the day file and remove it"""
+        with self.lock:
+            timer = self._timers.pop(date_str, None)
+            if timer is not None:
+                timer.cancel()
+            file = self._files.pop(date_str, None)
+            if file is not None:
+                os.fsync(file.fileno())
+                file.close()
+            path = self.path_for(date_str)
+            if not os.path.exists(path):
+                return
+            # set the log aside first, so appends made while it is folded start a new one
+            compacting = path + ".compacting"
+            os.replace(path, compacting)
+            self._fold(date_str, compacting)
+
+    def _fold(self, date_str, path):
+        """Apply a set-aside log to the day file, then remove it.
+
+        What the day will hold is noted beside the log first, so after a crash
+        recover() can tell by content whether the day was written.
+        """
+        records = self._records(path)
+        marker = path + ".folded"
+        if records:
+            content = self._apply(date_str, self.store.read_day(date_str) or "", records)
+            write_text(marker, _digest(content))
+            self.store.write_day(date_str, content)
+        os.remove(path)
+        if os.path.exists(marker):
+            os.remove(marker)
+
+    def _folded(self, date_str, path):
+        """True if the day file holds exactly what folding this set-aside log wrote"""
+        try:
+            with open(path + ".folded", 'r') as file:
+                expected = file.read()
+        except FileNotFoundError:
+            return False  # the crash came before the day was written
+        return _digest(self.store.read_day(date_str)) == expected
+
+    def recover(self):
+        """Finish compactions interrupted by a crash and compact any leftover logs"""
+        with self.lock:
+            if not os.path.exists(self.root):
+                return
+            names = os.listdir(self.root)
+            for name in names:
+                if not name.endswith(".log.compacting"):
+                    continue
+                date_str = name[:-len(".log.compacting")]
+                path = os.path.join(self.root, name)
+                if self._folded(date_str, path):
+                    os.remove(path)
+                    os.remove(path + ".folded")
+                else:
+                    # not written, or changed since by something else: replay the records on
+                    # top of what the day holds now rather than risk dropping them
+                    self._fold(date_str, path)
+            for name in names:
+                # a crash between removing a folded log and its marker
+                if name.endswith(".folded") and name[:-len(".folded")] not in names:
+                    os.remove(os.path.join(self.root, name))
+            self.compact_all()
+
+    def compact_all(self):
+        """Compact every day that has a log"""
+        with self.lock:
+            for date_str in self.pending_days():
+                self.compact(date_str)
+
+    def discard(self, date_str):
+        """Drop a day's logged changes without folding them in (the day file wins)"""
+        with self.lock:
+            timer = self._timers.pop(date_str, None)
+            if timer is not None:
+                timer.cancel()
+            file = self._files.pop(date_str, None)
+            if file is not None:
+                file.close()
+            if os.path.exists(self.path_for(date_str)):
+                os.remove(self.path_for(date_str))
+        self.cache.invalidate(date_str)
+
+    def hold(self, date_str):
+        """Cancel a day's pending compaction; its log waits for the next append, compact() or discard()"""
+        with self.lock:
+            timer = self._timers.pop(date_str, None)
+            if timer is not None:
+                timer.cancel()
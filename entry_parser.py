@@ -0,0 +1,222 @@
+import re
+from typing import NamedTuple, Optional, Tuple
+
+
+# "9:30am rest of the line" - the time is optional so hand-written lines still parse
+_LINE = re.compile(r'^(?:(?P<hour>\d{1,2}):(?P<minute>\d{2})\s?(?P<period>[ap]m)\s+)?(?P<rest>\S.*)$', re.IGNORECASE)
+_TIME = re.compile(r'^(?P<hour>\d{1,2}):(?P<minute>\d{2})\s?(?P<period>[ap]m)$', re.IGNORECASE)
+_MEDICATION = re.compile(r'^took medication\s*-\s*(?P<item>.*?)(?:\s*\((?P<dosage>\d+(?:\.\d+)?\s*mg)\))?\s*$')
+_HAVING = re.compile(r'^(?P<kind>started|finished) having\s+(?P<item>.*?)(?:\s*\brating\b:?\s*(?P<rating>\d+).*)?$')
+_VERB = re.compile(r'^(?P<kind>took|ate|drink|started|finished)\s+(?P<item>.*)$')
+_COUNT = re.compile(r'^(?P<count>\d+)\s+(?P<item>\S.*)$')
+_ITEM_SEP = re.compile(r'\s*,\s*')
+_RATING = re.compile(r'\brating\b:?\s*(?P<rating>\d+)')
+_SPACES = re.compile(r'\s+')
+
+_TYPES = {"took": "Supplement", "ate": "Food", "drink": "Drink", "started": "Activity", "finished": "Activity"}
+
+
+class Entry(NamedTuple):
+    """One parsed journal line"""
+    line: str
+    time: Optional[str]       # as written, lowercased (e.g. '9:30am')
+    minutes: Optional[int]    # minutes since midnight
+    kind: Optional[str]       # took / medication / ate / drink / started / finished (None for Daily text)
+    type: str                 # entry type as in the Type combo (Food, Discomfort, ...)
+    items: Tuple[str, ...]
+    quantities: Tuple[int, ...]
+    rating: Optional[int] = None
+    dosage: Optional[str] = None
+
+
+def normalize_text(text):
+    """Case-insensitive, trimmed form used to compare item names"""
+    if text is None:
+        return ""
+    return text.casefold().strip()
+
+
+def _to_minutes(hour, minute, period):
+    hours = int(hour)
+    period = period.lower()
+    # Convert to 24-hour format for proper sorting
+    if period == 'pm' and hours != 12:
+        hours += 12
+    elif period == 'am' and hours == 12:
+        hours = 0
+    return hours * 60 + int(minute)
+
+
+def parse_time(time_str):
+    """'2:15pm' -> 855 (minutes since midnight), None if not a time"""
+    if not time_str:
+        return None
+    match = _TIME.match(time_str.strip())
+    if not match:
+        return None
+    return _to_minutes(match.group('hour'), match.group('minute'), match.group('period'))
+
+
+def format_time(minutes):
+    """855 -> '2:15pm' (same format as QTime 'h:mma' lowercased)"""
+    hours, mins = divmod(minutes, 60)
+    period = 'am' if hours < 12 else 'pm'
+    hours = hours % 12 or 12
+    return f"{hours}:{mins:02d}{period}"
+
+
+def _split_items(text):
+    items = []
+    quantities = []
+    for part in _ITEM_SEP.split(text.strip()):
+        if not part:
+            continue
+        match = _COUNT.match(part)
+        if match:
+            items.append(match.group('item'))
+            quantities.append(int(match.group('count')))
+        else:
+            items.append(part)
+            quantities.append(1)
+    return tuple(items), tuple(quantities)
+
+
+def dosage_mg(dosage):
+    """'5mg' -> 5.0 (None if there is no dosage)"""
+    if not dosage:
+        return None
+    try:
+        return float(dosage.lower().replace("mg", "").strip())
+    except ValueError:
+        return None
+
+
+def parse_line(line):
+    """Parse a single journal line into an Entry (None for blank lines and the Date: header)"""
+    line = line.strip()
+    if not line or line.startswith('Date:'):
+        return None
+    match = _LINE.match(line)
+    if not match:
+        return None
+
+    if match.group('hour') is not None:
+        time_str = line[:match.start('rest')].strip().lower()
+        minutes = _to_minutes(match.group('hour'), match.group('minute'), match.group('period'))
+    else:
+        time_str = None
+        minutes = None
+    rest = match.group('rest')
+
+    medication = _MEDICATION.match(rest)
+    if medication:
+        return Entry(line, time_str, minutes, "medication", "Medication",
+                     (medication.group('item'),), (1,), dosage=medication.group('dosage'))
+
+    having = _HAVING.match(rest)
+    if having:
+        rating = having.group('rating')
+        return Entry(line, time_str, minutes, having.group('kind'), "Discomfort",
+                     (having.group('item').strip(),), (1,),
+                     rating=int(rating) if rating is not None else None)
+
+    verb = _VERB.match(rest)
+    if verb:
+        kind = verb.group('kind')
+        if kind in ("started", "finished"):
+            items, quantities = (verb.group('item').strip(),), (1,)
+        else:
+            items, quantities = _split_items(verb.group('item'))
+        return Entry(line, time_str, minutes, kind, _TYPES[kind], items, quantities)
+
+    return Entry(line, time_str, minutes, None, "Daily", (rest,), (1,))
+
+
+def parse_body(journal_content):
+    """Parse every entry line of a journal body, in order"""
+    entries = []
+    for line in journal_content.split('\n'):
+        entry = parse_line(line)
+        if entry is not None:
+            entries.append(entry)
+    return entries
+
+
+def sort_key(line):
+    """Chronological sort key for a journal line (untimed lines sort first)"""
+    match = _LINE.match(line.strip())
+    if not match or match.group('hour') is None:
+        return 0
+    return _to_minutes(match.group('hour'), match.group('minute'), match.group('period'))
+
+
+def sort_journal(journal_content):
+    """Date: header first, then the other lines by time (stable, untimed lines first)"""
+    lines = journal_content.strip().split('\n')
+    header_lines = [line for line in lines if line.startswith('Date:')]
+    entry_lines = [line for line in lines if not line.startswith('Date:')]
+    entry_lines.sort(key=sort_key)
+    return '\n'.join(header_lines + entry_lines) + '\n'
+
+
+def normalize_line(line):
+    """A line as the app writes it: canonical time, single spaces, ', ' between
+    items and 'rating N' (None for a blank line)"""
+    line = _SPACES.sub(' ', line).strip()
+    if not line or line.startswith('Date:'):
+        return line or None
+    entry = parse_line(line)
+    if entry is None:
+        return line
+    rest = line[len(entry.time):].strip() if entry.time else line
+    if entry.type == "Discomfort":
+        rest = _RATING.sub(lambda match: f"rating {match.group('rating')}", rest, count=1)
+    elif entry.kind in ("took", "ate", "drink"):
+        rest = _ITEM_SEP.sub(", ", rest)
+    if entry.minutes is None:
+        return rest
+    return f"{format_time(entry.minutes)} {rest}"
+
+
+def normalize_journal(journal_content):
+    """Every line normalized, blank lines dropped, sorted by time"""
+    lines = (normalize_line(line) for line in journal_content.split('\n'))
+    return sort_journal('\n'.join(line for line in lines if line))
+
+
+def split_sections(content):
+    """Split a day file into (journal, notes, changes) and the offset where the journal ends"""
+    idx_notes = content.find("Notes:")
+    idx_changes = content.find("Changes:")
+
+    # journal portion is the content before the earliest marker (if any)
+    indices = [i for i in [idx_notes, idx_changes] if i != -1]
+    if indices:
+        body_end = min(indices)
+        journal_entry = content[:body_end].strip()
+    else:
+        body_end = len(content)
+        journal_entry = content
+
+    notes_text = ""
+    if idx_notes != -1:
+        start = idx_notes + len("Notes:")
+        end = len(content) if idx_changes == -1 else idx_changes
+        notes_text = content[start:end].strip()
+
+    changes_text = ""
+    if idx_changes != -1:
+        start = idx_changes + len("Changes:")
+        changes_text = content[start:].strip()
+
+    return journal_entry, notes_text, changes_text, body_end
+
+
+def compose_day(journal_content, notes_content="", changes_content=""):
+    """Inverse of split_sections: build the text of a day file"""
+    full_content = journal_content.rstrip()
+    if notes_content:
+        full_content += f"\n\nNotes: {notes_content}"
+    if changes_content:
+        full_content += f"\n\nChanges: {changes_content}"
+    return full_content
@@ -0,0 +1,217 @@
+import os
+import json
+import threading
+from datetime import datetime
+from typing import NamedTuple, Optional
+from entry_parser import format_time, normalize_text
+from persist import read_json, write_text
+from store import date_ordinal
+
+
+class Episode(NamedTuple):
+    name: str
+    start_date: str             # dd-MM-yyyy
+    start_minutes: int          # minutes since midnight
+    end_date: Optional[str]     # None while the discomfort is still going
+    end_minutes: Optional[int]
+    ratings: tuple              # ((date_str, minutes, rating), ...) one per "started" line
+
+    @property
+    def rating(self):
+        """The latest rating"""
+        return self.ratings[-1][2]
+
+    @property
+    def start(self):
+        """Start as absolute minutes (day ordinal * 1440 + minutes)"""
+        return date_ordinal(self.start_date) * 1440 + self.start_minutes
+
+    @property
+    def end(self):
+        if self.end_date is None:
+            return None
+        return date_ordinal(self.end_date) * 1440 + self.end_minutes
+
+    def duration(self, now=None):
+        """Length in minutes; an open episode counts up to now"""
+        end = self.end
+        if end is None:
+            now = now or datetime.now()
+            end = now.toordinal() * 1440 + now.hour * 60 + now.minute
+        return max(end - self.start, 0)
+
+
+def discomfort_events(entries):
+    """[minutes, "started"/"finished", name, rating] for the discomfort lines of a day, in time order"""
+    events = []
+    for entry in entries:
+        if entry.type != "Discomfort" or not entry.items:
+            continue
+        # untimed lines count from midnight, as sort_key orders them
+        minutes = max(entry.minutes or 0, 0)
+        if entry.kind == "started" and entry.rating is not None:
+            events.append([minutes, "started", entry.items[0], entry.rating])
+        elif entry.kind == "finished":
+            events.append([minutes, "finished", entry.items[0], None])
+    events.sort(key=lambda event: event[0])
+    return events
+
+
+class EpisodeStore:
+    """Discomfort episodes across days, from the first "started" line to the "finished" one.
+
+    Each day's discomfort lines are kept here; when a store listener call
+    changes them, the episodes are rewound to the start of that day and
+    replayed from there, so only that day and the ones after it are looked
+    at (usually just today).
+    """
+
+    def __init__(self, root="Journal"):
+        self.path = os.path.join(root, "episodes.json")
+        self.days = {}      # {date_str: {"ordinal", "mtime", "size", "events": [...]}}
+        # [{"name", "start": [date, minutes], "ratings": [[date, minutes, rating]], "end": None or [date, minutes]}]
+        self.episodes = []  # ordered by start
+        self._dirty = False
+        self._lock = threading.RLock()
+        self.load()
+
+    def _ordinal(self, date_str):
+        day = self.days.get(date_str)
+        return day["ordinal"] if day else date_ordinal(date_str)
+
+    def update_day(self, date_str, entries, record):
+        """Replace one day's discomfort lines (entries None removes the day)"""
+        with self._lock:
+            old = self.days.get(date_str)
+            events = discomfort_events(entries) if entries is not None else None
+            if events is None:
+                if old is None:
+                    return
+                del self.days[date_str]
+            else:
+                self.days[date_str] = {"ordinal": record["ordinal"], "mtime": record["mtime"],
+                                       "size": record["size"], "events": events}
+                if old is not None and old["events"] == events:
+                    self._dirty = True  # only the stamp moved
+                    return
+            self._replay_from(date_ordinal(date_str))
+            self._dirty = True
+
+    def _rewind(self, ordinal, episodes):
+        """Copies of the episodes as they stood at the start of day `ordinal`"""
+        kept = []
+        for episode in episodes:
+            if self._ordinal(episode["start"][0]) >= ordinal:
+                continue
+            ratings = [rating for rating in episode["ratings"] if self._ordinal(rating[0]) < ordinal]
+            end = episode["end"]
+            if end is not None and self._ordinal(end[0]) >= ordinal:
+                end = None
+            kept.append({"name": episode["name"], "start": episode["start"], "ratings": ratings, "end": end})
+        return kept
+
+    @staticmethod
+    def _apply(episodes, still_open, date_str, events):
+        for minutes, kind, name, rating in events:
+            key = normalize_text(name)
+            episode = still_open.get(key)
+            if kind == "started":
+                if episode is None:
+                    episode = {"name": name, "start": [date_str, minutes], "ratings": [], "end": None}
+                    episodes.append(episode)
+                    still_open[key] = episode
+                episode["ratings"].append([date_str, minutes, rating])
+            elif episode is not None:
+                episode["end"] = [date_str, minutes]
+                del still_open[key]
+
+    def _replay(self, ordinal, override=None):
+        """Episodes rewound to day `ordinal` and replayed over it and every later day.
+
+        `override` is (date_str, events) to use instead of what is stored for that day.
+        """
+        episodes = self._rewind(ordinal, self.episodes)
+        still_open = {normalize_text(episode["name"]): episode for episode in episodes if episode["end"] is None}
+        days = {date_str: day["events"] for date_str, day in self.days.items() if day["ordinal"] >= ordinal}
+        if override is not None:
+            days[override[0]] = override[1]
+        for date_str in sorted(days, key=self._ordinal):
+            self._apply(episodes, still_open, date_str, days[date_str])
+        return episodes
+
+    def _replay_from(self, ordinal):
+        self.episodes = self._replay(ordinal)
+
+    @staticmethod
+    def _episode(episode):
+        end = episode["end"]
+        return Episode(episode["name"], episode["start"][0], episode["start"][1],
+                       end[0] if end else None, end[1] if end else None,
+                       tuple(tuple(rating) for rating in episode["ratings"]))
+
+    def query(self, name=None, start=None, end=None):
+        """Episodes (optionally of one discomfort) overlapping the dates start..end, oldest first"""
+        lo = date_ordinal(start) if start else None
+        hi = date_ordinal(end) if end else None
+        name_norm = normalize_text(name) if name else None
+        result = []
+        with self._lock:
+            for episode in self.episodes:
+                if name_norm is not None and normalize_text(episode["name"]) != name_norm:
+                    continue
+                if hi is not None and self._ordinal(episode["start"][0]) > hi:
+                    continue
+                if lo is not None and episode["end"] is not None and self._ordinal(episode["end"][0]) < lo:
+                    continue
+                result.append(self._episode(episode))
+        return result
+
+    def active(self):
+        """{name: Episode} for the episodes that have not finished"""
+        with self._lock:
+            return {episode["name"]: self._episode(episode) for episode in self.episodes if episode["end"] is None}
+
+    def overlaps(self, start=None, end=None, now=None):
+        """Pairs of episodes of different discomforts that were going at the same time"""
+        episodes = sorted(self.query(start=start, end=end), key=lambda episode: episode.start)
+        now = now or datetime.now()
+        now_minutes = now.toordinal() * 1440 + now.hour * 60 + now.minute
+        pairs = []
+        going = []  # (end, episode) of the episodes still going at the current start
+        for episode in episodes:
+            going = [(until, other) for until, other in going if until > episode.start]
+            for _, other in going:
+                if normalize_text(other.name) != normalize_text(episode.name):
+                    pairs.append((other, episode))
+            until = episode.end if episode.end is not None else now_minutes
+            going.append((until, episode))
+        return pairs
+
+    def active_with(self, date_str, entries):
+        """Active discomforts ({name: {"rating", "start_time", "start_date"}}) if
+        `date_str` held `entries`, e.g. the journal being edited. Nothing is stored."""
+        ordinal = date_ordinal(date_str)
+        with self._lock:
+            episodes = self._replay(ordinal, override=(date_str, discomfort_events(entries)))
+        active = {}
+        for episode in episodes:
+            if episode["end"] is None and episode["ratings"]:
+                # like adding a "started" entry, the latest one sets the rating and time
+                rated_date, minutes, rating = episode["ratings"][-1]
+                active[episode["name"]] = {"rating": rating, "start_time": format_time(minutes),
+                                           "start_date": rated_date}
+        return active
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            text = json.dumps({"days": self.days, "episodes": self.episodes})
+            self._dirty = False
+        write_text(self.path, text)
+
+    def load(self):
+        data = read_json(self.path, {}, backups=0)
+        # missing or corrupted: the days' events come back through sync_listener() and are replayed
+        self.days = data.get("days", {})
+        self.episodes = data.get("episodes", [])
@@ -0,0 +1,201 @@
+"""Columnar export of the whole journal history.
+
+The file is a small JSON header followed by one fixed-width column per
+field, each 8-byte aligned so it can be memory-mapped and viewed without
+parsing (memoryview.cast here, or numpy.frombuffer downstream):
+
+    day      int32  day number (date.toordinal())
+    minutes  int16  minutes since midnight, -1 if the line had no time
+    kind     int16  code into header["kinds"]
+    item     int32  code into header["items"]
+    quantity int16  count written before the item ("2 vit c" -> 2)
+    rating   int8   discomfort rating, -1 if none
+    dosage   int16  dosage in mg, -1 if none
+
+There is one row per item, so "took zinc, vit c" gives two rows.
+"""
+import os
+import sys
+import json
+import mmap
+import argparse
+from array import array
+from entry_parser import dosage_mg, parse_body
+from store import JournalStore, date_ordinal
+
+
+MAGIC = b"JCOL0001"
+COLUMNS = [("day", "i"), ("minutes", "h"), ("kind", "h"), ("item", "i"),
+           ("quantity", "h"), ("rating", "b"), ("dosage", "h")]
+
+
+def _align(n):
+    return (n + 7) & ~7
+
+
+class _Builder:
+    """Accumulates rows column by column, with dictionary encoding for kind/item"""
+
+    def __init__(self, kinds=None, items=None):
+        self.columns = {name: array(code) for name, code in COLUMNS}
+        self.kinds = list(kinds or [])
+        self.items = list(items or [])
+        self._kind_codes = {kind: i for i, kind in enumerate(self.kinds)}
+        self._item_codes = {item: i for i, item in enumerate(self.items)}
+        self.days = {}  # {date_str: [mtime, size, row_start, row_count]}
+
+    def _code(self, codes, values, value):
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(values)
+            values.append(value)
+        return code
+
+    def add_day(self, date_str, record, entries):
+        start = len(self.columns["day"])
+        ordinal = date_ordinal(date_str)
+        columns = self.columns
+        for entry in entries:
+            kind = self._code(self._kind_codes, self.kinds, entry.kind or "daily")
+            minutes = entry.minutes if entry.minutes is not None else -1
+            rating = entry.rating if entry.rating is not None else -1
+            mg = dosage_mg(entry.dosage)
+            dosage = int(mg) if mg is not None else -1
+            for item, quantity in zip(entry.items, entry.quantities):
+                columns["day"].append(ordinal)
+                columns["minutes"].append(minutes)
+                columns["kind"].append(kind)
+                columns["item"].append(self._code(self._item_codes, self.items, item))
+                columns["quantity"].append(min(quantity, 32767))
+                columns["rating"].append(max(-1, min(rating, 127)))
+                columns["dosage"].append(min(dosage, 32767))
+        self.days[date_str] = [record["mtime"], record["size"], start, len(columns["day"]) - start]
+
+    def copy_day(self, date_str, source):
+        """Copy a day's rows unchanged from an existing export (codes are kept stable)"""
+        mtime, size, start, count = source.days[date_str]
+        new_start = len(self.columns["day"])
+        for name, _ in COLUMNS:
+            self.columns[name].frombytes(source.column(name)[start:start + count].cast("B"))
+        self.days[date_str] = [mtime, size, new_start, count]
+
+    def write(self, path):
+        rows = len(self.columns["day"])
+        header = {"version": 1, "rows": rows, "byteorder": sys.byteorder,
+                  "kinds": self.kinds, "items": self.items, "days": self.days, "columns": {}}
+
+        # the header holds the column offsets, so size it first with placeholder offsets
+        layout = {name: {"type": code, "offset": 0} for name, code in COLUMNS}
+        header["columns"] = layout
+        header_size = len(json.dumps(header).encode("utf-8")) + 256
+        offset = _align(len(MAGIC) + 8 + header_size)
+        for name, code in COLUMNS:
+            layout[name]["offset"] = offset
+            offset = _align(offset + rows * array(code).itemsize)
+        header_bytes = json.dumps(header).encode("utf-8").ljust(header_size)
+
+        temp_path = path + ".tmp"
+        with open(temp_path, 'wb') as file:
+            file.write(MAGIC)
+            file.write(len(header_bytes).to_bytes(8, "little"))
+            file.write(header_bytes)
+            for name, _ in COLUMNS:
+                file.write(b"\0" * (layout[name]["offset"] - file.tell()))
+                self.columns[name].tofile(file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, path)
+        return rows
+
+
+class ColumnarExport:
+    """Read-only, zero-copy view of an export file"""
+
+    def __init__(self, path):
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a journal export")
+        header_length = int.from_bytes(self._map[len(MAGIC):len(MAGIC) + 8], "little")
+        start = len(MAGIC) + 8
+        self.header = json.loads(self._map[start:start + header_length].decode("utf-8"))
+        if self.header["byteorder"] != sys.byteorder:
+            self.close()
+            raise ValueError(f"{path} was written on a {self.header['byteorder']}-endian machine")
+        self.rows = self.header["rows"]
+        self.kinds = self.header["kinds"]
+        self.items = self.header["items"]
+        self.days = self.header["days"]
+
+    def column(self, name):
+        """The column as a memoryview straight over the mapped file"""
+        info = self.header["columns"][name]
+        size = array(info["type"]).itemsize
+        view = memoryview(self._map)[info["offset"]:info["offset"] + self.rows * size]
+        return view.cast(info["type"])
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def export_journal(path, store=None, incremental=False):
+    """Write every indexed day to `path`; with incremental, reuse rows of unchanged days.
+
+    Returns (rows, days re-parsed).
+    """
+    if store is None:
+        store = JournalStore()
+        store.refresh()
+    # a store that is passed in is kept up to date by its owner (the window's watcher);
+    # refreshing it here would take outside changes in before the window sees them
+
+    previous = None
+    if incremental and os.path.exists(path):
+        try:
+            previous = ColumnarExport(path)
+        except (ValueError, KeyError, json.JSONDecodeError):
+            previous = None  # unreadable or foreign file: do a full export
+
+    builder = _Builder(previous.kinds, previous.items) if previous else _Builder()
+    parsed = 0
+    try:
+        # the records as they are now (compactions may re-index days meanwhile)
+        with store.lock:
+            records = [(date_str, dict(store.index[date_str])) for date_str in store.days()]
+        # stream day by day, oldest first
+        for date_str, record in records:
+            old = previous.days.get(date_str) if previous else None
+            if old is not None and old[0] == record["mtime"] and old[1] == record["size"]:
+                builder.copy_day(date_str, previous)
+                continue
+            body = store.read_body(date_str)
+            if body is None:
+                continue
+            builder.add_day(date_str, record, parse_body(body))
+            parsed += 1
+    finally:
+        if previous is not None:
+            previous.close()
+    return builder.write(path), parsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export all journal entries to a columnar file")
+    parser.add_argument("output", nargs="?", default="journal.jcol")
+    parser.add_argument("--incremental", action="store_true",
+                        help="only re-parse days whose files changed since the last export")
+    args = parser.parse_args(argv)
+    rows, parsed = export_journal(args.output, incremental=args.incremental)
+    print(f"Wrote {rows} rows to {args.output} ({parsed} days parsed)")
+
+
+if __name__ == "__main__":
+    main()
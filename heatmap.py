@@ -0,0 +1,204 @@
+from datetime import date, timedelta
+from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QWidget, QLabel,
+                               QPushButton, QComboBox, QToolTip)
+from PySide6.QtCore import Qt, QDate, QRectF, Signal
+from PySide6.QtGui import QPainter, QColor
+from aggregates import INTAKE_TYPES
+
+
+EMPTY_COLOR = QColor("#ebedf0")  # no journal that day
+ZERO_COLOR = QColor("#d9dce1")   # a journal, but none of the metric
+WEEKDAYS = {0: "Mon", 2: "Wed", 4: "Fri"}
+MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+
+# (label, aggregates metric, color of the highest value)
+METRIC_CHOICES = [
+    ("Entries", "count", QColor("#216e39")),
+    ("Max discomfort rating", "max_rating", QColor("#b3261e")),
+    ("Discomfort minutes", "discomfort_minutes", QColor("#b3261e")),
+    ("Medication entries", "type:Medication", QColor("#3949ab")),
+]
+ITEM_COLOR = QColor("#8e24aa")
+
+
+def _shade(color, level):
+    """color faded towards white; level from 0 (faint) to 1 (full)"""
+    fade = 0.75 * (1 - level)
+    return QColor(int(color.red() + (255 - color.red()) * fade),
+                  int(color.green() + (255 - color.green()) * fade),
+                  int(color.blue() + (255 - color.blue()) * fade))
+
+
+class YearHeatmap(QWidget):
+    """One year as week columns of day cells, colored by a per-day value.
+
+    The cells are laid out once per resize or new values, so a repaint is a
+    single pass of rectangle fills with no file access.
+    """
+
+    dayClicked = Signal(QDate)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.year = date.today().year
+        self.values = {}      # {date: value} (days without a journal are left out)
+        self.color = METRIC_CHOICES[0][2]
+        self.selected = None
+        self._cells = []      # [(QRectF, QColor, date)]
+        self._labels = []     # [(x, y, text)]
+        self.setMouseTracking(True)
+        self.setMinimumSize(640, 130)
+
+    def set_values(self, year, values, color):
+        self.year, self.values, self.color = year, values, color
+        self._layout()
+        self.update()
+
+    def set_selected(self, day):
+        self.selected = day
+        self.update()
+
+    def _first_monday(self):
+        first = date(self.year, 1, 1)
+        return first - timedelta(days=first.weekday())
+
+    def _geometry(self):
+        left, top = 30, 16
+        cell = min((self.width() - left - 2) / 53, (self.height() - top - 2) / 7)
+        return left, top, max(cell, 4)
+
+    def _layout(self):
+        left, top, cell = self._geometry()
+        gap = 2 if cell > 8 else 1
+        positive = [value for value in self.values.values() if value > 0]
+        lowest, highest = (min(positive), max(positive)) if positive else (0, 0)
+        first_monday = self._first_monday()
+        self._cells, self._labels = [], []
+        day = date(self.year, 1, 1)
+        while day.year == self.year:
+            column = (day - first_monday).days // 7
+            rect = QRectF(left + column * cell, top + day.weekday() * cell, cell - gap, cell - gap)
+            value = self.values.get(day)
+            if value is None:
+                color = EMPTY_COLOR
+            elif value <= 0:
+                color = ZERO_COLOR
+            else:
+                # four steps like a contribution graph, spread over the year's range
+                step = int(4 * (value - lowest) / (highest - lowest)) if highest > lowest else 3
+                color = _shade(self.color, min(step, 3) / 3)
+            self._cells.append((rect, color, day))
+            if day.day == 1:
+                self._labels.append((left + column * cell, top - 4, MONTHS[day.month - 1]))
+            day += timedelta(days=1)
+        for weekday, text in WEEKDAYS.items():
+            self._labels.append((0, top + weekday * cell + cell * 0.8, text))
+
+    def resizeEvent(self, event):
+        self._layout()
+        super().resizeEvent(event)
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        for rect, color, day in self._cells:
+            painter.fillRect(rect, color)
+            if day == self.selected:
+                painter.setPen(Qt.black)
+                painter.drawRect(rect)
+        painter.setPen(self.palette().text().color())
+        for x, y, text in self._labels:
+            painter.drawText(int(x), int(y), text)
+        painter.end()
+
+    def day_at(self, position):
+        for rect, _, day in self._cells:
+            if rect.contains(position):
+                return day
+        return None
+
+    def mousePressEvent(self, event):
+        day = self.day_at(event.position())
+        if day is not None and event.button() == Qt.LeftButton:
+            self.set_selected(day)
+            self.dayClicked.emit(QDate(day.year, day.month, day.day))
+        super().mousePressEvent(event)
+
+    def mouseMoveEvent(self, event):
+        day = self.day_at(event.position())
+        if day is None:
+            QToolTip.hideText()
+        else:
+            value = self.values.get(day)
+            text = day.strftime("%a %d-%m-%Y") + ("  no journal" if value is None else f"  {value:g}")
+            QToolTip.showText(event.globalPosition().toPoint(), text, self)
+        super().mouseMoveEvent(event)
+
+
+class HeatmapDialog(QDialog):
+    """A year of days colored by a chosen metric from the per-day aggregates;
+    clicking a day opens it in the window"""
+
+    def __init__(self, parent=None, aggregates=None, type_options=None, on_day=None):
+        super().__init__(parent)
+        self.setWindowTitle("Calendar")
+        self.resize(900, 220)
+        self.aggregates = aggregates
+        self.on_day = on_day
+        layout = QVBoxLayout()
+
+        controls = QHBoxLayout()
+        self.prev_btn = QPushButton("<")
+        self.prev_btn.clicked.connect(lambda: self.set_year(self.heatmap.year - 1))
+        self.year_label = QLabel()
+        self.next_btn = QPushButton(">")
+        self.next_btn.clicked.connect(lambda: self.set_year(self.heatmap.year + 1))
+        self.metric_combo = QComboBox()
+        for label, metric, color in METRIC_CHOICES:
+            self.metric_combo.addItem(label, (metric, color))
+        # "took X" for each intake item the user has logged
+        for entry_type in INTAKE_TYPES:
+            for item in (type_options or {}).get(entry_type, []):
+                self.metric_combo.addItem(f"{entry_type}: {item}", (f"item:{item}", ITEM_COLOR))
+        self.metric_combo.currentIndexChanged.connect(self.refresh)
+        controls.addWidget(self.prev_btn)
+        controls.addWidget(self.year_label)
+        controls.addWidget(self.next_btn)
+        controls.addStretch(1)
+        controls.addWidget(QLabel("Color by:"))
+        controls.addWidget(self.metric_combo)
+        layout.addLayout(controls)
+
+        self.heatmap = YearHeatmap()
+        self.heatmap.dayClicked.connect(self.day_clicked)
+        layout.addWidget(self.heatmap, 1)
+        self.setLayout(layout)
+        self.refresh()
+
+    def set_year(self, year):
+        self.heatmap.year = year
+        self.refresh()
+
+    def show_date(self, qdate):
+        """Select the date shown in the window (switching year if needed)"""
+        day = date(qdate.year(), qdate.month(), qdate.day())
+        if day.year != self.heatmap.year:
+            self.heatmap.year = day.year
+            self.refresh()
+        self.heatmap.set_selected(day)
+
+    def refresh(self):
+        """Re-read the metric for the shown year from the aggregates"""
+        year = self.heatmap.year
+        self.year_label.setText(str(year))
+        metric, color = self.metric_combo.currentData()
+        values = {}
+        if self.aggregates is not None:
+            per_day = self.aggregates.metric(metric, f"01-01-{year}", f"31-12-{year}")
+            for date_str, value in per_day.items():
+                day, month, year_ = (int(part) for part in date_str.split("-"))
+                values[date(year_, month, day)] = value
+        self.heatmap.set_values(year, values, color)
+
+    def day_clicked(self, qdate):
+        if self.on_day is not None:
+            self.on_day(qdate)
@@ -0,0 +1,163 @@
+"""Command-line journal, without starting the window.
+
+    python journal.py add supplement "zinc"
+    python journal.py add discomfort anxiety --rating 2 --time 9:30am
+    python journal.py add discomfort anxiety --end
+    python journal.py show 18-10-2026
+    python journal.py search ashwagandha
+    python journal.py episodes anxiety --from 01-09-2026
+    python journal.py --backend sqlite show
+"""
+import sys
+import argparse
+from core import (create_core, BACKENDS, ENTRY_TYPES, format_entry, learn_item, track_discomfort,
+                  now_time_str, today_str)
+from entry_parser import compose_day, format_time, parse_time
+from store import date_ordinal
+import options
+
+
+def _entry_type(name):
+    for entry_type in ENTRY_TYPES:
+        if entry_type.casefold() == name.casefold():
+            return entry_type
+    raise argparse.ArgumentTypeError(f"unknown type '{name}' (choose from {', '.join(ENTRY_TYPES)})")
+
+
+def _date(value):
+    if date_ordinal(value) is None:
+        raise argparse.ArgumentTypeError(f"'{value}' is not a dd-mm-yyyy date")
+    return value
+
+
+def _time(value):
+    minutes = parse_time(value)
+    if minutes is None:
+        raise argparse.ArgumentTypeError(f"'{value}' is not a time like 9:30am")
+    return format_time(minutes)
+
+
+def cmd_add(args):
+    item = " ".join(args.item).strip()
+    time_str = args.time or now_time_str()
+    line = format_entry(args.type, item, time_str, started=not args.end, rating=args.rating,
+                        dosage=args.dosage, fish_kind=args.fish, fish_qty=args.qty)
+    if line is None:
+        print("Nothing to add: an item is required for this type", file=sys.stderr)
+        return 1
+
+    # the search index catches up with this day the next time the app starts
+    core = create_core(backend=args.backend, with_search=False)
+    type_options = options.load_type_options(read=core.read_state)
+    if learn_item(type_options, args.type, item):
+        core.write_state(options.TYPE_OPTIONS_FILE, options.as_json(type_options))
+    if args.type == "Discomfort":
+        active_discomforts = options.load_active_discomforts(read=core.read_state)
+        if track_discomfort(active_discomforts, item, not args.end, args.rating, time_str, args.date):
+            core.write_state(options.ACTIVE_DISCOMFORTS_FILE, active_discomforts)
+
+    core.add(args.date, line)
+    core.log.compact(args.date)
+    core.store.flush()
+    print(line)
+    return 0
+
+
+def cmd_show(args):
+    day = create_core(backend=args.backend, with_search=False).read(args.date)
+    if day.journal is None:
+        print(f"No journal for {args.date}", file=sys.stderr)
+        return 1
+    print(compose_day(day.journal, day.notes, day.changes))
+    return 0
+
+
+def cmd_search(args):
+    core = create_core(backend=args.backend)
+    core.open(read_only=True)
+    hits = core.search_index.lookup(args.query, exact=args.exact)
+    if not hits:
+        print(f"No entries found for \"{args.query}\"", file=sys.stderr)
+        return 1
+    for hit in hits[:args.limit] if args.limit else hits:
+        hit_time = format_time(hit.minutes) if hit.minutes >= 0 else ""
+        print(f"{hit.date} {hit_time:>7} {hit.kind} {hit.item}")
+    return 0
+
+
+def _duration(minutes):
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h{minutes:02d}m"
+
+
+def _stamp(date_str, minutes):
+    return f"{date_str} {format_time(minutes)}" if date_str else "ongoing"
+
+
+def cmd_episodes(args):
+    core = create_core(backend=args.backend, with_search=False)
+    core.open(read_only=True)
+    if args.overlapping:
+        pairs = core.episodes.overlaps(args.start, args.end)
+        if not pairs:
+            print("No overlapping episodes", file=sys.stderr)
+            return 1
+        for first, second in pairs:
+            print(f"{first.name} ({_stamp(first.start_date, first.start_minutes)}) overlaps "
+                  f"{second.name} ({_stamp(second.start_date, second.start_minutes)})")
+        return 0
+    episodes = core.episodes.query(args.name, args.start, args.end)
+    if not episodes:
+        print("No discomfort episodes found", file=sys.stderr)
+        return 1
+    for episode in episodes:
+        ratings = "/".join(str(rating) for _, _, rating in episode.ratings)
+        print(f"{episode.name}: {_stamp(episode.start_date, episode.start_minutes)} -> "
+              f"{_stamp(episode.end_date, episode.end_minutes)}  {_duration(episode.duration())}  rating {ratings}")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="journal", description="Log and look up journal entries")
+    parser.add_argument("--backend", choices=BACKENDS, help="storage (default: $JOURNAL_BACKEND, else files)")
+    commands = parser.add_subparsers(dest="command")
+
+    add = commands.add_parser("add", help="add an entry (in chronological order)")
+    add.add_argument("type", type=_entry_type, help=", ".join(ENTRY_TYPES))
+    add.add_argument("item", nargs="*", help="item(s), e.g. \"2 vit c, zinc\"")
+    add.add_argument("--date", type=_date, default=today_str(), help="dd-mm-yyyy (default today)")
+    add.add_argument("--time", type=_time, help="e.g. 9:30am (default now)")
+    add.add_argument("--end", action="store_true", help="Activity/Discomfort finished instead of started")
+    add.add_argument("--rating", type=int, choices=[1, 2, 3, 4], default=1, help="Discomfort rating")
+    add.add_argument("--dosage", help="Medication dosage, e.g. 5mg")
+    add.add_argument("--fish", help="fish kind when adding Food 'fish'")
+    add.add_argument("--qty", type=int, choices=[1, 2], default=1, help="fish quantity")
+    add.set_defaults(func=cmd_add)
+
+    show = commands.add_parser("show", help="print a day")
+    show.add_argument("date", type=_date, nargs="?", default=today_str())
+    show.set_defaults(func=cmd_show)
+
+    search = commands.add_parser("search", help="find an item across all days")
+    search.add_argument("query")
+    search.add_argument("--exact", action="store_true", help="match the whole item name")
+    search.add_argument("--limit", type=int, default=50, help="0 for all")
+    search.set_defaults(func=cmd_search)
+
+    episodes = commands.add_parser("episodes", help="list discomfort episodes across days")
+    episodes.add_argument("name", nargs="?", help="only this discomfort")
+    episodes.add_argument("--from", dest="start", type=_date, help="dd-mm-yyyy")
+    episodes.add_argument("--to", dest="end", type=_date, help="dd-mm-yyyy")
+    episodes.add_argument("--overlapping", action="store_true",
+                          help="list pairs of discomforts that were going at the same time")
+    episodes.set_defaults(func=cmd_episodes)
+
+    args = parser.parse_args(argv)
+    if args.command is None:
+        parser.print_help()
+        return 2
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,23 +1,76 @@
 import sys
 import os
+import time
+import argparse
+START_TIME = time.perf_counter()  # before the Qt imports, for the startup timing report
 import json
+import importlib.util
 from datetime import datetime
 from PySide6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                                QHBoxLayout, QLabel, QPushButton, QTimeEdit,
                                QDateEdit, QComboBox, QRadioButton,
-                               QFrame, QTextEdit, QSplitter, QTableWidget,
-                               QTableWidgetItem, QHeaderView, QMessageBox,
-                               QSizePolicy)
-from PySide6.QtCore import Qt, QTime, QDate, QTimer
-from multi import MultiDialogue, MultiDialogueWithCounts
+                               QFrame, QTextEdit, QSplitter, QTableView,
+                               QHeaderView, QMessageBox,
+                               QSizePolicy, QInputDialog, QCompleter)
+from PySide6.QtCore import Qt, QTime, QDate, QTimer, QObject, Signal, QEvent
+from PySide6.QtGui import QTextCursor
+from entry_parser import parse_body, sort_journal, normalize_text, format_time
+from day import DayLines
+from cache import DayCache
+from core import (create_core, BACKENDS, ENTRY_TYPES, format_entry, learn_item, track_discomfort,
+                  exists_in_list, remove_from_list, content_hash)
+import options
+from worker import IOWorker
+from models import EntryOptionsModel, DiscomfortModel, COMPLETION_ROLE
+from watcher import FolderWatcher
+
+IMPORTED_TIME = time.perf_counter()
+
+# edits are saved this long after typing stops
+AUTOSAVE_DELAY_MS = 2000
+
+
+class WorkerSignals(QObject):
+    """Carries I/O worker results back to the GUI thread"""
+    done = Signal(object, object)     # callback, result
+    failed = Signal(object, object)   # job key, exception
 
 
 class Journal(QMainWindow):
-    def __init__(self):
+    def __init__(self, backend=None):
         super().__init__()
-        self.setWindowTitle("Journal")
+        self.setWindowTitle("Journal[*]")  # [*] shows unsaved edits
         self.setMinimumSize(600,600)
 
+        # all file writes (and day loads) run on one background thread
+        self.worker_signals = WorkerSignals()
+        self.worker_signals.done.connect(self.on_io_done)
+        self.worker_signals.failed.connect(self.on_io_failed)
+        self.worker = IOWorker(deliver=self.worker_signals.done.emit,
+                               report=self.worker_signals.failed.emit)
+
+        # journal files, their indexes and the entry log (shared with the CLI), or the SQLite database
+        self.core = create_core("Journal", backend, cache=DayCache())
+        self.store = self.core.store
+        self.log = self.core.log
+        self.search_index = self.core.search_index
+        # the saved options and active discomforts for the entry row and discomfort table,
+        # read on the worker ahead of the index refresh (stacks wait until a type with them is picked)
+        self.worker.submit("startup", self._read_startup_state, callback=self.finish_startup)
+        # finish anything left by a crash and refresh the indexes from file mtimes
+        self.worker.submit(None, self.core.open)
+        # date whose journal is currently shown in the editors
+        self.loaded_date = None
+
+        # parsed lines of the day in the preview, kept in step with add_entry
+        self.day = None
+        self._day_revision = None
+        # content hashes of the three editors as last loaded/saved: tells add_entry whether
+        # it can just log its line, and lets saves with nothing new skip the write
+        self._saved_hashes = None
+        # content hashes of the JSON state files as last loaded/written
+        self._state_hashes = {}
+
         #main widget and layout
         main_widget = QWidget()
         self.setCentralWidget(main_widget)
@@ -31,9 +84,25 @@ class Journal(QMainWindow):
         self.date_edit.setCalendarPopup(True)
 
         self.date_edit.dateChanged.connect(self.load_journal)
+        # history search across all days
+        self.search_btn = QPushButton("Search history")
+        self.search_btn.clicked.connect(self.search_history)
+        # intake vs discomfort correlation over the whole history
+        self.analysis_btn = QPushButton("Analysis")
+        self.analysis_btn.clicked.connect(self.open_analysis)
+        # the analysis gets a thread of its own, so day loads and saves never wait behind it
+        self.analysis_worker = None
+        # a year of days colored by a metric, from the per-day aggregates
+        self.calendar_btn = QPushButton("Calendar")
+        self.calendar_btn.clicked.connect(self.open_calendar)
+        self.calendar_dialog = None
+
         date_layout.addWidget(date_label)
         date_layout.addWidget(self.date_edit)
         date_layout.addStretch()
+        date_layout.addWidget(self.search_btn)
+        date_layout.addWidget(self.analysis_btn)
+        date_layout.addWidget(self.calendar_btn)
         main_layout.addLayout(date_layout)
 
         # time section
@@ -60,93 +129,18 @@ class Journal(QMainWindow):
         type_layout = QHBoxLayout()
         type_label = QLabel('Type:')
         self.type = QComboBox()
-        self.type.addItems(["Daily", "Food", "Drink", "Activity", "Supplement", "Discomfort", "Medication"])
+        self.type.addItems(ENTRY_TYPES)
         self.type.currentTextChanged.connect(self.update_options)
 
         type_layout.addWidget(type_label)
         type_layout.addWidget(self.type)
         main_layout.addLayout(type_layout)
 
-        # activity section (start / end)
-        activity_frame = QFrame()
-        activity_layout = QHBoxLayout(activity_frame)
-        activity_label = QLabel("Activity Type:")
-
-        self.activity_start = QRadioButton("Start")
-        self.activity_end = QRadioButton("End")
-        self.activity_start.setChecked(True) # default as "Start"
-
-        activity_layout.addWidget(activity_label)
-        activity_layout.addWidget(self.activity_start)
-        activity_layout.addWidget(self.activity_end)
-        activity_layout.addStretch()
-
-        # rating section
-        rating_frame = QFrame()
-        rating_layout = QHBoxLayout(rating_frame)
-        rate_label = QLabel("Rating:")
-        
-        self.rating_1 = QRadioButton("1")
-        self.rating_2 = QRadioButton("2")
-        self.rating_3 = QRadioButton("3")
-        self.rating_4 = QRadioButton("4")
-        self.rating_1.setChecked(True)
-
-        rating_layout.addWidget(rate_label)
-        rating_layout.addWidget(self.rating_1)
-        rating_layout.addWidget(self.rating_2)
-        rating_layout.addWidget(self.rating_3)
-        rating_layout.addWidget(self.rating_4)
-        rating_layout.addStretch()
-
-        # dosage section
-        dosage_frame = QFrame()
-        dosage_layout = QHBoxLayout(dosage_frame)
-        dosage_label = QLabel("Dosage:")
-
-        self.dosage1 = QRadioButton("5mg")
-        self.dosage2 = QRadioButton("10mg")
-        self.dosage1.setChecked(True)
-
-        dosage_layout.addWidget(dosage_label)
-        dosage_layout.addWidget(self.dosage1)
-        dosage_layout.addWidget(self.dosage2)
-        dosage_layout.addStretch()
-
-        # setvisible and main layout to activity, rating and dosage
-        activity_frame.setVisible(False)
-        self.activity_frame = activity_frame
-        main_layout.addWidget(activity_frame)
-
-        rating_frame.setVisible(False)
-        self.rating_frame = rating_frame
-        main_layout.addWidget(rating_frame)
-
-        dosage_frame.setVisible(False)
-        self.dosage_frame = dosage_frame
-        main_layout.addWidget(dosage_frame)
-
-        # fish details section (only for Food -> fish)
-        fish_frame = QFrame()
-        fish_layout = QHBoxLayout(fish_frame)
-        fish_label = QLabel("Fish:")
-        self.fish_type = QComboBox()
-        self.fish_type.addItems(["basa fillet", "barramundi", "hoki fillet"])
-        qty_label = QLabel("Qty:")
-        self.fish_qty1 = QRadioButton("1")
-        self.fish_qty2 = QRadioButton("2")
-        self.fish_qty1.setChecked(True)
-
-        fish_layout.addWidget(fish_label)
-        fish_layout.addWidget(self.fish_type)
-        fish_layout.addWidget(qty_label)
-        fish_layout.addWidget(self.fish_qty1)
-        fish_layout.addWidget(self.fish_qty2)
-        fish_layout.addStretch()
-
-        fish_frame.setVisible(False)
-        self.fish_frame = fish_frame
-        main_layout.addWidget(fish_frame)
+        # activity/rating/dosage/fish frames are only built once a type needs them
+        self.details_layout = QVBoxLayout()
+        self.details_layout.setContentsMargins(0, 0, 0, 0)
+        main_layout.addLayout(self.details_layout)
+        self.activity_frame = None
 
         # entry section
         content_layout = QHBoxLayout()
@@ -155,6 +149,15 @@ class Journal(QMainWindow):
         self.entry_combo = QComboBox()
         self.entry_combo.setEditable(False) # entry not editable
         self.entry_combo.setMinimumWidth(300)
+        # typed text stays text; new items are only learnt by add_entry
+        self.entry_combo.setInsertPolicy(QComboBox.NoInsert)
+        # one options model per type, swapped in by update_options
+        self.option_models = {}
+        # case-insensitive substring completion for Food/Supplement
+        self.entry_completer = QCompleter(self)
+        self.entry_completer.setCaseSensitivity(Qt.CaseInsensitive)
+        self.entry_completer.setFilterMode(Qt.MatchContains)
+        self.entry_completer.setCompletionRole(COMPLETION_ROLE)
 
         # multi-select for supplement and food
         self.multi_select = QPushButton("select(multi)")
@@ -244,51 +247,189 @@ class Journal(QMainWindow):
         # Set main splitter sizes for left and right sides
         main_splitter.setSizes([600, 300])
         
-        # type options
-        self.type_options = {
-            "Daily": ["poop"],
-            "Food": ["fish", "dumplings", "ginger", "plum", "olive paste", "cumin", "olive oil", "spinash", "pizza", "little fish", "cereal",
-                     "peanut butter", "chips", "chips(sweet potatoes)", "tuna and beans", "chocolate", "orange", "yogurt(with cereal and berries), creatine",
-                    "strawberries", "chips(corn)", "steak, noodles, salad with special sauce", "salmon(oyster sauce)"],
-            "Drink": ["electrolyte"],
-            "Activity": ["walk", "ice bath", "run", "uni"],
-            "Supplement": [
-                "vit c", "L-theanine", "DL-phenyl", "NAC", "Ashwagandha", "lithium", "Bacopa Monniery", "5-htp", "L-tryptophan",
-                "slippery elm", "zinc", "lecithin", "p5p", "Alpha-GPC", "Methy-Folate", "vit d", "aniracetam", "digestive enzyme",
-                 "fish oil", "john wort", "panadol", "bcaa", "bismuth potassium", "creatine", "silymarine", "magnesium", "moringa",
-                 "gotu kola", "benfotiamine", "oxytocin", "CBD oil", "reishi", "rutin", "quercetin", "Holy basil", "Bromantane(50mg)"],
-            "Discomfort": ["upper-abdominal pain", "anxiety", "fatigue", "testicular pain"],
-            "Medication": ["Dexamphetamine", "Vyvanse (70mg)", "Lexapro", "Guanfacine", "Accutane"]
-        }
-        
-        # Load saved type options from file
-        self.load_type_options()
-        
-        # saved multi-select stacks for Food and Supplement
-        self.type_stacks = {"Food": [], "Supplement": []}
-        # Load saved stacks from file
-        self.load_type_stacks()
-        
-        # Active discomforts tracking
-        self.active_discomforts = {}  # {discomfort_name: {"rating": int, "start_time": str, "start_date": str}}
-        
-        # Load active discomforts from file
-        self.load_active_discomforts()
-        
-        # Setup timer to update discomfort durations
-        self.discomfort_timer = QTimer()
-        self.discomfort_timer.timeout.connect(self.update_discomfort_table)
-        self.discomfort_timer.start(60000)  # Update every minute
-        
+        # type options, saved stacks and active discomforts are read from their JSON
+        # files on the worker after startup, or on first access if needed sooner
+        # (see finish_startup and the properties below)
+        self._type_options = None
+        self._type_stacks = None
+        self._active_discomforts = None
+
+        # Setup timer to update discomfort durations (only runs while
+        # something is tracked and the window can be seen)
+        self.discomfort_timer = QTimer(self)
+        self.discomfort_timer.setInterval(60000)  # Update every minute
+        self.discomfort_timer.timeout.connect(self.discomfort_model.refresh_elapsed)
+
+        # save edits once typing stops (and only if the content really changed)
+        self.autosave_timer = QTimer(self)
+        self.autosave_timer.setSingleShot(True)
+        self.autosave_timer.setInterval(AUTOSAVE_DELAY_MS)
+        self.autosave_timer.timeout.connect(self.save_journal)
+        for editor in (self.preview_text, self.note_txt, self.change_txt):
+            editor.textChanged.connect(self.on_editor_changed)
+
+        # days and options changed outside the app (another editor, a sync tool, the CLI)
+        self.watcher = None
+        if self.core.watch_paths():
+            self.watcher = FolderWatcher(self.core.watch_paths(), self._state_files(), self)
+            self.watcher.changed.connect(self.check_external_changes)
+
+        # Load journal after everything is initialized (parsed on the worker meanwhile)
+        self.load_journal()
+
+        # {phase: seconds} when started with JOURNAL_STARTUP_TIMING set
+        self.startup_timing = None
+
+    def _read_startup_state(self):
+        return (options.load_type_options(read=self.core.read_state),
+                options.load_active_discomforts(read=self.core.read_state))
+
+    def finish_startup(self, state):
+        """Fill the entry row and discomfort table once the worker has read their state"""
+        type_options, active_discomforts = state
+        # unless something needed them sooner and read them itself
+        if self._type_options is None:
+            self.load_type_options(type_options)
+        if self._active_discomforts is None:
+            self.load_active_discomforts(active_discomforts)
         # initialize current options
         self.update_options(self.type.currentText())
-        
-        # Load journal after everything is initialized
-        self.load_journal()
-        
         # Initialize discomfort table display
         self.update_discomfort_table()
-    
+
+    @property
+    def type_options(self):
+        """Type options (defaults merged with the saved ones)"""
+        if self._type_options is None:
+            self.load_type_options()
+        return self._type_options
+
+    @type_options.setter
+    def type_options(self, value):
+        self._type_options = value
+
+    @property
+    def type_stacks(self):
+        """Saved multi-select stacks for Food and Supplement"""
+        if self._type_stacks is None:
+            self.load_type_stacks()
+        return self._type_stacks
+
+    @type_stacks.setter
+    def type_stacks(self, value):
+        self._type_stacks = value
+
+    @property
+    def active_discomforts(self):
+        """{discomfort_name: {"rating": int, "start_time": str, "start_date": str}}"""
+        if self._active_discomforts is None:
+            self.load_active_discomforts()
+        return self._active_discomforts
+
+    @active_discomforts.setter
+    def active_discomforts(self, value):
+        self._active_discomforts = value
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if self.startup_timing is not None and "first_paint" not in self.startup_timing:
+            self.startup_timing["first_paint"] = time.perf_counter()
+            # report once the children have painted too
+            QTimer.singleShot(0, self.report_startup_timing)
+
+    def report_startup_timing(self):
+        timing = self.startup_timing
+        imports = timing["imported"] - START_TIME
+        construction = timing["constructed"] - timing["constructing"]
+        first_paint = timing["first_paint"] - timing["constructed"]
+        total = timing["first_paint"] - START_TIME
+        print(f"startup: imports {imports * 1000:.0f}ms, construction {construction * 1000:.0f}ms, "
+              f"first paint {first_paint * 1000:.0f}ms (total {total * 1000:.0f}ms)", file=sys.stderr, flush=True)
+
+    def build_detail_frames(self):
+        """Create the activity, rating, dosage and fish frames on first use"""
+        if self.activity_frame is not None:
+            return
+        # activity section (start / end)
+        activity_frame = QFrame()
+        activity_layout = QHBoxLayout(activity_frame)
+        activity_label = QLabel("Activity Type:")
+
+        self.activity_start = QRadioButton("Start")
+        self.activity_end = QRadioButton("End")
+        self.activity_start.setChecked(True) # default as "Start"
+
+        activity_layout.addWidget(activity_label)
+        activity_layout.addWidget(self.activity_start)
+        activity_layout.addWidget(self.activity_end)
+        activity_layout.addStretch()
+
+        # rating section
+        rating_frame = QFrame()
+        rating_layout = QHBoxLayout(rating_frame)
+        rate_label = QLabel("Rating:")
+
+        self.rating_1 = QRadioButton("1")
+        self.rating_2 = QRadioButton("2")
+        self.rating_3 = QRadioButton("3")
+        self.rating_4 = QRadioButton("4")
+        self.rating_1.setChecked(True)
+
+        rating_layout.addWidget(rate_label)
+        rating_layout.addWidget(self.rating_1)
+        rating_layout.addWidget(self.rating_2)
+        rating_layout.addWidget(self.rating_3)
+        rating_layout.addWidget(self.rating_4)
+        rating_layout.addStretch()
+
+        # dosage section
+        dosage_frame = QFrame()
+        dosage_layout = QHBoxLayout(dosage_frame)
+        dosage_label = QLabel("Dosage:")
+
+        self.dosage1 = QRadioButton("5mg")
+        self.dosage2 = QRadioButton("10mg")
+        self.dosage1.setChecked(True)
+
+        dosage_layout.addWidget(dosage_label)
+        dosage_layout.addWidget(self.dosage1)
+        dosage_layout.addWidget(self.dosage2)
+        dosage_layout.addStretch()
+
+        # setvisible and main layout to activity, rating and dosage
+        activity_frame.setVisible(False)
+        self.activity_frame = activity_frame
+        self.details_layout.addWidget(activity_frame)
+
+        rating_frame.setVisible(False)
+        self.rating_frame = rating_frame
+        self.details_layout.addWidget(rating_frame)
+
+        dosage_frame.setVisible(False)
+        self.dosage_frame = dosage_frame
+        self.details_layout.addWidget(dosage_frame)
+
+        # fish details section (only for Food -> fish)
+        fish_frame = QFrame()
+        fish_layout = QHBoxLayout(fish_frame)
+        fish_label = QLabel("Fish:")
+        self.fish_type = QComboBox()
+        self.fish_type.addItems(["basa fillet", "barramundi", "hoki fillet"])
+        qty_label = QLabel("Qty:")
+        self.fish_qty1 = QRadioButton("1")
+        self.fish_qty2 = QRadioButton("2")
+        self.fish_qty1.setChecked(True)
+
+        fish_layout.addWidget(fish_label)
+        fish_layout.addWidget(self.fish_type)
+        fish_layout.addWidget(qty_label)
+        fish_layout.addWidget(self.fish_qty1)
+        fish_layout.addWidget(self.fish_qty2)
+        fish_layout.addStretch()
+
+        fish_frame.setVisible(False)
+        self.fish_frame = fish_frame
+        self.details_layout.addWidget(fish_frame)
 
     def on_time_mode_changed(self):
         is_custom = self.time_custom.isChecked()
@@ -296,77 +437,73 @@ class Journal(QMainWindow):
         # initialize editor starting from current time when switching modes
         self.time_edit.setTime(QTime.currentTime())
 
-
-    def get_journal(self, date=None):
-        if not date:
-            date = self.date_edit.date().toString("dd-MM-yyyy")
-        else:
-            date = date.toString("dd-MM-yyyy")
-
-        if not os.path.exists("Journal"):
-            os.makedirs("Journal")
-
-        return os.path.join("Journal", f"{date}.txt")
-    
     def load_journal(self):
-        filename = self.get_journal(self.date_edit.date())
+        # edits still waiting for the autosave belong to the day being left
+        if self.autosave_timer.isActive():
+            self.save_journal()
+        date_str = self.date_edit.date().toString("dd-MM-yyyy")
+        # read on the worker; rapid date changes coalesce into the last one
+        self.entry_butn.setEnabled(False)
+        self.worker.submit("load", self.log.read_parsed, date_str,
+                           callback=lambda day: self.show_journal(date_str, day))
+
+    def show_journal(self, date_str, day):
+        if date_str != self.date_edit.date().toString("dd-MM-yyyy"):
+            return  # the date moved on while this was loading
+        self.loaded_date = date_str
+        self.day = None
         self.preview_text.clear()
         self.note_txt.clear()
         if hasattr(self, 'change_txt'):
             self.change_txt.clear()
 
-        if os.path.exists(filename):
-            with open(filename, 'r') as file:
-                content = file.read()
-
-            # Parse optional Notes: and Changes: sections
-            journal_entry = content
-            notes_text = ""
-            changes_text = ""
-
-            # find markers
-            idx_notes = content.find("Notes:")
-            idx_changes = content.find("Changes:")
-
-            # determine journal portion as content before the earliest marker (if any)
-            indices = [i for i in [idx_notes, idx_changes] if i != -1]
-            if indices:
-                first_idx = min(indices)
-                journal_entry = content[:first_idx].strip()
-            else:
-                journal_entry = content
-
-            # extract notes text
-            if idx_notes != -1:
-                start = idx_notes + len("Notes:")
-                end = len(content) if idx_changes == -1 else idx_changes
-                notes_text = content[start:end].strip()
-
-            # extract changes text
-            if idx_changes != -1:
-                start = idx_changes + len("Changes:")
-                end = len(content)
-                changes_text = content[start:end].strip()
-
-            self.preview_text.setPlainText(journal_entry)
-            if notes_text:
-                self.note_txt.setPlainText(notes_text)
-            if changes_text and hasattr(self, 'change_txt'):
-                self.change_txt.setPlainText(changes_text)
+        if day.journal is not None:
+            self.preview_text.setPlainText(day.journal)
+            if day.notes:
+                self.note_txt.setPlainText(day.notes)
+            if day.changes and hasattr(self, 'change_txt'):
+                self.change_txt.setPlainText(day.changes)
 
         else: #if empty, add date header
-            date_str = self.date_edit.date().toString("dd-MM-yyyy")
             header_date = f"Date: {date_str}\n"
             self.preview_text.setPlainText(header_date)
-        
-        # Update discomfort table when date changes
-        if hasattr(self, 'discomfort_table'):
-            self.update_discomfort_table()
+        self._saved_hashes = self._editor_hashes()
+        self.autosave_timer.stop()
+        self.setWindowModified(False)
+        self.entry_butn.setEnabled(True)
+        if self.watcher is not None:
+            # the open day is watched itself, to catch editors that save in place
+            self.watcher.set_files(self._state_files() + [self.store.path_for(date_str)])
+        if self.calendar_dialog is not None and self.calendar_dialog.isVisible():
+            self.calendar_dialog.refresh()
+            self.calendar_dialog.show_date(self.date_edit.date())
+
+        # warm the cache for the days arrow keys and week jumps land on next
+        date = self.date_edit.date()
+        neighbours = [date.addDays(offset).toString("dd-MM-yyyy") for offset in (1, -1, 7, -7)]
+        self.worker.submit("prefetch", self.log.prefetch, neighbours)
+
+    def on_io_done(self, callback, result):
+        callback(result)
+
+    def on_io_failed(self, key, error):
+        if key == "analysis":
+            self.analysis_btn.setEnabled(True)
+            QMessageBox.warning(self, "Analysis", f"The analysis failed:\n{error}")
+            return
+        QMessageBox.warning(self, "Journal", f"Could not save or load data:\n{error}")
+
+    def option_model(self, type):
+        """The entry combo model for a type (its options, then its saved stacks)"""
+        model = self.option_models.get(type)
+        if model is None:
+            # only types that have stacks read the stacks file
+            stacks = self.type_stacks.get(type) if type in options.DEFAULT_TYPE_STACKS else None
+            model = EntryOptionsModel(self.type_options[type], stacks, self)
+            self.option_models[type] = model
+        return model
 
     def update_options(self, type):
-        self.entry_combo.clear()
-        self.entry_combo.addItems(self.type_options[type])
-
         # Disconnect any existing connections to prevent multiple signals
         try:
             self.entry_combo.currentTextChanged.disconnect()
@@ -377,24 +514,31 @@ class Journal(QMainWindow):
         self.multi_select.setVisible(is_food_or_supp)
         self.remove_btn.setVisible(is_food_or_supp)
         self.entry_combo.setEditable(is_food_or_supp)
+        model = self.option_model(type)
+        if self.entry_combo.model() is not model:
+            self.entry_combo.setModel(model)
+        if is_food_or_supp:
+            # setEditable(True) gives the combo a fresh line edit and default completer
+            self.entry_completer.setModel(model)
+            self.entry_combo.setCompleter(self.entry_completer)
         
         # Clear the entry field when switching to Food or Supplement
         if is_food_or_supp:
             self.entry_combo.setCurrentText("")
         
-        self.activity_frame.setVisible(type == "Activity" or type == "Discomfort")
-        self.rating_frame.setVisible(type == "Discomfort")
+        if type in ("Activity", "Discomfort", "Medication"):
+            self.build_detail_frames()
+        if self.activity_frame is not None:
+            self.activity_frame.setVisible(type == "Activity" or type == "Discomfort")
+            self.rating_frame.setVisible(type == "Discomfort")
         
         # Always show discomfort tracking (no need to hide/show based on type)
         
-        # Update discomfort table to ensure it's current
-        if hasattr(self, 'discomfort_table'):
-            self.update_discomfort_table()
-        
-        # Hide dosage frame by default
-        self.dosage_frame.setVisible(False)
-        # Hide fish frame by default
-        self.fish_frame.setVisible(False)
+        if self.activity_frame is not None:
+            # Hide dosage frame by default
+            self.dosage_frame.setVisible(False)
+            # Hide fish frame by default
+            self.fish_frame.setVisible(False)
         
         # Show fish details when Food -> fish
         if type == "Food":
@@ -406,23 +550,6 @@ class Journal(QMainWindow):
             self.entry_combo.currentTextChanged.connect(self.handle_medication_change)
             self.handle_medication_change(self.entry_combo.currentText())
 
-        # Append saved stacks section for Food/Supplement
-        if type in self.type_stacks and self.type_stacks[type]:
-            base_count = self.entry_combo.count()
-            self.entry_combo.insertSeparator(base_count)
-            self.entry_combo_stack_sep_index = base_count
-            self.entry_combo.addItem("Saved stacks")
-            header_index = base_count + 1
-            self.entry_combo_stack_header_index = header_index
-            try:
-                item = self.entry_combo.model().item(header_index)
-                if item:
-                    item.setEnabled(False)
-            except Exception:
-                pass
-            self.entry_combo_stacks_first_index = header_index + 1
-            self.entry_combo.addItems(self.type_stacks[type])
-
     def handle_medication_change(self, medication):
         self.dosage_frame.setVisible(medication == "Dexamphetamine")
         if medication == "Dexamphetamine":
@@ -430,24 +557,29 @@ class Journal(QMainWindow):
 
     def handle_food_change(self, item):
         is_fish = (self._normalize_text(item) == "fish")
+        if is_fish:
+            self.build_detail_frames()
+        elif self.activity_frame is None:
+            return
         self.fish_frame.setVisible(is_fish)
         if is_fish:
             self.fish_qty1.setChecked(True)
 
     def open_multi_select(self):
+        from multi import MultiDialogue, MultiDialogueWithCounts
         current_type = self.type.currentText()
         
         # Use MultiDialogueWithCounts for supplements, regular MultiDialogue for others
         if current_type == "Supplement":
             dialog = MultiDialogueWithCounts(
                 self,
-                options=self.type_options[current_type],
+                options=list(self.type_options[current_type]),
                 title=f"Select {current_type}"
             )
         else:
             dialog = MultiDialogue(
                 self,
-                options=self.type_options[current_type],
+                options=list(self.type_options[current_type]),
                 title=f"Select {current_type}"
             )
             
@@ -473,9 +605,8 @@ class Journal(QMainWindow):
                             self.type_stacks[current_type].append(combo_str)
                             # Save type stacks to persist the new stack
                             self.save_type_stacks()
-                            # refresh options to show newly saved stack when relevant
-                            if self.type.currentText() == current_type:
-                                self.update_options(current_type)
+                            # show the newly saved stack in the combo
+                            self.option_model(current_type).stacks_appended()
             else:
                 # Regular handling for non-supplement types
                 select_items = dialog.get_items()
@@ -489,9 +620,8 @@ class Journal(QMainWindow):
                             self.type_stacks[current_type].append(combo_str)
                             # Save type stacks to persist the new stack
                             self.save_type_stacks()
-                            # refresh options to show newly saved stack when relevant
-                            if self.type.currentText() == current_type:
-                                self.update_options(current_type)
+                            # show the newly saved stack in the combo
+                            self.option_model(current_type).stacks_appended()
 
     def add_entry(self):
         if self.time_custom.isChecked():
@@ -502,118 +632,77 @@ class Journal(QMainWindow):
         entry_combo = self.entry_combo.currentText().strip()
 
         # For Food/Supplement: auto-add new single item to options (case-insensitive, trimmed)
-        if entry_type in ("Food", "Supplement") and entry_combo and "," not in entry_combo:
-            if not self._exists_in_list(self.type_options[entry_type], entry_combo):
-                sanitized = entry_combo.strip()
-                self.type_options[entry_type].append(sanitized)
-                # Save type options to persist the new item
-                self.save_type_options()
-                # refresh options to include the new item
-                self.update_options(entry_type)
-                # ensure current text remains what user typed
-                self.entry_combo.setCurrentText(sanitized)
-
-        if entry_type == "Daily":
-            entry = f"{time_str} {entry_combo}"
-        
-        elif entry_type == "Activity":
-            if not entry_combo:
-                return
-            
-            activity_type = "started" if self.activity_start.isChecked() else "finished"
-            entry = f"{time_str} {activity_type} {entry_combo}"
-        
-        elif entry_type == "Discomfort":
-            if not entry_combo:
-                return
-            activity_type = "started" if self.activity_start.isChecked() else "finished"
-            
-            # Handle discomfort tracking
-            if activity_type == "started":
-                # Add to active discomforts if not already there, or update if exists
-                rating = 1
-                if self.rating_2.isChecked():
-                    rating = 2
-                elif self.rating_3.isChecked():
-                    rating = 3
-                elif self.rating_4.isChecked():
-                    rating = 4
-                
-                if entry_combo not in self.active_discomforts:
-                    # New discomfort - add to tracking
-                    self.active_discomforts[entry_combo] = {
-                        "rating": rating,
-                        "start_time": time_str,
-                        "start_date": self.date_edit.date().toString("dd-MM-yyyy")
-                    }
-                else:
-                    # Existing discomfort - update rating and time
-                    self.active_discomforts[entry_combo]["rating"] = rating
-                    self.active_discomforts[entry_combo]["start_time"] = time_str
-                    self.active_discomforts[entry_combo]["start_date"] = self.date_edit.date().toString("dd-MM-yyyy")
-                
-                self.save_active_discomforts()
-                self.update_discomfort_table()
-            else:  # finished
-                # Remove from active discomforts
-                if entry_combo in self.active_discomforts:
-                    del self.active_discomforts[entry_combo]
-                    self.save_active_discomforts()
-                    self.update_discomfort_table()
-            
-            # Create journal entry
-            if self.rating_1.isChecked():
-                entry = f"{time_str} {activity_type} having {entry_combo} rating: 1"
-            elif self.rating_2.isChecked():
-                entry = f"{time_str} {activity_type} having {entry_combo} rating 2"
+        if learn_item(self.type_options, entry_type, entry_combo):
+            # Save type options to persist the new item
+            self.save_type_options()
+            # show the new item in the combo
+            self.option_model(entry_type).options_appended()
+            # ensure current text remains what user typed
+            self.entry_combo.setCurrentText(entry_combo)
+
+        # frames that were never built still hold their defaults
+        started = True
+        rating = 1
+        if self.activity_frame is not None:
+            started = self.activity_start.isChecked()
+            if self.rating_2.isChecked():
+                rating = 2
             elif self.rating_3.isChecked():
-                entry = f"{time_str} {activity_type} having {entry_combo} rating 3"
-            else:
-                entry = f"{time_str} {activity_type} having {entry_combo} rating 4"
+                rating = 3
+            elif self.rating_4.isChecked():
+                rating = 4
+
+        dosage = None
+        if entry_type == "Medication" and entry_combo == "Dexamphetamine" and self.activity_frame is not None:
+            dosage = "5mg" if self.dosage1.isChecked() else "10mg"
+
+        fish_kind = None
+        fish_qty = 1
+        if entry_type == "Food" and entry_combo == "fish" and self.activity_frame is not None and self.fish_frame.isVisible():
+            fish_kind = self.fish_type.currentText()
+            fish_qty = 2 if self.fish_qty2.isChecked() else 1
+
+        entry = format_entry(entry_type, entry_combo, time_str, started=started, rating=rating,
+                             dosage=dosage, fish_kind=fish_kind, fish_qty=fish_qty)
+        if entry is None:
+            return
 
-        else:
-            if not entry_combo:
-                return
-            
-            if entry_type == "Supplement":
-                entry = f"{time_str} took {entry_combo}" 
-            elif entry_type == "Drink":
-                entry = f"{time_str} drink {entry_combo}"
-            elif entry_type == "Food":
-                if entry_combo == "fish" and self.fish_frame.isVisible():
-                    fish_kind = self.fish_type.currentText()
-                    qty = 2 if self.fish_qty2.isChecked() else 1
-                    if qty == 1:
-                        entry = f"{time_str} ate fish({fish_kind})"
-                    else:
-                        entry = f"{time_str} ate {qty} fish({fish_kind})"
-                else:
-                    entry = f"{time_str} ate {entry_combo}"
-            elif entry_type == "Medication":
-                if entry_combo == "Dexamphetamine":
-                    if self.dosage1.isChecked():
-                        entry = f"{time_str} took medication - {entry_combo} (5mg)"
-                    else:
-                        entry = f"{time_str} took medication - {entry_combo} (10mg)"
+        # Handle discomfort tracking
+        if entry_type == "Discomfort":
+            date_str = self.date_edit.date().toString("dd-MM-yyyy")
+            if track_discomfort(self.active_discomforts, entry_combo, started, rating, time_str, date_str):
+                self.save_active_discomforts()
+                # only the added/updated or removed row changes
+                if started:
+                    self.discomfort_model.set_discomfort(entry_combo, self.active_discomforts[entry_combo])
                 else:
-                    entry = f"{time_str} took medication - {entry_combo}"
-            else:
-                return
+                    self.discomfort_model.remove_discomfort(entry_combo)
+                self.update_discomfort_timer()
         
-        current_text = self.preview_text.toPlainText()
-        if not current_text.strip():
-            date_str = self.date_edit.date().toString("dd-MM-yyyy")
-            current_text = f"Date: {date_str}\n"
-
+        # unsaved hand edits in the editors still need a full save
+        edited = self._editor_hashes() != self._saved_hashes
+
+        day = self.current_day()
+        if day.is_blank():
+            self.preview_text.setPlainText(f"Date: {self.loaded_date}\n")
+            day = self.current_day()
+
+        # Insert entry at the correct chronological position, touching only that line
+        document = self.preview_text.document()
+        if day.ensure_trailing_newline():
+            cursor = QTextCursor(document)
+            cursor.movePosition(QTextCursor.End)
+            cursor.insertText("\n")
+        index = day.insert(entry)
+        cursor = QTextCursor(document.findBlockByNumber(index))
+        cursor.insertText(entry + "\n")
+        self._day_revision = document.revision()
+
+        if edited:
+            self.save_journal()
         else:
-            if not current_text.endswith("\n"):
-                current_text += "\n"
-
-        # Insert entry at the correct chronological position
-        sorted_text = self.insert_entry_chronologically(current_text, entry)
-        self.preview_text.setPlainText(sorted_text)
-
-        self.save_journal()
+            self.worker.submit(None, self.core.add, self.loaded_date, entry)
+            self._saved_hashes = self._editor_hashes()
         
         # Reset time selection to Automatic after adding entry
         self.time_auto.setChecked(True)
@@ -625,44 +714,90 @@ class Journal(QMainWindow):
             return
         idx = self.entry_combo.currentIndex()
         text = self.entry_combo.currentText()
+        model = self.option_model(current_type)
         # Determine if removing a saved stack or a base item
-        stacks_first = getattr(self, 'entry_combo_stacks_first_index', None)
-        header_idx = getattr(self, 'entry_combo_stack_header_index', None)
-        if stacks_first is not None and idx >= stacks_first:
+        if model.is_stack_row(idx):
             # remove from stacks
-            if self._remove_from_list(self.type_stacks[current_type], text):
+            if model.remove(text, stack=True):
                 # Save type stacks after removal
                 self.save_type_stacks()
-                self.update_options(current_type)
+                self.entry_combo.setCurrentText("")
         else:
             # ignore if header somehow selected
-            if header_idx is not None and idx == header_idx:
+            if idx >= 0 and not model.flags(model.index(idx)):
                 return
             # remove from base options
-            if self._remove_from_list(self.type_options[current_type], text):
+            if model.remove(text):
                 # Save type options after removal
                 self.save_type_options()
-                self.update_options(current_type)
+                self.entry_combo.setCurrentText("")
 
     def _normalize_text(self, text: str) -> str:
-        if text is None:
-            return ""
-        return text.casefold().strip()
+        return normalize_text(text)
 
     def _exists_in_list(self, items, candidate: str) -> bool:
-        candidate_norm = self._normalize_text(candidate)
-        for existing in items:
-            if self._normalize_text(existing) == candidate_norm:
-                return True
-        return False
+        return exists_in_list(items, candidate)
 
     def _remove_from_list(self, items, candidate: str) -> bool:
-        candidate_norm = self._normalize_text(candidate)
-        for i, existing in enumerate(items):
-            if self._normalize_text(existing) == candidate_norm:
-                del items[i]
-                return True
-        return False
+        return remove_from_list(items, candidate)
+
+    def search_history(self):
+        """Ask for an item and show when it was last logged and on which days"""
+        query, ok = QInputDialog.getText(self, "Search history", "Item (e.g. Ashwagandha, pizza):")
+        if not ok or not query.strip():
+            return
+        hits = self.search_index.lookup(query)
+        if not hits:
+            QMessageBox.information(self, "Search history", f"No entries found for \"{query.strip()}\".")
+            return
+
+        last = hits[0]
+        last_time = format_time(last.minutes) if last.minutes >= 0 else ""
+        days = {hit.date for hit in hits}
+        lines = [f"Last: {last.date} {last_time} {last.kind} {last.item}".rstrip(),
+                 f"Found {len(hits)} entries on {len(days)} days:", ""]
+        for hit in hits[:50]:
+            hit_time = format_time(hit.minutes) if hit.minutes >= 0 else ""
+            lines.append(f"{hit.date} {hit_time} {hit.kind} {hit.item}")
+        if len(hits) > 50:
+            lines.append(f"... and {len(hits) - 50} more")
+        QMessageBox.information(self, "Search history", "\n".join(lines))
+
+    def open_analysis(self):
+        """Correlate intake items with discomforts on the worker and show the results"""
+        if importlib.util.find_spec("numpy") is None:
+            QMessageBox.information(self, "Analysis", "The analysis needs NumPy: pip install numpy")
+            return
+        from analysis import analyze
+        items = [item for key in ("Food", "Drink", "Supplement", "Medication")
+                 for item in self.type_options.get(key, [])]
+        self.analysis_btn.setEnabled(False)
+        if self.analysis_worker is None:
+            self.analysis_worker = IOWorker(deliver=self.worker_signals.done.emit,
+                                            report=self.worker_signals.failed.emit, name="journal-analysis")
+        self.analysis_worker.submit("analysis", analyze, store=self.store, items=items,
+                                    callback=self.show_analysis)
+
+    def show_analysis(self, results):
+        from analysis_panel import AnalysisDialog
+        self.analysis_btn.setEnabled(True)
+        AnalysisDialog(self, results=results).exec()
+
+    def open_calendar(self):
+        """Show the calendar heatmap once pending entries are folded into the aggregates"""
+        self.worker.submit("calendar", self.log.compact_all, callback=lambda _: self.show_calendar())
+
+    def show_calendar(self):
+        from heatmap import HeatmapDialog
+        if self.calendar_dialog is None:
+            self.calendar_dialog = HeatmapDialog(self, aggregates=self.core.aggregates,
+                                                 type_options=self.type_options,
+                                                 on_day=self.date_edit.setDate)
+        else:
+            self.calendar_dialog.refresh()
+        self.calendar_dialog.show_date(self.date_edit.date())
+        self.calendar_dialog.show()
+        self.calendar_dialog.raise_()
 
     def save_preview(self):
         self.save_journal()
@@ -677,81 +812,87 @@ class Journal(QMainWindow):
         self.update_active_discomforts_from_journal()
 
     def save_journal(self, notes_content=None, changes_content=None):
-        filename = self.get_journal(self.date_edit.date())
-
+        """Save the editors to the loaded day; False if nothing changed since the last save"""
+        date_str = self.loaded_date
+        if date_str is None:
+            return False  # nothing loaded yet, so nothing of ours to save
+
+        texts = self._editor_texts(notes_content, changes_content)
+        hashes = self._editor_hashes(texts)
+        self.autosave_timer.stop()
+        self.setWindowModified(False)
+        if hashes == self._saved_hashes:
+            return False
+
+        self.worker.submit(None, self.core.save, date_str, *texts)
+        self._saved_hashes = hashes
+        return True
+
+    def _editor_texts(self, notes_content=None, changes_content=None):
+        """(journal, notes, changes) as save_journal writes them"""
         journal_content = self.preview_text.toPlainText()
 
         if notes_content is None:
             notes_content = self.note_txt.toPlainText().strip()
-        if changes_content is None and hasattr(self, 'change_txt'):
+        if changes_content is None:
             changes_content = self.change_txt.toPlainText().strip()
-
-        # Build full content with optional sections
-        full_content = journal_content.rstrip()
-        if notes_content:
-            full_content += f"\n\nNotes: {notes_content}"
-        if changes_content:
-            full_content += f"\n\nChanges: {changes_content}"
-
-        with open(filename, 'w') as file:
-            file.write(full_content)
+        return journal_content, notes_content, changes_content
+
+    def _editor_hashes(self, texts=None):
+        return tuple(content_hash(text) for text in (texts or self._editor_texts()))
+
+    def dirty_editors(self):
+        """Names of the editors whose content differs from the last save"""
+        if self._saved_hashes is None:
+            return []
+        return [name for name, current, saved in zip(("journal", "notes", "changes"),
+                                                      self._editor_hashes(), self._saved_hashes)
+                if current != saved]
+
+    def on_editor_changed(self):
+        # cheap on every keystroke: the content is only hashed when the autosave runs
+        if self.loaded_date is not None:
+            self.setWindowModified(True)
+            self.autosave_timer.start()
+
+    def _state_files(self):
+        return [options.TYPE_OPTIONS_FILE, options.TYPE_STACKS_FILE, options.ACTIVE_DISCOMFORTS_FILE]
+
+    def _write_state(self, filename, data):
+        """Queue a JSON state file write, unless it holds what was last loaded or written"""
+        digest = content_hash(json.dumps(data, sort_keys=True))
+        if self._state_hashes.get(filename) == digest:
+            return False
+        self._state_hashes[filename] = digest
+        # snapshot now, write on the worker (queued saves of the same file coalesce)
+        self.worker.submit(filename, self.core.write_state, filename, data)
+        return True
+
+    def _loaded_state(self, filename, data):
+        self._state_hashes[filename] = content_hash(json.dumps(data, sort_keys=True))
 
     def save_type_options(self):
         """Save type options to a JSON file"""
-        if not os.path.exists("options"):
-            os.makedirs("options")
-        
-        filename = os.path.join("options", "type_options.json")
-        with open(filename, 'w') as file:
-            json.dump(self.type_options, file, indent=2)
-
-    def load_type_options(self):
-        """Load type options from a JSON file"""
-        filename = os.path.join("options", "type_options.json")
-        if os.path.exists(filename):
-            try:
-                with open(filename, 'r') as file:
-                    saved_options = json.load(file)
-                    # Merge saved options with default options instead of replacing
-                    for key, saved_value in saved_options.items():
-                        if key in self.type_options:
-                            # Get the default options for this type
-                            default_options = self.type_options[key]
-                            # Create a set of all options (default + saved) to avoid duplicates
-                            all_options = list(default_options)  # Start with defaults
-                            
-                            # Add saved options that aren't already in defaults
-                            for saved_item in saved_value:
-                                if saved_item not in all_options:
-                                    all_options.append(saved_item)
-                            
-                            # Update the type options with merged list
-                            self.type_options[key] = all_options
-            except (json.JSONDecodeError, FileNotFoundError):
-                pass  # Use default options if file is corrupted or doesn't exist
+        self._write_state(options.TYPE_OPTIONS_FILE, options.as_json(self.type_options))
+
+    def load_type_options(self, loaded=None):
+        """Load type options from a JSON file (or take ones already read from it)"""
+        # Merge saved options with default options instead of replacing
+        self.type_options = loaded or options.load_type_options(read=self.core.read_state)
+        self._loaded_state(options.TYPE_OPTIONS_FILE, options.as_json(self.type_options))
+        # models wrap the old lists
+        self.option_models.clear()
 
     def save_type_stacks(self):
         """Save type stacks to a JSON file"""
-        if not os.path.exists("options"):
-            os.makedirs("options")
-        
-        filename = os.path.join("options", "type_stacks.json")
-        with open(filename, 'w') as file:
-            json.dump(self.type_stacks, file, indent=2)
-
-    def load_type_stacks(self):
-        """Load type stacks from a JSON file"""
-        filename = os.path.join("options", "type_stacks.json")
-        if os.path.exists(filename):
-            try:
-                with open(filename, 'r') as file:
-                    saved_stacks = json.load(file)
-                    # Update only the types that exist in saved data
-                    for key, value in saved_stacks.items():
-                        if key in self.type_stacks:
-                            self.type_stacks[key] = value
-            except (json.JSONDecodeError, FileNotFoundError):
-                pass  # Use default stacks if file is corrupted or doesn't exist
+        self._write_state(options.TYPE_STACKS_FILE, options.as_json(self.type_stacks))
+
+    def load_type_stacks(self, loaded=None):
+        """Load type stacks from a JSON file (or take ones already read from it)"""
+        self.type_stacks = loaded or options.load_type_stacks(read=self.core.read_state)
+        self._loaded_state(options.TYPE_STACKS_FILE, options.as_json(self.type_stacks))
+        # models wrap the old lists
+        self.option_models.clear()
 
     def setup_discomfort_tracking(self):
         """Setup the discomfort tracking table and controls"""
@@ -768,11 +909,12 @@ class Journal(QMainWindow):
         discomfort_layout.addLayout(discomfort_header)
 
         # Table for active discomforts
-        self.discomfort_table = QTableWidget()
-        self.discomfort_table.setColumnCount(3)
-        self.discomfort_table.setHorizontalHeaderLabels(["Discomfort", "Rating", "Start Time"])
+        self.discomfort_model = DiscomfortModel(self)
+        self.discomfort_table = QTableView()
+        self.discomfort_table.setModel(self.discomfort_model)
+        self.discomfort_table.verticalHeader().setVisible(False)
         self.discomfort_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-        self.discomfort_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.discomfort_table.setEditTriggers(QTableView.NoEditTriggers)
         # Make table expandable both horizontally and vertically
         self.discomfort_table.setMinimumHeight(100)
         self.discomfort_table.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
@@ -781,89 +923,42 @@ class Journal(QMainWindow):
 
 
     def update_discomfort_table(self):
-        """Update the discomfort tracking table"""
-        self.discomfort_table.setRowCount(0)
-        
-        for i, (discomfort_name, data) in enumerate(self.active_discomforts.items()):
-            self.discomfort_table.insertRow(i)
-            
-            # Discomfort name
-            name_item = QTableWidgetItem(discomfort_name)
-            self.discomfort_table.setItem(i, 0, name_item)
-            
-            # Rating
-            rating_item = QTableWidgetItem(f"Rating {data['rating']}")
-            self.discomfort_table.setItem(i, 1, rating_item)
-            
-            # Start time (only time, no date)
-            start_time_item = QTableWidgetItem(data['start_time'])
-            self.discomfort_table.setItem(i, 2, start_time_item)
+        """Bring the discomfort table in line with active_discomforts (changed rows only)"""
+        self.discomfort_model.sync(self.active_discomforts)
+        self.update_discomfort_timer()
+
+    def update_discomfort_timer(self):
+        """Run the elapsed-time timer only while something is tracked and the window is visible"""
+        if self.discomfort_model.rowCount() and self.isVisible() and not self.isMinimized():
+            if not self.discomfort_timer.isActive():
+                self.discomfort_model.refresh_elapsed()
+                self.discomfort_timer.start()
+        else:
+            self.discomfort_timer.stop()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.update_discomfort_timer()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.update_discomfort_timer()
+
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        if event.type() == QEvent.WindowStateChange:
+            self.update_discomfort_timer()
 
     def update_active_discomforts_from_journal(self):
         """Parse the edited journal content and update active discomforts accordingly"""
         journal_content = self.preview_text.toPlainText()
-        lines = journal_content.strip().split('\n')
         
-        # Clear current active discomforts
+        # Rebuild active discomforts from the episodes across all days, with this
+        # day as edited (so episodes started on earlier days are kept)
+        date_str = self.loaded_date or self.date_edit.date().toString("dd-MM-yyyy")
+        active = self.core.episodes.active_with(date_str, parse_body(journal_content))
         self.active_discomforts.clear()
-        
-        # Parse each line to find discomfort entries
-        for line in lines:
-            line = line.strip()
-            if not line or line.startswith('Date:'):
-                continue
-                
-            # Look for discomfort patterns: "time started having discomfort rating: X"
-            # or "time started having discomfort rating X"
-            if 'started having' in line and 'rating' in line:
-                # Extract time
-                time_match = line.split()[0]  # First word should be time
-                
-                # Extract discomfort name (between "having" and "rating")
-                if 'having' in line and 'rating' in line:
-                    having_index = line.find('having')
-                    rating_index = line.find('rating')
-                    if having_index != -1 and rating_index != -1:
-                        discomfort_name = line[having_index + 7:rating_index].strip()
-                        
-                        # Extract rating
-                        rating_part = line[rating_index:].strip()
-                        rating = 1  # default
-                        if 'rating: 1' in rating_part or 'rating 1' in rating_part:
-                            rating = 1
-                        elif 'rating: 2' in rating_part or 'rating 2' in rating_part:
-                            rating = 2
-                        elif 'rating: 3' in rating_part or 'rating 3' in rating_part:
-                            rating = 3
-                        elif 'rating: 4' in rating_part or 'rating 4' in rating_part:
-                            rating = 4
-                        
-                        # Update active discomforts (this will overwrite previous entries for same discomfort)
-                        self.active_discomforts[discomfort_name] = {
-                            "rating": rating,
-                            "start_time": time_match,
-                            "start_date": self.date_edit.date().toString("dd-MM-yyyy")
-                        }
-            
-            # Also look for "finished having" entries to remove from active discomforts
-            elif 'finished having' in line:
-                # Extract discomfort name (between "having" and any additional text)
-                having_index = line.find('having')
-                if having_index != -1:
-                    # Get the text after "having" - could be "discomfort rating: X" or just "discomfort"
-                    after_having = line[having_index + 7:].strip()
-                    
-                    # Find the discomfort name - it's everything before "rating" if present
-                    if 'rating' in after_having:
-                        rating_index = after_having.find('rating')
-                        discomfort_name = after_having[:rating_index].strip()
-                    else:
-                        # If no rating, just take the whole thing after "having"
-                        discomfort_name = after_having
-                    
-                    # Remove from active discomforts if it exists
-                    if discomfort_name in self.active_discomforts:
-                        del self.active_discomforts[discomfort_name]
+        self.active_discomforts.update(active)
         
         # Save and update the table
         self.save_active_discomforts()
@@ -873,141 +968,137 @@ class Journal(QMainWindow):
         sorted_journal = self.sort_journal_chronologically(journal_content)
         if sorted_journal != journal_content:
             self.preview_text.setPlainText(sorted_journal)
+            self.day = None
 
-    def insert_entry_chronologically(self, journal_content, new_entry):
-        """Insert a new entry at the correct chronological position in the journal"""
-        lines = journal_content.strip().split('\n')
-        
-        # Extract time from new entry
-        new_entry_time = self.extract_time_from_entry(new_entry)
-        if not new_entry_time:
-            # If no time found, append to end
-            return journal_content + new_entry + "\n"
-        
-        # Find the correct position to insert
-        insert_position = len(lines)  # Default to end
-        
-        for i, line in enumerate(lines):
-            if line.startswith('Date:'):
-                continue
-                
-            line_time = self.extract_time_from_entry(line)
-            if line_time:
-                # Use proper time comparison
-                if self.parse_time_for_sorting(line_time) > self.parse_time_for_sorting(new_entry_time):
-                    insert_position = i
-                    break
-        
-        # Insert the new entry at the correct position
-        lines.insert(insert_position, new_entry)
-        
-        # Reconstruct the journal content
-        return '\n'.join(lines) + '\n'
-
-    def extract_time_from_entry(self, entry):
-        """Extract time from an entry string (e.g., '11:03am take fish oil' -> '11:03am')"""
-        words = entry.strip().split()
-        if not words:
-            return None
-            
-        time_str = words[0]
-        
-        # Check if it's a valid time format (e.g., 11:03am, 2:30pm)
-        if ':' in time_str and ('am' in time_str.lower() or 'pm' in time_str.lower()):
-            return time_str.lower()
-        
-        return None
-
-    def parse_time_for_sorting(self, time_str):
-        """Parse time string for proper chronological sorting"""
-        if not time_str:
-            return (0, 0, 0)  # Default for invalid times
-        
-        time_str = time_str.lower().strip()
-        
-        # Handle formats like "8:30am", "10:06am", "2:15pm"
-        if ':' in time_str and ('am' in time_str or 'pm' in time_str):
-            try:
-                # Split time and period
-                if 'am' in time_str:
-                    period = 'am'
-                    time_part = time_str.replace('am', '').strip()
-                else:
-                    period = 'pm'
-                    time_part = time_str.replace('pm', '').strip()
-                
-                # Split hours and minutes
-                if ':' in time_part:
-                    hours, minutes = map(int, time_part.split(':'))
-                else:
-                    hours = int(time_part)
-                    minutes = 0
-                
-                # Convert to 24-hour format for proper sorting
-                if period == 'pm' and hours != 12:
-                    hours += 12
-                elif period == 'am' and hours == 12:
-                    hours = 0
-                
-                return (hours, minutes, 0)
-            except (ValueError, AttributeError):
-                return (0, 0, 0)
-        
-        return (0, 0, 0)  # Default for invalid times
+    def current_day(self):
+        """The preview as a DayLines, re-parsed only if the text changed outside add_entry"""
+        document = self.preview_text.document()
+        if (self.day is None or self._day_revision != document.revision()
+                or document.blockCount() != len(self.day)):
+            self.day = DayLines(self.preview_text.toPlainText())
+            self._day_revision = document.revision()
+        return self.day
 
     def sort_journal_chronologically(self, journal_content):
         """Sort all journal entries chronologically"""
-        lines = journal_content.strip().split('\n')
-        
-        # Separate header from entries
-        header_lines = []
-        entry_lines = []
-        
-        for line in lines:
-            if line.startswith('Date:'):
-                header_lines.append(line)
-            else:
-                entry_lines.append(line)
-        
-        # Sort entry lines by time using proper time parsing
-        entry_lines.sort(key=lambda x: self.parse_time_for_sorting(self.extract_time_from_entry(x)))
-        
-        # Reconstruct journal with header first, then sorted entries
-        sorted_lines = header_lines + entry_lines
-        return '\n'.join(sorted_lines) + '\n'
+        # shared with maintenance.py, which sorts every day of the history
+        return sort_journal(journal_content)
 
     def save_active_discomforts(self):
         """Save active discomforts to a JSON file"""
-        if not os.path.exists("Journal"):
-            os.makedirs("Journal")
-        
-        filename = os.path.join("Journal", "active_discomforts.json")
-        with open(filename, 'w') as file:
-            json.dump(self.active_discomforts, file, indent=2)
-
-    def load_active_discomforts(self):
-        """Load active discomforts from a JSON file"""
-        filename = os.path.join("Journal", "active_discomforts.json")
-        if os.path.exists(filename):
-            try:
-                with open(filename, 'r') as file:
-                    self.active_discomforts = json.load(file)
-            except (json.JSONDecodeError, FileNotFoundError):
-                self.active_discomforts = {}
+        self._write_state(options.ACTIVE_DISCOMFORTS_FILE,
+                          {name: dict(data) for name, data in self.active_discomforts.items()})
+
+    def load_active_discomforts(self, loaded=None):
+        """Load active discomforts from a JSON file (or take ones already read from it)"""
+        if loaded is None:
+            loaded = options.load_active_discomforts(read=self.core.read_state)
+        self.active_discomforts = loaded
+        self._loaded_state(options.ACTIVE_DISCOMFORTS_FILE, self.active_discomforts)
+
+    def check_external_changes(self):
+        """Re-index what changed on disk (on the worker), then reload what the window shows of it"""
+        # what the state files held for us when the scan was queued
+        expected = dict(self._state_hashes)
+        self.worker.submit("external", self._scan_external,
+                           callback=lambda result: self.apply_external_changes(result, expected))
+
+    def _scan_external(self):
+        """Dates of the days changed outside the app, the open one if its entry log was
+        held back, and the state files as they are now"""
+        held = None
+        with self.store.lock:
+            days = self.core.refresh()
+            if self.loaded_date in days and self.log.pending(self.loaded_date):
+                # don't let its pending compaction fold our entries over the new file before the user decides
+                held = self.loaded_date
+                self.log.hold(held)
+        states = {options.TYPE_OPTIONS_FILE: options.load_type_options(read=self.core.read_state),
+                  options.TYPE_STACKS_FILE: options.load_type_stacks(read=self.core.read_state),
+                  options.ACTIVE_DISCOMFORTS_FILE: options.load_active_discomforts(read=self.core.read_state)}
+        return days, held, states
+
+    def apply_external_changes(self, result, expected):
+        days, held, states = result
+        reloads = {options.TYPE_OPTIONS_FILE: self.load_type_options,
+                   options.TYPE_STACKS_FILE: self.load_type_stacks,
+                   options.ACTIVE_DISCOMFORTS_FILE: self.load_active_discomforts}
+        for filename, data in states.items():
+            saved = self._state_hashes.get(filename)
+            # not loaded yet (read fresh on first use), or written by us since the scan was queued
+            if saved is None or saved != expected.get(filename) or self.worker.pending(filename):
+                continue
+            as_json = data if filename == options.ACTIVE_DISCOMFORTS_FILE else options.as_json(data)
+            if content_hash(json.dumps(as_json, sort_keys=True)) == saved:
+                continue
+            reloads[filename](data)
+            if filename == options.ACTIVE_DISCOMFORTS_FILE:
+                self.update_discomfort_table()
+            else:
+                self.update_options(self.type.currentText())
+
+        # the held day too, in case the window moved to another day meanwhile
+        for date_str in dict.fromkeys([held, self.loaded_date]):
+            if date_str in days:
+                self.reload_external_day(date_str)
+        if days and self.calendar_dialog is not None and self.calendar_dialog.isVisible():
+            self.calendar_dialog.refresh()
+
+    def reload_external_day(self, date_str):
+        """A day changed on disk: show the new version, asking first if that loses edits"""
+        loaded = date_str == self.loaded_date
+        if (loaded and self.dirty_editors()) or self.log.pending(date_str):
+            answer = QMessageBox.question(
+                self, "Journal",
+                f"The journal for {date_str} was changed outside this window while it had "
+                "unsaved edits here.\n\nReload it and discard your edits? (No keeps your "
+                "version and saves it over the other one.)",
+                QMessageBox.Yes | QMessageBox.No, QMessageBox.Yes)
+            if answer != QMessageBox.Yes:
+                if loaded:
+                    self._saved_hashes = None  # so the save below can't be skipped
+                    self.save_journal()        # logged after the held entries, compacted with them
+                else:
+                    self.worker.submit(None, self.log.compact, date_str)
+                return
+            self.worker.submit(None, self.log.discard, date_str)
+            if loaded:
+                self._saved_hashes = self._editor_hashes()  # given up: nothing left to save
+        if loaded:
+            self.autosave_timer.stop()
+            self.load_journal()
 
     def closeEvent(self, event):
+        if self.watcher is not None and self.watcher.flush():
+            # an outside change is still settling: look at it before saving over it
+            self.worker.flush()
+            self.apply_external_changes(self._scan_external(), dict(self._state_hashes))
+        # each save below is skipped if its content did not change
         self.save_journal()
-        # Save type options and stacks before closing
-        self.save_type_options()
-        self.save_type_stacks()
-        self.save_active_discomforts() # Save active discomforts on close
+        # Save type options and stacks before closing (unless never loaded, so unchanged)
+        if self._type_options is not None:
+            self.save_type_options()
+        if self._type_stacks is not None:
+            self.save_type_stacks()
+        if self._active_discomforts is not None:
+            self.save_active_discomforts() # Save active discomforts on close
+        # fold the entry logs into the day files and wait for all writes to finish
+        self.worker.submit(None, self.core.close)
+        self.worker.stop()
         super().closeEvent(event)
     
     
 
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
-    window = Journal()
+    parser = argparse.ArgumentParser(description="Daily journal")
+    parser.add_argument("--backend", choices=BACKENDS, help="storage (default: $JOURNAL_BACKEND, else files)")
+    args, qt_args = parser.parse_known_args()
+    app = QApplication(sys.argv[:1] + qt_args)
+    constructing = time.perf_counter()
+    window = Journal(backend=args.backend)
+    if os.environ.get("JOURNAL_STARTUP_TIMING"):
+        window.startup_timing = {"imported": IMPORTED_TIME, "constructing": constructing,
+                                 "constructed": time.perf_counter()}
     window.show()
     sys.exit(app.exec())
     
\ No newline at end of file
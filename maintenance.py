@@ -0,0 +1,126 @@
+"""Sort and normalize every day of the history, using all cores.
+
+The window only sorts the day it has open; hand-edited older days can stay
+out of order or written differently ("9:30 AM", "rating: 1", "zinc ,vit c").
+This walks every Journal/*.txt with a process pool, rewrites each day's
+journal as the app would (normalize_journal in entry_parser.py), leaves the
+Notes: and Changes: sections as they are, and atomically replaces only the
+files that changed. Run it while the app is closed.
+
+    python maintenance.py               # tidy every day
+    python maintenance.py --dry-run     # only report what would change
+    python maintenance.py --jobs 4 --verbose
+"""
+import os
+import sys
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple, Optional
+from core import JournalCore
+from entry_parser import compose_day, normalize_journal, split_sections
+from persist import write_text
+from store import date_ordinal
+
+
+class Result(NamedTuple):
+    path: str
+    changed: bool
+    seconds: float
+    error: Optional[str] = None
+
+
+def tidy_day(content):
+    """A day file's content with its journal sorted and normalized"""
+    journal_entry, notes_text, changes_text, _ = split_sections(content)
+    return compose_day(normalize_journal(journal_entry), notes_text, changes_text)
+
+
+def process_file(path, dry_run=False):
+    """Tidy one day file in a worker process (written atomically, and only if it changed)"""
+    started = time.perf_counter()
+    try:
+        with open(path, 'r') as file:
+            content = file.read()
+        tidied = tidy_day(content)
+        changed = tidied != content
+        if changed and not dry_run:
+            write_text(path, tidied)
+    except (OSError, UnicodeDecodeError) as error:
+        return Result(path, False, time.perf_counter() - started, str(error))
+    return Result(path, changed, time.perf_counter() - started)
+
+
+def _process_chunk(paths, dry_run):
+    return [process_file(path, dry_run) for path in paths]
+
+
+def day_files(root="Journal"):
+    """Paths of the dd-MM-yyyy.txt files under root, oldest first"""
+    if not os.path.exists(root):
+        return []
+    days = [(date_ordinal(entry.name[:-4]), entry.path) for entry in os.scandir(root)
+            if entry.name.endswith(".txt") and date_ordinal(entry.name[:-4]) is not None]
+    return [path for _, path in sorted(days)]
+
+
+def run(root="Journal", jobs=None, dry_run=False, chunk_size=64):
+    """Tidy every day with a pool of `jobs` processes (default: one per core).
+
+    Returns the Results and the number of processes that did the work.
+    """
+    core = JournalCore(root)
+    if not dry_run:
+        # pending entry logs go into the day files first, so nothing is tidied twice
+        core.log.recover()
+    paths = day_files(root)
+    # days are small: hand them out in chunks so process overhead doesn't dominate
+    chunks = [paths[i:i + chunk_size] for i in range(0, len(paths), chunk_size)]
+    results = []
+    workers = 1 if jobs == 1 or len(chunks) <= 1 else min(jobs or os.cpu_count() or 1, len(chunks))
+    if workers == 1:
+        for chunk in chunks:
+            results.extend(_process_chunk(chunk, dry_run))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for chunk_results in pool.map(_process_chunk, chunks, [dry_run] * len(chunks)):
+                results.extend(chunk_results)
+    if not dry_run and any(result.changed for result in results):
+        # re-index the rewritten days (index, search index, episodes)
+        core.open()
+    core.store.flush()
+    return results, workers
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sort and normalize every journal day")
+    parser.add_argument("--root", default="Journal", help="journal folder (default: Journal)")
+    parser.add_argument("--jobs", type=int, default=None, help="worker processes (default: one per core)")
+    parser.add_argument("--dry-run", action="store_true", help="report the days that would change, write nothing")
+    parser.add_argument("--verbose", action="store_true", help="print the time taken for every file")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    results, workers = run(args.root, jobs=args.jobs, dry_run=args.dry_run)
+    elapsed = time.perf_counter() - started
+
+    for result in results:
+        if result.error:
+            print(f"{result.path}: {result.error}", file=sys.stderr)
+        elif args.verbose or result.changed:
+            state = "changed" if result.changed else "ok"
+            print(f"{os.path.basename(result.path)}  {state:<7}  {result.seconds * 1000:.2f}ms")
+    changed = sum(result.changed for result in results)
+    errors = sum(result.error is not None for result in results)
+    busy = sum(result.seconds for result in results)
+    verb = "would change" if args.dry_run else "changed"
+    print(f"{len(results)} days, {changed} {verb}, {errors} errors in {elapsed:.2f}s "
+          f"({busy:.2f}s of work, {workers} worker processes)")
+    if results:
+        slowest = max(results, key=lambda result: result.seconds)
+        print(f"slowest: {os.path.basename(slowest.path)} {slowest.seconds * 1000:.2f}ms")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,209 @@
+from datetime import datetime
+from PySide6.QtCore import Qt, QAbstractListModel, QAbstractTableModel, QModelIndex
+from entry_parser import parse_time
+
+
+# rows of the separator and header only have text for the combo, not the completer
+COMPLETION_ROLE = Qt.UserRole + 1
+
+
+class EntryOptionsModel(QAbstractListModel):
+    """One type's options for the entry combo, then its saved stacks.
+
+    Rows are the options, followed (when there are stacks) by a separator, a
+    disabled "Saved stacks" header and the stacks. The model wraps the
+    type's OptionLists and reports appends and removals as row changes, so
+    switching types or saving a stack never refills the combo.
+    """
+
+    STACKS_HEADER = "Saved stacks"
+
+    def __init__(self, options, stacks=None, parent=None):
+        super().__init__(parent)
+        self.options = options
+        self.stacks = stacks
+        # row-indexable copies of the OptionLists, kept in step by the methods below
+        self._options = list(options)
+        self._stacks = list(stacks) if stacks is not None else []
+
+    def stacks_first_row(self):
+        """Row of the first stack, or None if there are none"""
+        return len(self._options) + 2 if self._stacks else None
+
+    def is_stack_row(self, row):
+        first = self.stacks_first_row()
+        return first is not None and row >= first
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._options) + (len(self._stacks) + 2 if self._stacks else 0)
+
+    def _name(self, row):
+        """(name, kind) of a row; kind is "option", "stack", "separator" or "header" """
+        if row < len(self._options):
+            return self._options[row], "option"
+        row -= len(self._options)
+        if row == 0:
+            return "", "separator"
+        if row == 1:
+            return self.STACKS_HEADER, "header"
+        return self._stacks[row - 2], "stack"
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= self.rowCount():
+            return None
+        name, kind = self._name(index.row())
+        if role in (Qt.DisplayRole, Qt.EditRole, Qt.ToolTipRole):
+            return name
+        if role == COMPLETION_ROLE:
+            return name if kind in ("option", "stack") else None
+        if role == Qt.AccessibleDescriptionRole and kind == "separator":
+            return "separator"  # drawn as a line by the combo's popup
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        if self._name(index.row())[1] in ("separator", "header"):
+            return Qt.NoItemFlags
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable
+
+    def options_appended(self):
+        """Show the names appended to the options since the model last looked"""
+        added = list(self.options)[len(self._options):]
+        if added:
+            first = len(self._options)
+            self.beginInsertRows(QModelIndex(), first, first + len(added) - 1)
+            self._options.extend(added)
+            self.endInsertRows()
+
+    def stacks_appended(self):
+        """Show the stacks appended since the model last looked (with the header for the first one)"""
+        if self.stacks is None:
+            return
+        added = list(self.stacks)[len(self._stacks):]
+        if added:
+            first = self.rowCount() if self._stacks else len(self._options)
+            last = first + len(added) - 1 + (0 if self._stacks else 2)
+            self.beginInsertRows(QModelIndex(), first, last)
+            self._stacks.extend(added)
+            self.endInsertRows()
+
+    def remove(self, name, stack=False):
+        """Remove an option (or stack) equal to name from the model and its OptionList"""
+        names = self._stacks if stack else self._options
+        source = self.stacks if stack else self.options
+        # the rows mirror the OptionList (appends go at the end), so its position is the row
+        try:
+            row = source.index(name) if source is not None else len(names)
+        except ValueError:
+            return False
+        if row >= len(names):
+            return False  # appended but not shown yet
+        source.discard(name)
+        if stack:
+            first = len(self._options)
+            if len(self._stacks) == 1:
+                # last stack: the separator and header go too
+                self.beginRemoveRows(QModelIndex(), first, first + 2)
+            else:
+                self.beginRemoveRows(QModelIndex(), first + 2 + row, first + 2 + row)
+        else:
+            self.beginRemoveRows(QModelIndex(), row, row)
+        del names[row]
+        self.endRemoveRows()
+        return True
+
+
+def elapsed_text(data, now):
+    """How long a tracked discomfort has been going, e.g. '2h 05m' ('' if unknown)"""
+    minutes = parse_time(data.get("start_time", ""))
+    try:
+        started = datetime.strptime(data.get("start_date", ""), "%d-%m-%Y")
+    except ValueError:
+        return ""
+    if minutes is None:
+        return ""
+    elapsed = int((now - started).total_seconds() // 60) - minutes
+    if elapsed < 0:
+        return ""
+    hours, minutes = divmod(elapsed, 60)
+    if hours >= 24:
+        return f"{hours // 24}d {hours % 24}h"
+    return f"{hours}h {minutes:02d}m"
+
+
+class DiscomfortModel(QAbstractTableModel):
+    """Active discomforts; changes arrive as per-discomfort updates, not full rebuilds"""
+
+    HEADERS = ("Discomfort", "Rating", "Start Time", "Elapsed")
+    ELAPSED = 3
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.names = []       # row order (the order discomforts were first tracked)
+        self.discomforts = {}  # name -> {"rating", "start_time", "start_date"}
+        self.now = datetime.now()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.names)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role != Qt.DisplayRole:
+            return None
+        name = self.names[index.row()]
+        data = self.discomforts[name]
+        column = index.column()
+        if column == 0:
+            return name
+        if column == 1:
+            return f"Rating {data['rating']}"
+        if column == 2:
+            # Start time (only time, no date)
+            return data['start_time']
+        return elapsed_text(data, self.now)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def set_discomfort(self, name, data):
+        """Add a discomfort, or update its row if it is already tracked"""
+        if name in self.discomforts:
+            if self.discomforts[name] != data:
+                self.discomforts[name] = dict(data)
+                row = self.names.index(name)
+                self.dataChanged.emit(self.index(row, 0), self.index(row, self.ELAPSED))
+            return
+        row = len(self.names)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.names.append(name)
+        self.discomforts[name] = dict(data)
+        self.endInsertRows()
+
+    def remove_discomfort(self, name):
+        if name not in self.discomforts:
+            return
+        row = self.names.index(name)
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self.names[row]
+        del self.discomforts[name]
+        self.endRemoveRows()
+
+    def sync(self, active_discomforts):
+        """Apply the differences from {name: data} as removals, updates and inserts"""
+        for name in [name for name in self.names if name not in active_discomforts]:
+            self.remove_discomfort(name)
+        for name, data in active_discomforts.items():
+            self.set_discomfort(name, data)
+
+    def refresh_elapsed(self):
+        """Recompute only the elapsed column"""
+        self.now = datetime.now()
+        if self.names:
+            self.dataChanged.emit(self.index(0, self.ELAPSED), self.index(len(self.names) - 1, self.ELAPSED))
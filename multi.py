@@ -1,6 +1,108 @@
 from PySide6.QtWidgets import (QVBoxLayout, QListWidget, QAbstractItemView, QDialog, 
-                               QDialogButtonBox, QHBoxLayout, QLabel, QSpinBox, QWidget)
-from PySide6.QtCore import Qt, QTimer
+                               QDialogButtonBox, QLabel, QSpinBox, QLineEdit, QTableView,
+                               QHeaderView, QStyledItemDelegate)
+from PySide6.QtCore import Qt, QTimer, QAbstractTableModel, QModelIndex
+
+
+def filter_list(list_widget, text):
+    """Hide the items that don't contain text (ignoring case); selection is kept"""
+    text = text.strip().casefold()
+    for row in range(list_widget.count()):
+        item = list_widget.item(row)
+        item.setHidden(bool(text) and text not in item.text().casefold())
+
+
+def filter_box(list_widget):
+    """A line edit that filters list_widget as you type"""
+    box = QLineEdit()
+    box.setPlaceholderText("Filter...")
+    box.setClearButtonEnabled(True)
+    box.textChanged.connect(lambda text: filter_list(list_widget, text))
+    return box
+
+
+class CountsModel(QAbstractTableModel):
+    """Selected items and their counts; rows are added/removed as the selection changes"""
+
+    HEADERS = ("Item", "Count")
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.rows = []     # [item, count] in selection order
+        self.counts = {}   # item -> count, kept while the item stays selected
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else 2
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        item = self.rows[index.row()]
+        if role in (Qt.DisplayRole, Qt.EditRole):
+            return item if index.column() == 0 else self.counts[item]
+        if role == Qt.TextAlignmentRole and index.column() == 1:
+            return int(Qt.AlignCenter)
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def flags(self, index):
+        flags = Qt.ItemIsEnabled | Qt.ItemIsSelectable
+        if index.column() == 1:
+            flags |= Qt.ItemIsEditable
+        return flags
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if role != Qt.EditRole or index.column() != 1:
+            return False
+        item = self.rows[index.row()]
+        count = min(max(int(value), 1), 99)
+        if self.counts[item] != count:
+            self.counts[item] = count
+            self.dataChanged.emit(index, index, [Qt.DisplayRole, Qt.EditRole])
+        return True
+
+    def set_selection(self, items):
+        """Make the rows match `items`, only touching the rows that changed"""
+        wanted = set(items)
+        for row in reversed(range(len(self.rows))):
+            if self.rows[row] not in wanted:
+                self.beginRemoveRows(QModelIndex(), row, row)
+                del self.counts[self.rows.pop(row)]
+                self.endRemoveRows()
+        added = [item for item in items if item not in self.counts]
+        if added:
+            first = len(self.rows)
+            self.beginInsertRows(QModelIndex(), first, first + len(added) - 1)
+            for item in added:
+                self.rows.append(item)
+                self.counts[item] = 1
+            self.endInsertRows()
+
+
+class CountDelegate(QStyledItemDelegate):
+    """Spin box editor for the count column (only exists while a cell is edited)"""
+
+    def createEditor(self, parent, option, index):
+        spinbox = QSpinBox(parent)
+        spinbox.setMinimum(1)
+        spinbox.setMaximum(99)
+        # commit as the value changes so OK never loses an open edit
+        spinbox.valueChanged.connect(lambda _: self.commitData.emit(spinbox))
+        return spinbox
+
+    def setEditorData(self, editor, index):
+        editor.setValue(int(index.data(Qt.EditRole)))
+
+    def setModelData(self, editor, model, index):
+        editor.interpretText()
+        model.setData(index, editor.value(), Qt.EditRole)
 
 class MultiDialogue(QDialog):
     def __init__(self, parent=None, options=None, title="Select"):
@@ -22,6 +124,7 @@ class MultiDialogue(QDialog):
         if options:
             self.list_widget.addItems(options)
 
+        layout.addWidget(filter_box(self.list_widget))
         layout.addWidget(self.list_widget)
 
         # ok and cancel button
@@ -80,23 +183,21 @@ class MultiDialogueWithCounts(QDialog):
         if options:
             self.list_widget.addItems(options)
 
+        layout.addWidget(filter_box(self.list_widget))
         layout.addWidget(self.list_widget)
 
-        # Count input section - create once and reuse
-        self.count_widget = QWidget()
-        self.count_layout = QVBoxLayout(self.count_widget)
-        self.count_layout.addWidget(QLabel("Selected items with quantities:"))
-        
-        # Add scroll area for count inputs to prevent excessive height
-        from PySide6.QtWidgets import QScrollArea
-        self.scroll_area = QScrollArea()
-        self.scroll_area.setWidget(self.count_widget)
-        self.scroll_area.setWidgetResizable(True)
-        self.scroll_area.setMaximumHeight(200)  # Limit height of count section
-        self.scroll_area.setVerticalScrollBarPolicy(Qt.ScrollBarAsNeeded)
-        self.scroll_area.setHorizontalScrollBarPolicy(Qt.ScrollBarAsNeeded)
-        
-        layout.addWidget(self.scroll_area)
+        # Count section: one row per selected item, the count edited in place
+        layout.addWidget(QLabel("Selected items with quantities:"))
+        self.counts_model = CountsModel(self)
+        self.count_view = QTableView()
+        self.count_view.setModel(self.counts_model)
+        self.count_view.setItemDelegateForColumn(1, CountDelegate(self.count_view))
+        self.count_view.setEditTriggers(QAbstractItemView.AllEditTriggers)
+        self.count_view.verticalHeader().setVisible(False)
+        self.count_view.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.count_view.horizontalHeader().setSectionResizeMode(1, QHeaderView.ResizeToContents)
+        self.count_view.setMaximumHeight(200)  # Limit height of count section
+        layout.addWidget(self.count_view)
 
         # ok and cancel button
         dialogue_butn = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
@@ -106,98 +207,30 @@ class MultiDialogueWithCounts(QDialog):
 
         self.setLayout(layout)
         
-        # Store count inputs
-        self.count_inputs = {}
-        
         # Store current selection to prevent rapid changes
         self.current_selection = set()
-        
-        # Initialize count section
-        self.on_selection_changed()
 
     def on_selection_changed_delayed(self):
         """Delayed selection change handler to prevent rapid multiple selections"""
         self.selection_timer.start()
 
     def on_selection_changed(self):
-        """Update the count input section when selection changes"""
-        # Get current selection
-        selected_items = self.list_widget.selectedItems()
-        selected_texts = [item.text() for item in selected_items]
+        """Add/remove count rows for the items whose selection changed"""
+        selected_texts = [item.text() for item in self.list_widget.selectedItems()]
         
         # Only update if selection actually changed significantly
         if set(selected_texts) == self.current_selection:
             return
             
         self.current_selection = set(selected_texts)
-        
-        # Clear existing count inputs
-        for i in reversed(range(self.count_layout.count())):
-            child = self.count_layout.itemAt(i)
-            if child.widget():
-                child.widget().setParent(None)
-            elif child.layout():
-                # Clear layout items
-                for j in reversed(range(child.layout().count())):
-                    layout_child = child.layout().itemAt(j)
-                    if layout_child.widget():
-                        layout_child.widget().setParent(None)
-        
-        # Store count inputs
-        self.count_inputs = {}
-        
-        # Add count inputs for selected items
-        for item in selected_items:
-            item_text = item.text()
-            
-            # Create horizontal layout for item and count
-            item_layout = QHBoxLayout()
-            
-            # Item label
-            item_label = QLabel(item_text)
-            item_label.setMinimumWidth(150)
-            item_label.setMaximumWidth(200)  # Prevent excessive width
-            item_layout.addWidget(item_label)
-            
-            # Count label
-            count_label = QLabel("Count:")
-            item_layout.addWidget(count_label)
-            
-            # Count spinbox
-            count_spinbox = QSpinBox()
-            count_spinbox.setMinimum(1)
-            count_spinbox.setMaximum(99)
-            count_spinbox.setValue(1)
-            count_spinbox.setMaximumWidth(60)
-            item_layout.addWidget(count_spinbox)
-            
-            # Add stretch to push everything to the left
-            item_layout.addStretch()
-            
-            # Add to main count layout
-            self.count_layout.addLayout(item_layout)
-            
-            # Store reference to spinbox
-            self.count_inputs[item_text] = count_spinbox
-        
-        # Force layout update and maintain dialog size
-        self.count_widget.updateGeometry()
-        self.scroll_area.updateGeometry()
-        self.adjustSize()
-        
-        # Ensure dialog doesn't shrink below minimum
-        if self.height() < 500:
-            self.resize(self.width(), 500)
+        self.counts_model.set_selection(selected_texts)
 
     def get_items_with_counts(self):
         """Returns a list of tuples: (item_text, count)"""
         selected_items = []
         for item in self.list_widget.selectedItems():
             item_text = item.text()
-            count = self.count_inputs.get(item_text, 1)
-            if hasattr(count, 'value'):
-                count = count.value()
-            selected_items.append((item_text, count))
+            selected_items.append((item_text, self.counts_model.counts.get(item_text, 1)))
         return selected_items
 
     def get_items(self):
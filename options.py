@@ -0,0 +1,132 @@
+import os
+from entry_parser import normalize_text
+from persist import read_json
+
+
+TYPE_OPTIONS_FILE = os.path.join("options", "type_options.json")
+TYPE_STACKS_FILE = os.path.join("options", "type_stacks.json")
+ACTIVE_DISCOMFORTS_FILE = os.path.join("Journal", "active_discomforts.json")
+
+# type options
+DEFAULT_TYPE_OPTIONS = {
+    "Daily": ["poop"],
+    "Food": ["fish", "dumplings", "ginger", "plum", "olive paste", "cumin", "olive oil", "spinash", "pizza", "little fish", "cereal",
+             "peanut butter", "chips", "chips(sweet potatoes)", "tuna and beans", "chocolate", "orange", "yogurt(with cereal and berries), creatine",
+            "strawberries", "chips(corn)", "steak, noodles, salad with special sauce", "salmon(oyster sauce)"],
+    "Drink": ["electrolyte"],
+    "Activity": ["walk", "ice bath", "run", "uni"],
+    "Supplement": [
+        "vit c", "L-theanine", "DL-phenyl", "NAC", "Ashwagandha", "lithium", "Bacopa Monniery", "5-htp", "L-tryptophan",
+        "slippery elm", "zinc", "lecithin", "p5p", "Alpha-GPC", "Methy-Folate", "vit d", "aniracetam", "digestive enzyme",
+         "fish oil", "john wort", "panadol", "bcaa", "bismuth potassium", "creatine", "silymarine", "magnesium", "moringa",
+         "gotu kola", "benfotiamine", "oxytocin", "CBD oil", "reishi", "rutin", "quercetin", "Holy basil", "Bromantane(50mg)"],
+    "Discomfort": ["upper-abdominal pain", "anxiety", "fatigue", "testicular pain"],
+    "Medication": ["Dexamphetamine", "Vyvanse (70mg)", "Lexapro", "Guanfacine", "Accutane"]
+}
+
+# saved multi-select stacks for Food and Supplement
+DEFAULT_TYPE_STACKS = {"Food": [], "Supplement": []}
+
+
+class OptionList:
+    """Option names in insertion order, indexed by their normalized text.
+
+    Membership, append and discard ignore case and surrounding whitespace
+    and are O(1); iterating yields the names as first added, which is what
+    is written back to JSON.
+    """
+
+    def __init__(self, names=()):
+        self._names = {}  # normalized name -> name, in insertion order
+        self._order = None  # ([names], {normalized name: position}), rebuilt after a change
+        self.extend(names)
+
+    def __iter__(self):
+        return iter(self._names.values())
+
+    def __len__(self):
+        return len(self._names)
+
+    def __contains__(self, name):
+        return isinstance(name, str) and normalize_text(name) in self._names
+
+    def _ordered(self):
+        if self._order is None:
+            self._order = (list(self._names.values()), {key: i for i, key in enumerate(self._names)})
+        return self._order
+
+    def __getitem__(self, index):
+        return self._ordered()[0][index]
+
+    def index(self, name):
+        """Position of the name equal to `name` (ValueError if there is none)"""
+        position = self._ordered()[1].get(normalize_text(name))
+        if position is None:
+            raise ValueError(f"{name!r} is not in the list")
+        return position
+
+    def __eq__(self, other):
+        if isinstance(other, (OptionList, list)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    # mutable and equal to lists, so unhashable like them
+    __hash__ = None
+
+    def __repr__(self):
+        return f"OptionList({list(self)!r})"
+
+    def append(self, name):
+        """Add name unless an equal one is already there; True if it was added"""
+        key = normalize_text(name)
+        if key in self._names:
+            return False
+        self._names[key] = name
+        self._order = None
+        return True
+
+    def extend(self, names):
+        for name in names:
+            self.append(name)
+
+    def discard(self, name):
+        """Remove the name equal to `name`; True if there was one"""
+        if self._names.pop(normalize_text(name), None) is None:
+            return False
+        self._order = None
+        return True
+
+
+def as_json(groups):
+    """{type: [names]} for writing type options or stacks"""
+    return {key: list(names) for key, names in groups.items()}
+
+
+def load_type_options(filename=TYPE_OPTIONS_FILE, read=read_json):
+    """Default type options merged with the saved ones (saved items appended after defaults).
+
+    `read` gets the saved data for a filename (a backend's read_state).
+    """
+    type_options = {key: OptionList(items) for key, items in DEFAULT_TYPE_OPTIONS.items()}
+    saved_options = read(filename) or {}
+    for key, saved_value in saved_options.items():
+        if key in type_options:
+            # Add saved options that aren't already in defaults
+            type_options[key].extend(saved_value)
+    return type_options
+
+
+def load_type_stacks(filename=TYPE_STACKS_FILE, read=read_json):
+    """Saved stacks for the types that have them"""
+    type_stacks = {key: OptionList(items) for key, items in DEFAULT_TYPE_STACKS.items()}
+    saved_stacks = read(filename) or {}
+    # Update only the types that exist in saved data
+    for key, value in saved_stacks.items():
+        if key in type_stacks:
+            type_stacks[key] = OptionList(value)
+    return type_stacks
+
+
+def load_active_discomforts(filename=ACTIVE_DISCOMFORTS_FILE, read=read_json):
+    """{discomfort_name: {"rating": int, "start_time": str, "start_date": str}}"""
+    return read(filename) or {}
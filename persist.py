@@ -0,0 +1,79 @@
+"""Crash-safe JSON state files.
+
+write_json writes a temp file next to the target, fsyncs it and renames it
+over the target, so a crash leaves either the old or the new file, never a
+half-written one. Before that the previous file (if it parses) is kept as
+`<name>.1`, shifting older generations to `.2`, ... read_json falls back to
+the newest generation that parses.
+"""
+import os
+import json
+import tempfile
+
+
+# generations kept for user state (options, stacks, discomforts); indexes that can
+# be rebuilt from the journal pass backups=0
+BACKUPS = 2
+
+
+def _fsync_directory(directory):
+    """Make a rename durable (POSIX only; Windows has no directory handles)"""
+    if os.name == "nt":
+        return
+    fd = os.open(directory or ".", os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def write_text(filename, text):
+    """Atomically replace filename with text (temp file, fsync, rename)"""
+    directory = os.path.dirname(filename)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory, exist_ok=True)
+    fd, temp_name = tempfile.mkstemp(dir=directory or ".", prefix=os.path.basename(filename) + ".",
+                                     suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w') as file:
+            file.write(text)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_name, filename)
+    except BaseException:
+        if os.path.exists(temp_name):
+            os.remove(temp_name)
+        raise
+    _fsync_directory(directory)
+
+
+def write_json(filename, data, backups=BACKUPS):
+    """Write a JSON state file compactly and atomically, keeping `backups` older generations"""
+    text = json.dumps(data, separators=(",", ":"))
+    if backups:
+        try:
+            with open(filename, 'rb') as file:
+                previous = file.read()
+            json.loads(previous)
+        except (OSError, ValueError):
+            previous = None  # missing or already corrupted: keep the older generations as they are
+        if previous is not None:
+            for generation in range(backups - 1, 0, -1):
+                older = f"{filename}.{generation}"
+                if os.path.exists(older):
+                    os.replace(older, f"{filename}.{generation + 1}")
+            # a copy, not a rename, so the file itself never goes missing
+            with open(f"{filename}.1", 'wb') as backup:
+                backup.write(previous)
+    write_text(filename, text)
+
+
+def read_json(filename, default=None, backups=BACKUPS):
+    """The file's data, or the newest backup generation that parses, or default"""
+    for candidate in [filename] + [f"{filename}.{generation}" for generation in range(1, backups + 1)]:
+        try:
+            with open(candidate, 'r') as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            continue  # missing, torn or corrupted: try the previous generation
+    return default
@@ -0,0 +1,228 @@
+"""Summaries of a date range: what was taken, eaten and felt, and how much.
+
+Days are streamed through a generator pipeline (read -> parse -> tally), so
+only the running totals are kept in memory however long the range is:
+
+    item counts    quantities included ("2 vit c" counts 2)
+    first/last     when each item was first and last logged in the range
+    dosages        total mg, from "(5mg)" medication lines and items like "Vyvanse (70mg)"
+    discomfort     hours per discomfort, from the episodes clipped to the range
+
+    python report.py --month                     # this month so far
+    python report.py --week --to 18-10-2026      # the 7 days up to a date
+    python report.py --from 01-09-2026 --to 30-09-2026 --format csv > september.csv
+"""
+import re
+import sys
+import csv
+import json
+import argparse
+from datetime import date, datetime, timedelta
+from typing import NamedTuple, Optional
+from core import create_core, BACKENDS, today_str
+from entry_parser import dosage_mg, format_time, normalize_text, parse_body, split_sections
+from store import DATE_FORMAT, date_ordinal
+
+
+# "Vyvanse (70mg)", "Bromantane(50mg)", "Dexamphetamine 5mg"
+_ITEM_DOSAGE = re.compile(r'^(?P<item>.*?)\s*\(?(?P<mg>\d+(?:\.\d+)?)\s*mg\)?$', re.IGNORECASE)
+
+
+class ItemSummary(NamedTuple):
+    type: str
+    item: str                 # as first written in the range
+    count: int                # sum of quantities
+    entries: int              # lines it appeared on
+    first: str                # "dd-MM-yyyy h:mmam" (no time for untimed lines)
+    last: str
+    dosage_mg: Optional[float] = None
+    discomfort_hours: Optional[float] = None
+
+
+class DiscomfortSummary(NamedTuple):
+    name: str
+    hours: float
+    episodes: int
+    max_rating: int
+
+
+def read_days(core, start, end):
+    """(date_str, content) for each day in the range, oldest first"""
+    days = set(core.store.days(start, end))
+    # days whose entries are all still in the entry log (the last few seconds' worth)
+    lo, hi = date_ordinal(start), date_ordinal(end)
+    days.update(date_str for date_str in core.log.pending_days() if lo <= date_ordinal(date_str) <= hi)
+    for date_str in sorted(days, key=date_ordinal):
+        content = core.log.read_day(date_str)
+        if content is not None:
+            yield date_str, content
+
+
+def parse_days(days):
+    """(date_str, entry) for every entry of the days"""
+    for date_str, content in days:
+        for entry in parse_body(split_sections(content)[0]):
+            yield date_str, entry
+
+
+def _stamp(date_str, minutes):
+    return f"{date_str} {format_time(minutes)}" if minutes is not None else date_str
+
+
+class RangeReport:
+    """Running totals for a date range, fed one entry at a time"""
+
+    def __init__(self, start, end):
+        self.start = start
+        self.end = end
+        self.days = 0           # days with entries (they arrive one day at a time)
+        self._day = None
+        self.entries = 0
+        self._items = {}        # {(type, item_norm): [item, count, entries, first, last, dosage_mg]}
+        self._discomforts = {}  # {name: DiscomfortSummary}
+
+    def consume(self, entries):
+        for date_str, entry in entries:
+            self.add(date_str, entry)
+        return self
+
+    def add(self, date_str, entry):
+        if date_str != self._day:
+            self._day = date_str
+            self.days += 1
+        self.entries += 1
+        if entry.type == "Daily" or entry.kind == "finished":
+            return  # counted by their "started" line
+        when = (date_ordinal(date_str), entry.minutes if entry.minutes is not None else -1, date_str, entry.minutes)
+        mg = dosage_mg(entry.dosage)
+        for item, quantity in zip(entry.items, entry.quantities):
+            item_mg = mg
+            if item_mg is None:
+                match = _ITEM_DOSAGE.match(item)
+                if match and match.group('item'):
+                    item, item_mg = match.group('item'), float(match.group('mg'))
+            key = (entry.type, normalize_text(item))
+            tally = self._items.get(key)
+            if tally is None:
+                tally = self._items[key] = [item, 0, 0, when, when, None]
+            tally[1] += quantity
+            tally[2] += 1
+            tally[3] = min(tally[3], when)
+            tally[4] = max(tally[4], when)
+            if item_mg is not None:
+                tally[5] = (tally[5] or 0) + item_mg * quantity
+
+    def add_episodes(self, episodes, now=None):
+        """Discomfort time from episodes, counting only the part inside the range"""
+        lo = date_ordinal(self.start) * 1440
+        hi = (date_ordinal(self.end) + 1) * 1440
+        now = now or datetime.now()
+        hi = min(hi, now.toordinal() * 1440 + now.hour * 60 + now.minute)
+        for episode in episodes:
+            start = max(episode.start, lo)
+            end = min(episode.end if episode.end is not None else hi, hi)
+            if end <= start:
+                continue
+            old = self._discomforts.get(episode.name)
+            self._discomforts[episode.name] = DiscomfortSummary(
+                episode.name, (old.hours if old else 0) + (end - start) / 60,
+                (old.episodes if old else 0) + 1,
+                max([rating for _, _, rating in episode.ratings] + [old.max_rating if old else 0]))
+        return self
+
+    def discomforts(self):
+        return sorted(self._discomforts.values(), key=lambda summary: -summary.hours)
+
+    def items(self):
+        """ItemSummary rows by type, most taken first"""
+        hours = {normalize_text(name): summary.hours for name, summary in self._discomforts.items()}
+        rows = []
+        for (entry_type, item_norm), (item, count, entries, first, last, mg) in self._items.items():
+            rows.append(ItemSummary(entry_type, item, count, entries, _stamp(*first[2:]), _stamp(*last[2:]),
+                                    round(mg, 2) if mg is not None else None,
+                                    round(hours[item_norm], 2) if entry_type == "Discomfort" and item_norm in hours
+                                    else None))
+        rows.sort(key=lambda row: (row.type, -row.count, normalize_text(row.item)))
+        return rows
+
+
+def build_report(core, start, end):
+    """Stream the range through read -> parse -> tally, then add the discomfort episodes"""
+    report = RangeReport(start, end).consume(parse_days(read_days(core, start, end)))
+    return report.add_episodes(core.episodes.query(start=start, end=end))
+
+
+def write_text_report(report, out):
+    print(f"Report {report.start} to {report.end}: {report.days} days, {report.entries} entries", file=out)
+    current_type = None
+    for row in report.items():
+        if row.type != current_type:
+            current_type = row.type
+            print(f"\n{current_type}", file=out)
+        extra = ""
+        if row.dosage_mg is not None:
+            extra += f"  {row.dosage_mg:g}mg total"
+        if row.discomfort_hours is not None:
+            extra += f"  {row.discomfort_hours:.1f}h"
+        print(f"  {row.item:<30} x{row.count:<6} first {row.first:<18} last {row.last:<18}{extra}", file=out)
+    discomforts = report.discomforts()
+    if discomforts:
+        print("\nDiscomfort hours", file=out)
+        for summary in discomforts:
+            print(f"  {summary.name:<30} {summary.hours:6.1f}h over {summary.episodes} episode(s), "
+                  f"max rating {summary.max_rating}", file=out)
+
+
+def write_csv_report(report, out):
+    writer = csv.writer(out)
+    writer.writerow(ItemSummary._fields)
+    for row in report.items():
+        writer.writerow(["" if value is None else value for value in row])
+
+
+def write_json_report(report, out):
+    json.dump({"start": report.start, "end": report.end, "days": report.days, "entries": report.entries,
+               "items": [row._asdict() for row in report.items()],
+               "discomforts": [summary._asdict() for summary in report.discomforts()]}, out, indent=2)
+    out.write("\n")
+
+
+WRITERS = {"text": write_text_report, "csv": write_csv_report, "json": write_json_report}
+
+
+def _date(value):
+    if date_ordinal(value) is None:
+        raise argparse.ArgumentTypeError(f"'{value}' is not a dd-mm-yyyy date")
+    return value
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarize what was logged over a date range")
+    parser.add_argument("--from", dest="start", type=_date, help="dd-mm-yyyy (default: first of the month)")
+    parser.add_argument("--to", dest="end", type=_date, default=today_str(), help="dd-mm-yyyy (default: today)")
+    period = parser.add_mutually_exclusive_group()
+    period.add_argument("--week", action="store_true", help="the 7 days up to --to")
+    period.add_argument("--month", action="store_true", help="the calendar month of --to, up to --to")
+    parser.add_argument("--format", choices=sorted(WRITERS), default="text")
+    parser.add_argument("--backend", choices=BACKENDS, help="storage (default: $JOURNAL_BACKEND, else files)")
+    args = parser.parse_args(argv)
+
+    end = datetime.strptime(args.end, DATE_FORMAT).date()
+    if args.week:
+        start = end - timedelta(days=6)
+    elif args.month or args.start is None:
+        start = date(end.year, end.month, 1)
+    else:
+        start = datetime.strptime(args.start, DATE_FORMAT).date()
+    if start > end:
+        parser.error("--from is after --to")
+
+    core = create_core(backend=args.backend, with_search=False)
+    core.open(read_only=True)
+    report = build_report(core, start.strftime(DATE_FORMAT), args.end)
+    WRITERS[args.format](report, sys.stdout)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
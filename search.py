@@ -0,0 +1,95 @@
+import os
+import json
+import threading
+from typing import NamedTuple
+from entry_parser import normalize_text
+from persist import read_json, write_text
+from store import date_ordinal
+
+
+class Hit(NamedTuple):
+    date: str       # dd-MM-yyyy
+    minutes: int    # minutes since midnight (-1 if the line had no time)
+    kind: str       # took / medication / ate / drink / started / finished / daily
+    item: str       # item as written
+
+
+class SearchIndex:
+    """Inverted index from normalized item name to where it appears in the journal.
+
+    Kept in step with a JournalStore (register it in store.listeners): each time
+    a day is indexed its old postings are dropped and the new ones added, so a
+    query never has to open a day file.
+    """
+
+    def __init__(self, root="Journal"):
+        self.path = os.path.join(root, "search_index.json")
+        self.postings = {}  # {item_norm: {date_str: [[minutes, kind, item], ...]}}
+        self.days = {}      # {date_str: {"mtime", "size", "items": [item_norm, ...]}}
+        self._dirty = False
+        self._lock = threading.Lock()
+        self.load()
+
+    def update_day(self, date_str, entries, record):
+        """Replace the postings of one day (entries None removes the day)"""
+        with self._lock:
+            old = self.days.pop(date_str, None)
+            if old is not None:
+                for item_norm in old["items"]:
+                    dates = self.postings.get(item_norm)
+                    if dates is not None:
+                        dates.pop(date_str, None)
+                        if not dates:
+                            del self.postings[item_norm]
+            if entries is not None:
+                items = set()
+                for entry in entries:
+                    minutes = entry.minutes if entry.minutes is not None else -1
+                    for item in entry.items:
+                        item_norm = normalize_text(item)
+                        if not item_norm:
+                            continue
+                        self.postings.setdefault(item_norm, {}).setdefault(date_str, []).append(
+                            [minutes, entry.kind or "daily", item])
+                        items.add(item_norm)
+                self.days[date_str] = {"mtime": record["mtime"], "size": record["size"], "items": sorted(items)}
+            self._dirty = True
+
+    def lookup(self, query, exact=False):
+        """All hits for items matching the query (substring match unless exact), newest first"""
+        query_norm = normalize_text(query)
+        hits = []
+        with self._lock:
+            if exact:
+                keys = [query_norm] if query_norm in self.postings else []
+            else:
+                keys = [key for key in self.postings if query_norm in key]
+            for key in keys:
+                for date_str, postings in self.postings[key].items():
+                    for minutes, kind, item in postings:
+                        hits.append(Hit(date_str, minutes, kind, item))
+        ordinals = {date_str: date_ordinal(date_str) for date_str in {hit.date for hit in hits}}
+        hits.sort(key=lambda hit: (ordinals[hit.date], hit.minutes), reverse=True)
+        return hits
+
+    def last(self, query, exact=False):
+        hits = self.lookup(query, exact)
+        return hits[0] if hits else None
+
+    def dates(self, query, exact=False):
+        """Days the item appears on, oldest first"""
+        return sorted({hit.date for hit in self.lookup(query, exact)}, key=date_ordinal)
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            text = json.dumps({"postings": self.postings, "days": self.days})
+            self._dirty = False
+        write_text(self.path, text)
+
+    def load(self):
+        data = read_json(self.path, {}, backups=0)
+        # missing or corrupted: every day is re-indexed by sync_listener()
+        self.postings = data.get("postings", {})
+        self.days = data.get("days", {})
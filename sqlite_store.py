@@ -0,0 +1,588 @@
+"""SQLite storage backend: one database instead of the day files and JSON state.
+
+Select it with JOURNAL_BACKEND=sqlite (or --backend sqlite for main.py and
+journal.py). Journal/journal.db then holds:
+
+    days         one row per day (day number, time of the last change, body size)
+    entries      every line of a day's journal in order, with its parsed fields
+    items        one row per item of an entry, indexed by normalized name and day
+    notes        the day's Notes: section
+    changes      the day's Changes: section
+    options      type options, in order
+    stacks       saved multi-select stacks, in order
+    discomforts  active discomfort tracking
+    episodes     discomfort episodes across days
+    aggregates   the precomputed per-day record (see aggregates.py)
+
+Adding an entry is a row shift and a single-row insert instead of rewriting
+the day, and saving options only touches the rows that changed. Day and item
+range queries use the indexes.
+
+    python sqlite_store.py import     # Journal/*.txt and the JSON files -> database
+    python sqlite_store.py export     # database -> Journal/*.txt and the JSON files
+"""
+import os
+import json
+import time
+import sqlite3
+import argparse
+import threading
+from aggregates import DayAggregates
+from cache import DayCache, ParsedDay
+from day import DayLines
+from entry_log import EntryLog
+from entry_parser import compose_day, normalize_text, parse_body, parse_line, split_sections
+from episodes import EpisodeStore, discomfort_events
+from persist import read_json, write_json, write_text
+from search import Hit
+from store import JournalStore, date_ordinal, sync_listener
+import options
+
+
+DB_NAME = "journal.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS days (
+    date TEXT PRIMARY KEY, ordinal INTEGER NOT NULL, mtime REAL NOT NULL, size INTEGER NOT NULL);
+CREATE INDEX IF NOT EXISTS days_ordinal ON days (ordinal);
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY, date TEXT NOT NULL, ordinal INTEGER NOT NULL, position INTEGER NOT NULL,
+    line TEXT NOT NULL, minutes INTEGER, kind TEXT, type TEXT, rating INTEGER, dosage TEXT);
+CREATE INDEX IF NOT EXISTS entries_day ON entries (date, position);
+CREATE INDEX IF NOT EXISTS entries_type ON entries (type, ordinal);
+CREATE TABLE IF NOT EXISTS items (
+    entry_id INTEGER NOT NULL REFERENCES entries (id) ON DELETE CASCADE, ordinal INTEGER NOT NULL,
+    item TEXT NOT NULL, item_norm TEXT NOT NULL, quantity INTEGER NOT NULL);
+CREATE INDEX IF NOT EXISTS items_item ON items (item_norm, ordinal);
+CREATE INDEX IF NOT EXISTS items_entry ON items (entry_id);
+CREATE TABLE IF NOT EXISTS notes (date TEXT PRIMARY KEY, text TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS changes (date TEXT PRIMARY KEY, text TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS options (
+    type TEXT NOT NULL, name TEXT NOT NULL, position INTEGER NOT NULL, PRIMARY KEY (type, name));
+CREATE TABLE IF NOT EXISTS stacks (
+    type TEXT NOT NULL, name TEXT NOT NULL, position INTEGER NOT NULL, PRIMARY KEY (type, name));
+CREATE TABLE IF NOT EXISTS discomforts (
+    name TEXT PRIMARY KEY, rating INTEGER, start_time TEXT, start_date TEXT);
+CREATE TABLE IF NOT EXISTS episodes (
+    id INTEGER PRIMARY KEY, name TEXT NOT NULL, start_date TEXT NOT NULL, start_ordinal INTEGER NOT NULL,
+    start_minutes INTEGER NOT NULL, end_date TEXT, end_minutes INTEGER, ratings TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS episodes_start ON episodes (start_ordinal);
+CREATE INDEX IF NOT EXISTS episodes_name ON episodes (name, start_ordinal);
+CREATE TABLE IF NOT EXISTS aggregates (date TEXT PRIMARY KEY, ordinal INTEGER NOT NULL, record TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS aggregates_ordinal ON aggregates (ordinal);
+"""
+
+# the JSON state files and the tables that replace them
+STATE_TABLES = {
+    options.TYPE_OPTIONS_FILE: "options",
+    options.TYPE_STACKS_FILE: "stacks",
+    options.ACTIVE_DISCOMFORTS_FILE: "discomforts",
+}
+
+
+class SqliteJournal:
+    """Journal days in SQLite, standing in for both the JournalStore and the EntryLog.
+
+    `index` mirrors the days table in memory ({date_str: {"ordinal", "mtime",
+    "size", "count", "types"}}) so listeners, the export and the day cache get
+    the same records as from the files; mtime is the time of the day's last
+    change and size the length of its journal body.
+    """
+
+    def __init__(self, path, root="Journal", cache=None):
+        self.path = path
+        self.root = root
+        self.cache = cache if cache is not None else DayCache()
+        self.index = {}
+        # other indexes kept in step with this one: objects with update_day(date_str, entries, record) and save()
+        self.listeners = []
+        self.lock = threading.RLock()
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory, exist_ok=True)
+        # one connection shared by the worker and the window, serialized by the lock
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA foreign_keys=ON")
+        self.db.executescript(SCHEMA)
+        self.load_index()
+
+    def load_index(self):
+        with self.lock:
+            self.index = {date_str: {"ordinal": ordinal, "mtime": mtime, "size": size, "count": 0, "types": {}}
+                          for date_str, ordinal, mtime, size
+                          in self.db.execute("SELECT date, ordinal, mtime, size FROM days")}
+            for date_str, entry_type, count in self.db.execute(
+                    "SELECT date, type, COUNT(*) FROM entries WHERE type IS NOT NULL GROUP BY date, type"):
+                record = self.index[date_str]
+                record["types"][entry_type] = count
+                record["count"] += count
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+    # reading
+
+    def _section(self, table, date_str):
+        row = self.db.execute(f"SELECT text FROM {table} WHERE date = ?", (date_str,)).fetchone()
+        return row[0] if row else ""
+
+    def read_sections(self, date_str):
+        """(journal, notes, changes) of a day, or None if there is no such day"""
+        with self.lock:
+            if date_str not in self.index:
+                return None
+            journal = "\n".join(line for _, line in self._journal_rows(date_str))
+            notes, changes = self._section("notes", date_str), self._section("changes", date_str)
+        if notes or changes:
+            journal = journal.strip()  # as split_sections gives it for a file with sections
+        return journal, notes, changes
+
+    def _journal_rows(self, date_str):
+        """[(position, line)] of a day's journal as stored (not stripped)"""
+        return self.db.execute("SELECT position, line FROM entries WHERE date = ? ORDER BY position, id",
+                               (date_str,)).fetchall()
+
+    def read_day(self, date_str):
+        """The day as the text of its file (None if there is no such day)"""
+        sections = self.read_sections(date_str)
+        if sections is None:
+            return None
+        journal, notes, changes = sections
+        if not notes and not changes:
+            return journal
+        return compose_day(journal, notes, changes)
+
+    def read_body(self, date_str):
+        """The journal part of a day, as split_sections gives it (None if there is no such day)"""
+        sections = self.read_sections(date_str)
+        return None if sections is None else sections[0]
+
+    def read_parsed(self, date_str):
+        """The day as a ParsedDay, from the cache unless it changed"""
+        with self.lock:
+            record = self.index.get(date_str)
+            stamp = (record["mtime"], record["size"]) if record else None
+            day = self.cache.get(date_str, stamp)
+            if day is None:
+                day = self._parse(self.read_sections(date_str))
+                self.cache.put(date_str, stamp, day)
+        return day
+
+    def prefetch(self, dates):
+        """Parse days into the cache ahead of time (skipping ones already there)"""
+        for date_str in dates:
+            with self.lock:
+                record = self.index.get(date_str)
+                stamp = (record["mtime"], record["size"]) if record else None
+                if not self.cache.peek(date_str, stamp):
+                    self.cache.put(date_str, stamp, self._parse(self.read_sections(date_str)))
+
+    @staticmethod
+    def _parse(sections):
+        if sections is None:
+            return ParsedDay(None, "", "")
+        journal, notes, changes = sections
+        return ParsedDay(journal, notes, changes, tuple(parse_body(journal)))
+
+    def days(self, start=None, end=None):
+        """Days between two 'dd-MM-yyyy' dates (inclusive), oldest first"""
+        return self._dates("SELECT date FROM days", "ordinal", start, end)
+
+    def _dates(self, query, column, start, end, params=()):
+        conditions, params = [], list(params)
+        if start:
+            conditions.append(f"{column} >= ?")
+            params.append(date_ordinal(start))
+        if end:
+            conditions.append(f"{column} <= ?")
+            params.append(date_ordinal(end))
+        if conditions:
+            query += (" AND " if " WHERE " in query else " WHERE ") + " AND ".join(conditions)
+        with self.lock:
+            return [row[0] for row in self.db.execute(query + f" ORDER BY {column}", params)]
+
+    def refresh(self):
+        """Nothing to pick up: the database only changes through this object"""
+        return []
+
+    # writing (each change is one transaction, with the listeners' saves in it)
+
+    def _insert_line(self, date_str, ordinal, position, line):
+        entry = parse_line(line)
+        if entry is None:
+            self.db.execute("INSERT INTO entries (date, ordinal, position, line) VALUES (?, ?, ?, ?)",
+                            (date_str, ordinal, position, line))
+            return
+        cursor = self.db.execute(
+            "INSERT INTO entries (date, ordinal, position, line, minutes, kind, type, rating, dosage) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (date_str, ordinal, position, line, entry.minutes, entry.kind, entry.type, entry.rating, entry.dosage))
+        self.db.executemany(
+            "INSERT INTO items (entry_id, ordinal, item, item_norm, quantity) VALUES (?, ?, ?, ?, ?)",
+            [(cursor.lastrowid, ordinal, item, normalize_text(item), quantity)
+             for item, quantity in zip(entry.items, entry.quantities) if normalize_text(item)])
+
+    def _put_lines(self, date_str, ordinal, lines):
+        self.db.execute("DELETE FROM entries WHERE date = ?", (date_str,))  # items go with them
+        for position, line in enumerate(lines):
+            self._insert_line(date_str, ordinal, position, line)
+
+    def _put_section(self, table, date_str, text):
+        if text:
+            self.db.execute(f"INSERT OR REPLACE INTO {table} (date, text) VALUES (?, ?)", (date_str, text))
+        else:
+            self.db.execute(f"DELETE FROM {table} WHERE date = ?", (date_str,))
+
+    def _touch(self, date_str, ordinal, journal, entries):
+        """Stamp the day as changed now, update the index and tell the listeners"""
+        record = {"ordinal": ordinal, "mtime": time.time(), "size": len(journal), "count": len(entries), "types": {}}
+        for entry in entries:
+            record["types"][entry.type] = record["types"].get(entry.type, 0) + 1
+        self.db.execute("INSERT OR REPLACE INTO days (date, ordinal, mtime, size) VALUES (?, ?, ?, ?)",
+                        (date_str, ordinal, record["mtime"], record["size"]))
+        self.index[date_str] = record
+        for listener in self.listeners:
+            listener.update_day(date_str, entries, record)
+
+    def write_days(self, days):
+        """Replace whole days from (date_str, file content) pairs, in one transaction"""
+        with self.lock:
+            with self.db:
+                for date_str, content in days:
+                    journal, notes, changes, _ = split_sections(content)
+                    ordinal = date_ordinal(date_str)
+                    self._put_lines(date_str, ordinal, journal.split("\n"))
+                    self._put_section("notes", date_str, notes)
+                    self._put_section("changes", date_str, changes)
+                    self._touch(date_str, ordinal, journal, parse_body(journal))
+                self.save_index()
+
+    def write_day(self, date_str, content):
+        self.write_days([(date_str, content)])
+
+    def add(self, date_str, line):
+        """Insert one line chronologically: a position shift and a single-row insert"""
+        with self.lock:
+            # the rows as stored, so line i of the day is the row at position i
+            rows = self._journal_rows(date_str) if date_str in self.index else []
+            day = DayLines("\n".join(line for _, line in rows))
+            ordinal = date_ordinal(date_str)
+            with self.db:
+                if day.is_blank():
+                    day = DayLines(f"Date: {date_str}\n")
+                    day.insert(line)
+                    self._put_lines(date_str, ordinal, day.lines)
+                elif [position for position, _ in rows] != list(range(len(rows))):
+                    # positions with gaps or ties (older databases): renumber the whole day
+                    day.ensure_trailing_newline()
+                    day.insert(line)
+                    self._put_lines(date_str, ordinal, day.lines)
+                else:
+                    if day.ensure_trailing_newline():
+                        self._insert_line(date_str, ordinal, len(day) - 1, "")
+                    position = day.insert(line)
+                    self.db.execute("UPDATE entries SET position = position + 1 WHERE date = ? AND position >= ?",
+                                    (date_str, position))
+                    self._insert_line(date_str, ordinal, position, line)
+                self._touch(date_str, ordinal, day.text(), [entry for entry in day.entries if entry is not None])
+                self.save_index()
+
+    def save_index(self):
+        for listener in self.listeners:
+            listener.save()
+
+    def compact(self, date_str):
+        """Nothing to fold: every change is committed as it is made"""
+
+    def compact_all(self):
+        """Nothing to fold: every change is committed as it is made"""
+
+    def pending_days(self):
+        return []
+
+    def flush(self):
+        """Nothing deferred: the listeners save in the change's transaction"""
+
+    def _commit_unless_in_transaction(self, statements):
+        """Run statements on their own, or as part of the change that is being written"""
+        with self.lock:
+            owned = not self.db.in_transaction
+            statements()
+            if owned:
+                self.db.commit()
+
+    # type options, stacks and active discomforts
+
+    def read_groups(self, table):
+        """{type: [names]} from the options or stacks table (None if it is empty)"""
+        groups = {}
+        with self.lock:
+            for entry_type, name in self.db.execute(f"SELECT type, name FROM {table} ORDER BY type, position"):
+                groups.setdefault(entry_type, []).append(name)
+        return groups or None
+
+    def write_groups(self, table, groups):
+        """Store {type: [names]}, inserting, moving and deleting only the rows that differ"""
+        wanted = {(entry_type, name): position
+                  for entry_type, names in groups.items() for position, name in enumerate(names)}
+
+        def statements():
+            stored = {(entry_type, name): position for entry_type, name, position
+                      in self.db.execute(f"SELECT type, name, position FROM {table}")}
+            self.db.executemany(f"DELETE FROM {table} WHERE type = ? AND name = ?",
+                                [key for key in stored if key not in wanted])
+            self.db.executemany(f"INSERT OR REPLACE INTO {table} (type, name, position) VALUES (?, ?, ?)",
+                                [(entry_type, name, position) for (entry_type, name), position in wanted.items()
+                                 if stored.get((entry_type, name)) != position])
+        self._commit_unless_in_transaction(statements)
+
+    def read_discomforts(self):
+        with self.lock:
+            return {name: {"rating": rating, "start_time": start_time, "start_date": start_date}
+                    for name, rating, start_time, start_date
+                    in self.db.execute("SELECT name, rating, start_time, start_date FROM discomforts")} or None
+
+    def write_discomforts(self, active_discomforts):
+        wanted = {name: (data.get("rating"), data.get("start_time"), data.get("start_date"))
+                  for name, data in active_discomforts.items()}
+
+        def statements():
+            stored = {row[0]: row[1:] for row
+                      in self.db.execute("SELECT name, rating, start_time, start_date FROM discomforts")}
+            self.db.executemany("DELETE FROM discomforts WHERE name = ?",
+                                [(name,) for name in stored if name not in wanted])
+            self.db.executemany("INSERT OR REPLACE INTO discomforts (name, rating, start_time, start_date) "
+                                "VALUES (?, ?, ?, ?)",
+                                [(name,) + row for name, row in wanted.items() if stored.get(name) != row])
+        self._commit_unless_in_transaction(statements)
+
+    # discomfort episodes
+
+    def episode_days(self):
+        """{date_str: {"ordinal", "mtime", "size", "events"}} for the EpisodeStore, from the entries"""
+        with self.lock:
+            lines = {}
+            for date_str, line in self.db.execute(
+                    "SELECT date, line FROM entries WHERE type = 'Discomfort' ORDER BY date, position"):
+                lines.setdefault(date_str, []).append(parse_line(line))
+            return {date_str: {"ordinal": record["ordinal"], "mtime": record["mtime"], "size": record["size"],
+                               "events": discomfort_events(lines.get(date_str, []))}
+                    for date_str, record in self.index.items()}
+
+    def read_episodes(self):
+        with self.lock:
+            rows = self.db.execute("SELECT name, start_date, start_minutes, end_date, end_minutes, ratings "
+                                   "FROM episodes ORDER BY id").fetchall()
+        return [{"name": name, "start": [start_date, start_minutes], "ratings": json.loads(ratings),
+                 "end": [end_date, end_minutes] if end_date is not None else None}
+                for name, start_date, start_minutes, end_date, end_minutes, ratings in rows]
+
+    def write_episodes(self, rows):
+        def statements():
+            self.db.execute("DELETE FROM episodes")
+            self.db.executemany("INSERT INTO episodes (name, start_date, start_ordinal, start_minutes, "
+                                "end_date, end_minutes, ratings) VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+        self._commit_unless_in_transaction(statements)
+
+
+    # per-day aggregates
+
+    def read_aggregates(self):
+        with self.lock:
+            return {date_str: json.loads(record)
+                    for date_str, record in self.db.execute("SELECT date, record FROM aggregates")}
+
+    def write_aggregates(self, rows):
+        """Write (date_str, ordinal, record) rows; a record of None deletes the day"""
+        def statements():
+            self.db.executemany("DELETE FROM aggregates WHERE date = ?",
+                                [(date_str,) for date_str, _, record in rows if record is None])
+            self.db.executemany("INSERT OR REPLACE INTO aggregates (date, ordinal, record) VALUES (?, ?, ?)",
+                                [row for row in rows if row[2] is not None])
+        self._commit_unless_in_transaction(statements)
+
+
+class SqliteEpisodeStore(EpisodeStore):
+    """EpisodeStore kept in the episodes table, saved in the same transaction as the day change"""
+
+    def __init__(self, journal):
+        self.journal = journal
+        super().__init__(journal.root)
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            rows = [(episode["name"], episode["start"][0], self._ordinal(episode["start"][0]), episode["start"][1],
+                     episode["end"][0] if episode["end"] else None, episode["end"][1] if episode["end"] else None,
+                     json.dumps(episode["ratings"])) for episode in self.episodes]
+            self._dirty = False
+        self.journal.write_episodes(rows)
+
+    def load(self):
+        self.days = self.journal.episode_days()
+        self.episodes = self.journal.read_episodes()
+
+
+class SqliteAggregates(DayAggregates):
+    """DayAggregates kept in the aggregates table, writing only the days that changed"""
+
+    def __init__(self, journal, episodes):
+        self.journal = journal
+        super().__init__(journal.root, episodes)
+
+    def _snapshot(self, changed):
+        rows = []
+        for date_str in changed:
+            day = self.days.get(date_str)
+            rows.append((date_str, day["ordinal"] if day else None,
+                         json.dumps(day, separators=(",", ":")) if day else None))
+        return rows
+
+    def _write(self, snapshot):
+        self.journal.write_aggregates(snapshot)
+
+    def load(self):
+        self.days = self.journal.read_aggregates()
+
+
+class SqliteSearch:
+    """History search straight from the items table, so there is no separate index to keep in step"""
+
+    def __init__(self, journal):
+        self.journal = journal
+
+    def lookup(self, query, exact=False):
+        """All hits for items matching the query (substring match unless exact), newest first"""
+        query_norm = normalize_text(query)
+        if exact:
+            condition, pattern = "i.item_norm = ?", query_norm
+        else:
+            escaped = query_norm.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            condition, pattern = "i.item_norm LIKE ? ESCAPE '\\'", f"%{escaped}%"
+        with self.journal.lock:
+            rows = self.journal.db.execute(
+                "SELECT e.date, COALESCE(e.minutes, -1) AS minutes, COALESCE(e.kind, 'daily'), i.item "
+                f"FROM items i JOIN entries e ON e.id = i.entry_id WHERE {condition} "
+                "ORDER BY i.ordinal DESC, minutes DESC", (pattern,)).fetchall()
+        return [Hit(*row) for row in rows]
+
+    def last(self, query, exact=False):
+        hits = self.lookup(query, exact)
+        return hits[0] if hits else None
+
+    def dates(self, query, exact=False):
+        """Days the item appears on, oldest first"""
+        return sorted({hit.date for hit in self.lookup(query, exact)}, key=date_ordinal)
+
+
+class SqliteCore:
+    """JournalCore on the SQLite backend: same methods, one database file"""
+
+    def __init__(self, root="Journal", with_search=True, cache=None, db=None):
+        self.store = SqliteJournal(db or os.path.join(root, DB_NAME), root, cache=cache)
+        # entries are committed as they are added, so the store is its own log
+        self.log = self.store
+        self.episodes = SqliteEpisodeStore(self.store)
+        self.store.listeners.append(self.episodes)
+        self.aggregates = SqliteAggregates(self.store, self.episodes)
+        self.store.listeners.append(self.aggregates)
+        self.search_index = SqliteSearch(self.store) if with_search else None
+
+    def open(self, read_only=False):
+        # nothing to recover: every change is committed as it is made
+        for listener in self.store.listeners:
+            sync_listener(self.store, listener)
+
+    def refresh(self):
+        return self.store.refresh()
+
+    def watch_paths(self):
+        # the state lives in the database too, and only changes through this object
+        return []
+
+    def add(self, date_str, line):
+        self.store.add(date_str, line)
+
+    def save(self, date_str, journal_content, notes_content="", changes_content=""):
+        self.store.write_day(date_str, compose_day(journal_content, notes_content or "", changes_content or ""))
+
+    def read(self, date_str):
+        return self.store.read_parsed(date_str)
+
+    def read_state(self, filename):
+        """Saved type options, stacks or active discomforts (None if there are none)"""
+        table = STATE_TABLES[filename]
+        if table == "discomforts":
+            return self.store.read_discomforts()
+        return self.store.read_groups(table)
+
+    def write_state(self, filename, data):
+        table = STATE_TABLES[filename]
+        if table == "discomforts":
+            self.store.write_discomforts(data)
+        else:
+            self.store.write_groups(table, data)
+
+    def close(self):
+        self.store.close()
+
+
+def import_layout(core, base="."):
+    """Copy the day files and JSON state under `base` into the database; returns the number of days.
+
+    Days already in the database are replaced by the files' version.
+    """
+    store = JournalStore(os.path.join(base, "Journal"))
+    # fold entry logs left by a crash into the day files first
+    EntryLog(store).recover()
+    store.refresh()
+    # oldest first, so each day only replays the episodes from its own date on
+    days = [(date_str, store.read_day(date_str)) for date_str in store.days()]
+    core.store.write_days((date_str, content) for date_str, content in days if content is not None)
+    for filename in STATE_TABLES:
+        data = read_json(os.path.join(base, filename))
+        if data is not None:
+            core.write_state(filename, data)
+    return len(days)
+
+
+def export_layout(core, base="."):
+    """Write every day and the state back out as day files and JSON under `base`; returns the number of days"""
+    store = JournalStore(os.path.join(base, "Journal"))
+    days = core.store.days()
+    for date_str in days:
+        write_text(store.path_for(date_str), core.store.read_day(date_str))
+    store.refresh()
+    for filename in STATE_TABLES:
+        data = core.read_state(filename)
+        if data is not None:
+            write_json(os.path.join(base, filename), data)
+    return len(days)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Copy the journal between the text/JSON files and the SQLite database")
+    parser.add_argument("direction", choices=["import", "export"],
+                        help="import: files -> database, export: database -> files")
+    parser.add_argument("--dir", default=".", help="folder holding Journal/ and options/ (default: current)")
+    parser.add_argument("--db", default=os.path.join("Journal", DB_NAME), help="database file")
+    args = parser.parse_args(argv)
+
+    core = SqliteCore(with_search=False, db=args.db)
+    started = time.perf_counter()
+    try:
+        if args.direction == "import":
+            days = import_layout(core, args.dir)
+            print(f"Imported {days} days into {args.db} in {time.perf_counter() - started:.2f}s")
+        else:
+            days = export_layout(core, args.dir)
+            print(f"Exported {days} days from {args.db} in {time.perf_counter() - started:.2f}s")
+    finally:
+        core.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+import os
+import threading
+from datetime import datetime
+from entry_parser import parse_body, split_sections
+from persist import read_json, write_json, write_text
+
+
+DATE_FORMAT = "%d-%m-%Y"
+
+# day writes come in bursts (compactions, imports): the index and the listeners
+# are saved once this long after the last one instead of after every day
+SAVE_DELAY = 5.0
+
+
+def date_ordinal(date_str):
+    """Convert a 'dd-MM-yyyy' string to a day number (None if it isn't a date)"""
+    try:
+        return datetime.strptime(date_str, DATE_FORMAT).toordinal()
+    except ValueError:
+        return None
+
+
+def sync_listener(store, listener):
+    """Bring a listener up to date with the store's index after it was loaded from disk.
+
+    The listener keeps an "mtime" and "size" per day in `listener.days`; days
+    whose stamp differs from the index are fed to update_day() again, days no
+    longer indexed are removed, then it is saved. Works with either store.
+    """
+    with store.lock:
+        for date_str, record in store.index.items():
+            known = listener.days.get(date_str)
+            if known and known["mtime"] == record["mtime"] and known["size"] == record["size"]:
+                continue
+            body = store.read_body(date_str)
+            if body is not None:
+                listener.update_day(date_str, parse_body(body), record)
+        for date_str in list(listener.days):
+            if date_str not in store.index:
+                listener.update_day(date_str, None, None)
+    listener.save()
+
+
+class JournalStore:
+    """Per-day journal files with a persistent index over them.
+
+    The dd-MM-yyyy.txt files stay the source of truth; the index only caches
+    what a range query needs (day number, body offset, entry counts, mtime).
+    """
+
+    def __init__(self, root="Journal"):
+        self.root = root
+        self.index_path = os.path.join(root, "index.json")
+        self.index = {}  # {date_str: {"ordinal", "mtime", "size", "offset", "count", "types"}}
+        # other indexes kept in step with this one: objects with update_day(date_str, entries, record) and save()
+        self.listeners = []
+        # held while the index changes or is walked (compactions run on their own timer threads);
+        # listeners' own locks are only ever taken inside it
+        self.lock = threading.RLock()
+        self._save_timer = None
+        self.load_index()
+
+    def path_for(self, date_str):
+        if not os.path.exists(self.root):
+            os.makedirs(self.root)
+        return os.path.join(self.root, f"{date_str}.txt")
+
+    def read_day(self, date_str):
+        """Return the raw content of a day file, or None if there is none"""
+        filename = self.path_for(date_str)
+        if not os.path.exists(filename):
+            return None
+        with open(filename, 'r') as file:
+            return file.read()
+
+    def read_body(self, date_str):
+        """Return only the journal part of a day, using the indexed offset to skip notes"""
+        record = self.index.get(date_str)
+        try:
+            stat = os.stat(self.path_for(date_str))
+        except FileNotFoundError:
+            return None
+        if record is None or record["mtime"] != stat.st_mtime or record["size"] != stat.st_size:
+            # changed since it was indexed: the offset may point anywhere
+            content = self.read_day(date_str)
+            return None if content is None else split_sections(content)[0]
+        with open(self.path_for(date_str), 'r') as file:
+            body = file.read(record["offset"])
+            # as split_sections: stripped only when notes or changes follow
+            return body.strip() if file.read(1) else body
+
+    def write_day(self, date_str, content):
+        filename = self.path_for(date_str)
+        with self.lock:
+            # write beside the target and rename, so a crash never leaves a half-written day
+            write_text(filename, content)
+            self._index_file(date_str, filename, content)
+            self._schedule_save()
+
+    def _schedule_save(self):
+        """Save the index and the listeners SAVE_DELAY after the first unsaved change.
+
+        They only cache what the day files say: if the app dies first, refresh()
+        re-reads the few days whose mtime is newer than the saved index.
+        """
+        with self.lock:
+            if self._save_timer is None:
+                self._save_timer = threading.Timer(SAVE_DELAY, self.save_index)
+                self._save_timer.daemon = True
+                self._save_timer.start()
+
+    def flush(self):
+        """Save now if a save is pending (before the process exits)"""
+        with self.lock:
+            if self._save_timer is not None:
+                self.save_index()
+
+    def _index_file(self, date_str, filename, content=None):
+        if content is None:
+            with open(filename, 'r') as file:
+                content = file.read()
+        stat = os.stat(filename)
+        journal_entry, _, _, body_end = split_sections(content)
+
+        entries = parse_body(journal_entry)
+        types = {}
+        for entry in entries:
+            types[entry.type] = types.get(entry.type, 0) + 1
+
+        self.index[date_str] = {
+            "ordinal": date_ordinal(date_str),
+            "mtime": stat.st_mtime,
+            "size": stat.st_size,
+            "offset": body_end,
+            "count": len(entries),
+            "types": types,
+        }
+        for listener in self.listeners:
+            listener.update_day(date_str, entries, self.index[date_str])
+
+    def refresh(self):
+        """Bring the index up to date with the directory, re-reading only changed files.
+
+        Returns the dates of the days that changed, appeared or disappeared.
+        """
+        with self.lock:
+            if not os.path.exists(self.root):
+                return []
+            changed = []
+            seen = set()
+            for dir_entry in os.scandir(self.root):
+                if not dir_entry.name.endswith(".txt"):
+                    continue
+                date_str = dir_entry.name[:-4]
+                if date_ordinal(date_str) is None:
+                    continue
+                seen.add(date_str)
+                stat = dir_entry.stat()
+                record = self.index.get(date_str)
+                if record and record["mtime"] == stat.st_mtime and record["size"] == stat.st_size:
+                    continue
+                self._index_file(date_str, dir_entry.path)
+                changed.append(date_str)
+
+            for date_str in list(self.index):
+                if date_str not in seen:
+                    del self.index[date_str]
+                    for listener in self.listeners:
+                        listener.update_day(date_str, None, None)
+                    changed.append(date_str)
+
+            if changed:
+                self.save_index()
+            return changed
+
+    def days(self, start=None, end=None):
+        """Indexed days between two 'dd-MM-yyyy' dates (inclusive), oldest first"""
+        lo = date_ordinal(start) if start else None
+        hi = date_ordinal(end) if end else None
+        with self.lock:
+            result = [(record["ordinal"], date_str) for date_str, record in self.index.items()
+                      if (lo is None or record["ordinal"] >= lo) and (hi is None or record["ordinal"] <= hi)]
+        result.sort()
+        return [date_str for _, date_str in result]
+
+    def save_index(self):
+        with self.lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+                self._save_timer = None
+            # no backups: the index is rebuilt from the day files if it is lost
+            write_json(self.index_path, self.index, backups=0)
+            for listener in self.listeners:
+                listener.save()
+
+    def load_index(self):
+        # missing or corrupted: rebuilt by refresh()
+        self.index = read_json(self.index_path, {}, backups=0)
@@ -0,0 +1,52 @@
+import os
+import shutil
+import tempfile
+import unittest
+from entry_log import EntryLog, _digest
+from persist import write_text
+from store import JournalStore
+
+
+DAY = "01-03-2026"
+
+
+class RecoverTest(unittest.TestCase):
+    """A compaction interrupted by a crash is finished by content, never by mtimes"""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        self.store = JournalStore(self.root)
+        self.store.write_day(DAY, f"Date: {DAY}\n8:00am took zinc\n")
+        self.log = EntryLog(self.store, compact_delay=60)
+        self.log.append(DAY, "add", line="9:00am took fish oil")
+        self.log.hold(DAY)
+        self.path = self.log.path_for(DAY)
+
+    def tearDown(self):
+        self.store.flush()
+
+    def recovered(self):
+        log = EntryLog(self.store)
+        log.recover()
+        return self.store.read_day(DAY)
+
+    def test_log_set_aside_before_the_day_was_written(self):
+        os.replace(self.path, self.path + ".compacting")
+        # the day file is no older than the log, as on a coarse-timestamp filesystem
+        stat = os.stat(self.path + ".compacting")
+        os.utime(self.store.path_for(DAY), ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        self.assertEqual(self.recovered(), f"Date: {DAY}\n8:00am took zinc\n9:00am took fish oil")
+
+    def test_log_left_after_the_day_was_written(self):
+        # as a fold leaves it when it crashes before removing the set-aside log
+        folded = self.log.read_day(DAY)
+        os.replace(self.path, self.path + ".compacting")
+        write_text(self.path + ".compacting.folded", _digest(folded))
+        self.store.write_day(DAY, folded)
+        self.assertEqual(self.recovered(), f"Date: {DAY}\n8:00am took zinc\n9:00am took fish oil")
+        self.assertEqual(os.listdir(os.path.join(self.root, "log")), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,30 @@
+import os
+import tempfile
+import unittest
+from core import JournalCore
+from entry_parser import parse_body
+from episodes import discomfort_events
+
+
+class UntimedDiscomfortTest(unittest.TestCase):
+    """Hand-edited discomfort lines without a time must not break indexing"""
+
+    def test_events_of_untimed_lines_start_at_midnight(self):
+        entries = parse_body("Date: 01-03-2026\nstarted having headache rating 2\n"
+                             "9:00am finished having headache")
+        self.assertEqual(discomfort_events(entries),
+                         [[0, "started", "headache", 2], [540, "finished", "headache", None]])
+
+    def test_open_indexes_a_day_with_an_untimed_line(self):
+        with tempfile.TemporaryDirectory() as root:
+            with open(os.path.join(root, "01-03-2026.txt"), "w") as file:
+                file.write("Date: 01-03-2026\nstarted having headache rating 2\n")
+            core = JournalCore(root, with_search=False)
+            core.open()
+            [episode] = core.episodes.query()
+            self.assertEqual((episode.name, episode.start_minutes, episode.end_date),
+                             ("headache", 0, None))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import os
+from PySide6.QtCore import QObject, QFileSystemWatcher, QTimer, Signal
+
+
+# a save is a burst of events (temp file, rename, our index updates): wait for it to settle
+SETTLE_MS = 300
+
+
+class FolderWatcher(QObject):
+    """Emits changed() once a burst of file system events in some folders settles.
+
+    Folder events cover files replaced by a rename (atomic saves, sync tools,
+    the CLI). Files edited in place only show up if they are watched
+    themselves, so the caller also names a few files (the open day, the state
+    files). What changed is for the caller to find out, e.g. by mtime.
+    """
+
+    changed = Signal()
+
+    def __init__(self, folders, files=(), parent=None):
+        super().__init__(parent)
+        self.folders = list(folders)
+        self.files = set(files)
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.directoryChanged.connect(self._on_event)
+        self._watcher.fileChanged.connect(self._on_event)
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(SETTLE_MS)
+        self._timer.timeout.connect(self._settled)
+        self._rewatch()
+
+    def set_files(self, files):
+        self.files = set(files)
+        self._rewatch()
+
+    def _rewatch(self):
+        """Watch what exists now (a file replaced by a rename drops out of the watcher)"""
+        wanted = [path for path in self.folders + sorted(self.files) if os.path.exists(path)]
+        # a folder that doesn't exist yet is watched through its parent until it appears
+        wanted += [os.path.dirname(os.path.abspath(folder)) for folder in self.folders
+                   if not os.path.exists(folder)]
+        current = set(self._watcher.files() + self._watcher.directories())
+        stale = [path for path in current if path not in wanted]
+        if stale:
+            self._watcher.removePaths(stale)
+        new = [path for path in dict.fromkeys(wanted) if path not in current]
+        if new:
+            self._watcher.addPaths(new)
+
+    def _on_event(self, path):
+        self._timer.start()
+
+    def _settled(self):
+        self._rewatch()
+        self.changed.emit()
+
+    def flush(self):
+        """Stop waiting for a burst to settle; True if there was one (changed() is not emitted)"""
+        if not self._timer.isActive():
+            return False
+        self._timer.stop()
+        self._rewatch()
+        return True
@@ -0,0 +1,72 @@
+import itertools
+import threading
+import traceback
+from collections import OrderedDict
+
+
+class IOWorker:
+    """A single background thread that runs persistence jobs in order.
+
+    Jobs submitted with a key coalesce: if a job with the same key is still
+    queued it is replaced by the newer one, so a burst of saves of the same
+    file turns into one write. Jobs without a key always run. Results and
+    errors are handed to `deliver`/`report`, which the GUI points at
+    queued signals so callbacks run back on its own thread.
+    """
+
+    def __init__(self, deliver=None, report=None, name="journal-io"):
+        self.deliver = deliver or (lambda callback, result: callback(result))
+        self.report = report or (lambda key, error: traceback.print_exception(type(error), error, error.__traceback__))
+        self._jobs = OrderedDict()   # {key: (func, args, kwargs, callback)}
+        self._unkeyed = itertools.count()
+        self._cond = threading.Condition()
+        self._busy = False
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, key, func, *args, callback=None, **kwargs):
+        """Queue func(*args, **kwargs); callback(result) is delivered when it has run"""
+        with self._cond:
+            if key is None:
+                key = ("job", next(self._unkeyed))
+            # a replaced job moves to the back so it still runs after anything queued before it
+            self._jobs.pop(key, None)
+            self._jobs[key] = (func, args, kwargs, callback)
+            self._cond.notify_all()
+
+    def pending(self, key):
+        with self._cond:
+            return key in self._jobs
+
+    def flush(self, timeout=None):
+        """Block until every queued job has run; False if the timeout expired first"""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._jobs and not self._busy, timeout)
+
+    def stop(self, timeout=None):
+        self.flush(timeout)
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._jobs or self._stopped)
+                if not self._jobs:
+                    return
+                key, (func, args, kwargs, callback) = self._jobs.popitem(last=False)
+                self._busy = True
+            try:
+                result = func(*args, **kwargs)
+            except Exception as error:
+                self.report(key, error)
+            else:
+                if callback is not None:
+                    self.deliver(callback, result)
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self._cond.notify_all()